@@ -0,0 +1,46 @@
+"""Add indexes for foreign-key and ordering access paths
+
+Revision ID: 003_access_path_indexes
+Revises: 002_add_is_admin
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "003_access_path_indexes"
+down_revision = "002_add_is_admin"
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns) - keep in sync with __table_args__ in app/models.py
+INDEXES = [
+    # Boards owned by a user (ownership checks, admin user deletion)
+    ("ix_boards_created_by", "boards", ["created_by"]),
+    # Columns of a board in display order
+    ("ix_columns_board_id_position", "columns", ["board_id", "position"]),
+    # Tasks of a column in display order (create_task position, board tree load)
+    ("ix_tasks_column_id_position", "tasks", ["column_id", "position"]),
+    # Active tasks of a board (board tree load, bulk board deletion)
+    ("ix_tasks_board_id_is_active", "tasks", ["board_id", "is_active"]),
+    # Tasks per assignee (workload, reassignment on user deletion)
+    ("ix_tasks_assignee_id", "tasks", ["assignee_id"]),
+    # Tasks per creator (user deletion)
+    ("ix_tasks_created_by", "tasks", ["created_by"]),
+    # Comment thread of a task in chronological order
+    ("ix_comments_task_id_created_at", "comments", ["task_id", "created_at"]),
+    # Comments per author (user deletion)
+    ("ix_comments_author_id", "comments", ["author_id"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,100 @@
+"""Move task tags from a JSON column to tags / task_tags tables
+
+Revision ID: 004_normalize_task_tags
+Revises: 003_access_path_indexes
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "004_normalize_task_tags"
+down_revision = "003_access_path_indexes"
+branch_labels = None
+depends_on = None
+
+
+def _parse_tags(raw):
+    try:
+        tags = json.loads(raw) if raw else []
+    except (json.JSONDecodeError, TypeError):
+        return []
+    if not isinstance(tags, list):
+        return []
+    names = []
+    for name in tags:
+        name = str(name).strip() if name is not None else ""
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tags",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_tags_name", "tags", ["name"], unique=True)
+
+    op.create_table(
+        "task_tags",
+        sa.Column("task_id", sa.Integer(), nullable=False),
+        sa.Column("tag_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["task_id"], ["tasks.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["tag_id"], ["tags.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("task_id", "tag_id"),
+    )
+    op.create_index("ix_task_tags_tag_id_task_id", "task_tags", ["tag_id", "task_id"], unique=False)
+
+    # Copy the JSON-encoded tags into the new tables
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("SELECT id, tags FROM tasks WHERE tags IS NOT NULL AND tags != ''")).fetchall()
+    task_tags = [(task_id, _parse_tags(raw)) for task_id, raw in rows]
+
+    tags_table = sa.table("tags", sa.column("id", sa.Integer), sa.column("name", sa.String))
+    task_tags_table = sa.table("task_tags", sa.column("task_id", sa.Integer), sa.column("tag_id", sa.Integer))
+
+    names = sorted({name for _, tag_names in task_tags for name in tag_names})
+    if names:
+        op.bulk_insert(tags_table, [{"name": name} for name in names])
+        tag_ids = dict((name, tag_id) for tag_id, name in bind.execute(sa.select(tags_table.c.id, tags_table.c.name)))
+        links = [
+            {"task_id": task_id, "tag_id": tag_ids[name]}
+            for task_id, tag_names in task_tags
+            for name in tag_names
+        ]
+        op.bulk_insert(task_tags_table, links)
+
+    with op.batch_alter_table("tasks") as batch_op:
+        batch_op.drop_column("tags")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("tasks") as batch_op:
+        batch_op.add_column(sa.Column("tags", sa.Text(), nullable=True))
+
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT task_tags.task_id, tags.name FROM task_tags "
+        "JOIN tags ON tags.id = task_tags.tag_id ORDER BY task_tags.task_id, tags.name"
+    )).fetchall()
+    tags_by_task = {}
+    for task_id, name in rows:
+        tags_by_task.setdefault(task_id, []).append(name)
+    for task_id, names in tags_by_task.items():
+        bind.execute(
+            sa.text("UPDATE tasks SET tags = :tags WHERE id = :id"),
+            {"tags": json.dumps(names), "id": task_id},
+        )
+
+    op.drop_index("ix_task_tags_tag_id_task_id", table_name="task_tags")
+    op.drop_table("task_tags")
+    op.drop_index("ix_tags_name", table_name="tags")
+    op.drop_table("tags")
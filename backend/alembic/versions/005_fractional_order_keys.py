@@ -0,0 +1,87 @@
+"""Convert task and column positions to fractional order keys
+
+Revision ID: 005_fractional_order_keys
+Revises: 004_normalize_task_tags
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "005_fractional_order_keys"
+down_revision = "004_normalize_task_tags"
+branch_labels = None
+depends_on = None
+
+
+# table -> parent column the positions are scoped to
+ORDERED_TABLES = [("tasks", "column_id"), ("columns", "board_id")]
+
+# Key alphabet and spacing as app/ordering.py had them when this revision was
+# written; copied so that later changes to the app do not change this migration
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+
+
+def evenly_spaced_keys(count):
+    """`count` ascending base-36 fraction keys spread evenly over the key space"""
+    if count <= 0:
+        return []
+    length = 1
+    while BASE ** length <= count * 2:
+        length += 1
+    span = BASE ** length
+    keys = []
+    for i in range(1, count + 1):
+        value = i * span // (count + 1)
+        digits = []
+        for _ in range(length):
+            value, digit = divmod(value, BASE)
+            digits.append(DIGITS[digit])
+        keys.append("".join(reversed(digits)).rstrip("0"))
+    return keys
+
+
+def _current_order(bind, table, parent, sort_key):
+    """Row ids grouped by parent in their current order (ties broken by id)"""
+    rows = bind.execute(sa.text(f"SELECT id, {parent}, position FROM {table}")).fetchall()
+    by_parent = {}
+    for row_id, parent_id, position in rows:
+        by_parent.setdefault(parent_id, []).append((sort_key(position), row_id))
+    return [[row_id for _, row_id in sorted(items)] for items in by_parent.values()]
+
+
+def _write_positions(bind, table, ordered_ids, to_keys):
+    for ids in ordered_ids:
+        for row_id, position in zip(ids, to_keys(len(ids))):
+            bind.execute(
+                sa.text(f"UPDATE {table} SET position = :position WHERE id = :id"),
+                {"position": position, "id": row_id},
+            )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for table, parent in ORDERED_TABLES:
+        # Read the integer order before the column becomes a string
+        ordered_ids = _current_order(bind, table, parent, lambda position: int(position or 0))
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                "position", existing_type=sa.Integer(), type_=sa.String(), existing_nullable=False,
+                postgresql_using="position::varchar",
+            )
+        _write_positions(bind, table, ordered_ids, evenly_spaced_keys)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for table, parent in ORDERED_TABLES:
+        ordered_ids = _current_order(bind, table, parent, lambda position: position or "")
+        _write_positions(bind, table, ordered_ids, lambda count: [str(i) for i in range(count)])
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                "position", existing_type=sa.String(), type_=sa.Integer(), existing_nullable=False,
+                postgresql_using="position::integer",
+            )
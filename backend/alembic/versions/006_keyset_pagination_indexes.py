@@ -0,0 +1,38 @@
+"""Add (created_at, id) indexes for keyset pagination
+
+Revision ID: 006_keyset_pagination_indexes
+Revises: 005_fractional_order_keys
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "006_keyset_pagination_indexes"
+down_revision = "005_fractional_order_keys"
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns) - keep in sync with __table_args__ in app/models.py
+INDEXES = [
+    # GET /users and /users/pending pages
+    ("ix_users_created_at_id", "users", ["created_at", "id"]),
+    # GET /boards pages
+    ("ix_boards_created_at_id", "boards", ["created_at", "id"]),
+    # Comment thread pages of a task (replaces ix_comments_task_id_created_at)
+    ("ix_comments_task_id_created_at_id", "comments", ["task_id", "created_at", "id"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+    op.drop_index("ix_comments_task_id_created_at", table_name="comments")
+
+
+def downgrade() -> None:
+    op.create_index("ix_comments_task_id_created_at", "comments", ["task_id", "created_at"], unique=False)
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
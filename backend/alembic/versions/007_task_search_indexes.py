@@ -0,0 +1,24 @@
+"""Add the due-date index used by task search
+
+Revision ID: 007_task_search_indexes
+Revises: 006_keyset_pagination_indexes
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "007_task_search_indexes"
+down_revision = "006_keyset_pagination_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Due-date ranges within a board (GET /tasks/search?board_id=&due_after=&due_before=)
+    op.create_index("ix_tasks_board_id_due_date", "tasks", ["board_id", "due_date"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_board_id_due_date", table_name="tasks")
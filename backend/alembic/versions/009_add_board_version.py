@@ -0,0 +1,25 @@
+"""Add boards.version for version-keyed caches
+
+Revision ID: 009_add_board_version
+Revises: 008_full_text_search
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "009_add_board_version"
+down_revision = "008_full_text_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("boards", sa.Column("version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("boards") as batch_op:
+        batch_op.drop_column("version")
@@ -0,0 +1,74 @@
+"""Add column_stats and board_stats task counters
+
+Revision ID: 010_column_board_stats
+Revises: 009_add_board_version
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "010_column_board_stats"
+down_revision = "009_add_board_version"
+branch_labels = None
+depends_on = None
+
+
+def _counter_columns():
+    return [
+        sa.Column("task_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("open_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("estimated_hours", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("hours_used", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("completed_hours", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP")),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "column_stats",
+        sa.Column("column_id", sa.Integer(), sa.ForeignKey("columns.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("board_id", sa.Integer(), sa.ForeignKey("boards.id", ondelete="CASCADE"), nullable=False),
+        *_counter_columns(),
+    )
+    op.create_index("ix_column_stats_board_id", "column_stats", ["board_id"])
+    op.create_table(
+        "board_stats",
+        sa.Column("board_id", sa.Integer(), sa.ForeignKey("boards.id", ondelete="CASCADE"), primary_key=True),
+        *_counter_columns(),
+    )
+
+    # Backfill from the existing tasks; "open" uses the not-done column names of app/workload.py
+    op.execute("""
+        INSERT INTO column_stats (column_id, board_id, task_count, open_count, estimated_hours, hours_used, completed_hours)
+        SELECT c.id, c.board_id,
+               count(t.id),
+               coalesce(sum(CASE WHEN t.id IS NOT NULL
+                                  AND lower(trim(c.name)) IN ('backlog', 'to do', 'todo', 'in progress')
+                             THEN 1 ELSE 0 END), 0),
+               coalesce(sum(t.estimated_hours), 0),
+               coalesce(sum(t.hours_used), 0),
+               coalesce(sum(t.completed_hours), 0)
+        FROM columns c LEFT JOIN tasks t ON t.column_id = c.id
+        GROUP BY c.id, c.board_id, c.name
+    """)
+    op.execute("""
+        INSERT INTO board_stats (board_id, task_count, open_count, estimated_hours, hours_used, completed_hours)
+        SELECT b.id,
+               coalesce(sum(s.task_count), 0),
+               coalesce(sum(s.open_count), 0),
+               coalesce(sum(s.estimated_hours), 0),
+               coalesce(sum(s.hours_used), 0),
+               coalesce(sum(s.completed_hours), 0)
+        FROM boards b LEFT JOIN column_stats s ON s.board_id = b.id
+        GROUP BY b.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table("board_stats")
+    op.drop_index("ix_column_stats_board_id", table_name="column_stats")
+    op.drop_table("column_stats")
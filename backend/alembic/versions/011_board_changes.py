@@ -0,0 +1,43 @@
+"""Add the board_changes log and boards.compacted_version
+
+Revision ID: 011_board_changes
+Revises: 010_column_board_stats
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "011_board_changes"
+down_revision = "010_column_board_stats"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("boards", sa.Column("compacted_version", sa.Integer(), nullable=False, server_default="0"))
+    # Nothing was logged before this migration: clients holding an older version must reload
+    op.execute("UPDATE boards SET compacted_version = version")
+
+    op.create_table(
+        "board_changes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("board_id", sa.Integer(), sa.ForeignKey("boards.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("entity", sa.String(), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("deleted", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP")),
+    )
+    op.create_index("ix_board_changes_board_id_entity", "board_changes", ["board_id", "entity", "entity_id"], unique=True)
+    op.create_index("ix_board_changes_board_id_version", "board_changes", ["board_id", "version"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_board_changes_board_id_version", table_name="board_changes")
+    op.drop_index("ix_board_changes_board_id_entity", table_name="board_changes")
+    op.drop_table("board_changes")
+    with op.batch_alter_table("boards") as batch_op:
+        batch_op.drop_column("compacted_version")
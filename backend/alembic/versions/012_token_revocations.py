@@ -0,0 +1,32 @@
+"""Add users.token_version and token_revocations for claims-based auth
+
+Revision ID: 012_token_revocations
+Revises: 011_board_changes
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "012_token_revocations"
+down_revision = "011_board_changes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("token_version", sa.Integer(), nullable=False, server_default="0"))
+    op.create_table(
+        "token_revocations",
+        sa.Column("user_id", sa.Integer(), primary_key=True),
+        sa.Column("token_version", sa.Integer(), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("token_revocations")
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("token_version")
@@ -0,0 +1,54 @@
+"""Add purge_jobs so board purges are shared and resumed by one worker
+
+Revision ID: 014_purge_jobs
+Revises: 013_refresh_tokens
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import uuid
+
+
+# revision identifiers, used by Alembic.
+revision = "014_purge_jobs"
+down_revision = "013_refresh_tokens"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    purge_jobs = op.create_table(
+        "purge_jobs",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("board_id", sa.Integer(), nullable=False),
+        sa.Column("requested_by", sa.Integer(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("deleted_comments", sa.Integer(), nullable=False),
+        sa.Column("deleted_tasks", sa.Integer(), nullable=False),
+        sa.Column("deleted_columns", sa.Integer(), nullable=False),
+        sa.Column("deleted_changes", sa.Integer(), nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("claimed_by", sa.String(), nullable=True),
+        sa.Column("claimed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_purge_jobs_status", "purge_jobs", ["status"])
+
+    # Boards soft-deleted before this revision get an unclaimed job for the next worker to start
+    bind = op.get_bind()
+    board_ids = bind.execute(sa.text("SELECT id FROM boards WHERE is_active = :inactive"), {"inactive": False}).scalars().all()
+    if board_ids:
+        op.bulk_insert(purge_jobs, [
+            {
+                "id": uuid.uuid4().hex, "board_id": board_id, "status": "queued",
+                "deleted_comments": 0, "deleted_tasks": 0, "deleted_columns": 0, "deleted_changes": 0,
+            }
+            for board_id in board_ids
+        ])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_purge_jobs_status", table_name="purge_jobs")
+    op.drop_table("purge_jobs")
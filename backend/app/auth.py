@@ -1,13 +1,20 @@
 from fastapi import HTTPException, status, Depends, WebSocket
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
 import jwt
 from passlib.context import CryptContext
-from .database import get_db
+from .database import get_read_db
 from .models import User
+from .principals import Principal, get_principal, store_principal, current_epoch
+from .revocations import claims_trusted
+from .password_pool import run_hashing
+from .rate_limit import limit_account_attempt
+from . import metrics
 import os
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -17,7 +24,21 @@ SECRET_KEY = os.getenv("SECRET_KEY", "development-secret-key-change-in-productio
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt cost of new hashes; pick it with python -m app.calibrate_bcrypt. Hashes at a
+# lower cost are redone with this one when their user next logs in; stronger ones are kept
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+def password_context(rounds: int) -> CryptContext:
+    """bcrypt at the given cost, treating only cheaper hashes as deprecated"""
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+    )
+
+pwd_context = password_context(BCRYPT_ROUNDS)
+metrics.register_gauge("bcrypt.rounds", lambda: BCRYPT_ROUNDS)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -28,6 +49,20 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
+def _verify_login(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """(valid, new hash if the stored one is below BCRYPT_ROUNDS)"""
+    started = time.perf_counter()
+    result = pwd_context.verify_and_update(plain_password, hashed_password)
+    metrics.observe("login.hash_seconds", time.perf_counter() - started)
+    return result
+
+# Request handlers use these: the bcrypt work runs on the hashing pool, not the event loop
+async def check_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return await run_hashing(_verify_login, plain_password, hashed_password)
+
+async def hash_password(password: str) -> str:
+    return await run_hashing(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -39,6 +74,20 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def create_user_token(user: User) -> str:
+    """Access token carrying the claims get_current_user trusts without a database read (see app/revocations.py)"""
+    return create_access_token(
+        data={
+            "sub": str(user.id),
+            "name": user.username,
+            "adm": bool(user.is_admin),
+            "act": bool(user.is_active),
+            "tv": user.token_version or 0,
+            "iat": datetime.now(timezone.utc),
+        },
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+
 def verify_token(token: str) -> Optional[dict]:
     """Verify and decode a JWT token"""
     try:
@@ -47,57 +96,102 @@ def verify_token(token: str) -> Optional[dict]:
     except jwt.PyJWTError:
         return None
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    """Get current authenticated user from JWT token"""
-    if not token:
+async def load_principal(db: AsyncSession, user_id, cached: bool = True) -> Optional[Principal]:
+    """The user with this id as a Principal, from the cache when warm (app/principals.py) unless cached=False"""
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
         return None
+    principal = get_principal(user_id) if cached else None
+    if principal is not None:
+        return principal
+
+    epoch = current_epoch()
+    row = (await db.execute(
+        select(User.id, User.username, User.is_admin, User.is_active, User.created_at).where(User.id == user_id)
+    )).first()
+    if row is None:
+        return None
+    principal = Principal(*row)
+    store_principal(principal, epoch)
+    return principal
+
+def _issued_before(payload: dict, created_at: Optional[datetime]) -> bool:
+    """Whether the token predates the user row (a deleted user's token for a reused id)"""
+    issued_at = payload.get("iat")
+    if issued_at is None or created_at is None:
+        return False
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return issued_at < int(created_at.timestamp())
 
-    payload = verify_token(token)
+async def resolve_token(db: AsyncSession, token: Optional[str]) -> Optional[Principal]:
+    """The active user a token authenticates, from its claims unless they were revoked"""
+    payload = verify_token(token) if token else None
     if not payload:
         return None
+    try:
+        user_id = int(payload.get("sub"))
+    except (TypeError, ValueError):
+        return None
+
+    if "tv" in payload and claims_trusted(user_id, payload["tv"]):
+        principal = Principal(user_id, payload.get("name"), payload.get("adm"), payload.get("act"))
+    else:
+        # Revoked claims, or a token issued before claims existed. Revoked ones skip the
+        # cache: another worker's change is not invalidated here until the entry expires
+        principal = await load_principal(db, user_id, cached="tv" not in payload)
+        if principal is not None and _issued_before(payload, principal.created_at):
+            return None
 
-    user_id: int = payload.get("sub")
-    if not user_id:
+    if principal is None or not principal.is_active:
         return None
+    return principal
 
-    user = db.query(User).filter(User.id == user_id).first()
-    return user
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_read_db)):
+    """Get current authenticated user from JWT token"""
+    return await resolve_token(db, token)
 
-async def get_current_user_ws(websocket: WebSocket, db: Session = Depends(get_db)):
+async def get_current_user_ws(websocket: WebSocket, db: AsyncSession = Depends(get_read_db)):
     """Get current authenticated user from WebSocket query parameters"""
     token = websocket.query_params.get("token")
     if not token:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return None
 
-    payload = verify_token(token)
-    if not payload:
-        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
-        return None
-
-    user_id: int = payload.get("sub")
-    if not user_id:
-        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
-        return None
-
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await resolve_token(db, token)
     if not user:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return None
 
     return user
 
-def authenticate_user(db: Session, username_or_email: str, password: str):
-    """Authenticate a user with username/email and password"""
+async def authenticate_user(db: AsyncSession, username_or_email: str, password: str, read_db: Optional[AsyncSession] = None):
+    """Authenticate a user with username/email and password.
+
+    The user is looked up on read_db (default: db) and that transaction is
+    ended before the password check, so no connection -- under the SQLite
+    profile, not the single writer -- is held while bcrypt runs. db is only
+    used to store a rehashed password; the caller commits.
+
+    Takes an attempt from the account's rate limit bucket (its email, or the
+    identifier when no user matches) between the lookup and the hash.
+    """
     import logging
     logger = logging.getLogger(__name__)
 
     logger.info(f"🔐 AUTHENTICATING: {username_or_email}")
+    read_db = read_db or db
 
     # Try to find user by username first, then by email
-    user = db.query(User).filter(
+    user = await read_db.scalar(select(User).where(
         (User.username == username_or_email) | (User.email == username_or_email)
-    ).first()
+    ))
+    # Nothing was written; expire_on_commit=False keeps the loaded user
+    await read_db.commit()
+
+    # 429 before the hash; the same bucket whether the email or the username was typed
+    await limit_account_attempt(user.email if user else username_or_email)
 
     if not user:
         logger.warning(f"❌ AUTH FAILED: User not found: {username_or_email}")
@@ -105,10 +199,20 @@ def authenticate_user(db: Session, username_or_email: str, password: str):
 
     logger.info(f"✅ USER FOUND: {user.username} (ID: {user.id})")
 
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = await check_password(password, user.hashed_password)
+    if not valid:
         logger.warning(f"❌ AUTH FAILED: Invalid password for user: {username_or_email}")
         return False
 
+    if new_hash:
+        # Committed by the caller together with the login
+        await db.execute(
+            update(User).where(User.id == user.id).values(hashed_password=new_hash)
+            .execution_options(synchronize_session=False)
+        )
+        metrics.increment("login.rehashed")
+        logger.info(f"🔁 Password hash of {user.username} moved to {BCRYPT_ROUNDS} rounds")
+
     logger.info(f"🎉 AUTH SUCCESS: Authentication successful for user: {user.username}")
     return user
 
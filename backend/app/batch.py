@@ -0,0 +1,216 @@
+from pydantic import ValidationError
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional, Set, Tuple
+from .models import Column, Task, Comment, TaskTag
+from .models import TaskCreate, TaskUpdate, TaskMove, TaskBatchOperation, TaskBatchResult
+from .ordering import key_between, needs_rebalance
+from .stats import TaskFigures, record_task_changes, task_figures
+from .tags import resolve_tags, normalize_tag_names
+
+MAX_BATCH_OPERATIONS = 500
+
+
+class _ColumnOrder:
+    """In-memory (position, task_id) list of one column, kept sorted while ops are applied"""
+
+    def __init__(self, rows: List[Tuple[str, Optional[int]]]):
+        self.rows = rows
+
+    def remove(self, task_id: int) -> None:
+        self.rows = [row for row in self.rows if row[1] != task_id]
+
+    def insert(self, index: int, task_id: Optional[int]) -> Tuple[str, bool]:
+        """Place a task at index; returns (key, rebalance)"""
+        index = min(max(index, 0), len(self.rows))
+        before = self.rows[index - 1][0] if index > 0 else None
+        after = self.rows[index][0] if index < len(self.rows) else None
+        if before is not None and after is not None and before >= after:
+            key, rebalance = key_between(before, None), True
+        else:
+            key = key_between(before, after)
+            rebalance = needs_rebalance(key)
+        self.rows.insert(index, (key, task_id))
+        return key, rebalance
+
+    def append(self, task_id: Optional[int]) -> Tuple[str, bool]:
+        return self.insert(len(self.rows), task_id)
+
+
+def _error(index: int, operation: TaskBatchOperation, detail: str, status_code: int = 400) -> TaskBatchResult:
+    return TaskBatchResult(
+        index=index, op=operation.op, status="error", task_id=operation.task_id, detail=detail, status_code=status_code
+    )
+
+
+async def apply_task_batch(
+    db: AsyncSession, board_id: int, user_id: int, operations: List[TaskBatchOperation]
+) -> Tuple[List[TaskBatchResult], Set[int], Set[int]]:
+    """Validate and apply create/update/move/delete operations on one board's tasks.
+
+    Everything is checked before anything is written, then applied with one
+    executemany per statement type. The caller commits. Returns the per-op
+    results, the ids of columns whose order keys need rebalancing and the ids
+    of columns whose counters changed; if any result has status "error",
+    nothing was written.
+    """
+    # One query each for the board's columns and the referenced tasks
+    board_columns = set((await db.scalars(select(Column.id).where(Column.board_id == board_id))).all())
+    referenced_ids = {op.task_id for op in operations if op.task_id is not None}
+    tasks: Dict[int, Tuple[int, str]] = {}
+    figures: Dict[int, TaskFigures] = {}
+    if referenced_ids:
+        rows = await db.execute(
+            select(Task.id, Task.column_id, Task.position, Task.estimated_hours, Task.hours_used, Task.completed_hours)
+            .where(Task.id.in_(referenced_ids), Task.board_id == board_id)
+        )
+        for task_id, column_id, position, *hours in rows:
+            tasks[task_id] = (column_id, position)
+            figures[task_id] = tuple(hours)
+    # Counter contributions of the existing tasks before the batch
+    stats_changes = [(column_id, -1, figures[task_id]) for task_id, (column_id, _) in tasks.items()]
+
+    # Validate payloads
+    results: List[Optional[TaskBatchResult]] = [None] * len(operations)
+    parsed: List[object] = [None] * len(operations)
+    for index, operation in enumerate(operations):
+        try:
+            if operation.op == "create":
+                payload = TaskCreate(**operation.data)
+                if payload.column_id not in board_columns:
+                    results[index] = _error(index, operation, "Column not found")
+            elif operation.op == "update":
+                payload = TaskUpdate(**operation.data)
+            elif operation.op == "move":
+                payload = TaskMove(**operation.data)
+                if payload.column_id not in board_columns:
+                    results[index] = _error(index, operation, "Target column not found")
+            else:
+                payload = None
+        except ValidationError as e:
+            results[index] = _error(index, operation, str(e), status_code=422)
+            continue
+        if operation.op != "create" and operation.task_id not in tasks:
+            results[index] = _error(index, operation, "Task not found")
+        parsed[index] = payload
+
+    # Order keys for the columns receiving tasks, in one query
+    target_columns = {p.column_id for p in parsed if isinstance(p, (TaskCreate, TaskMove))}
+    orders: Dict[int, _ColumnOrder] = {column_id: _ColumnOrder([]) for column_id in target_columns}
+    if target_columns:
+        rows = await db.execute(
+            select(Task.column_id, Task.position, Task.id)
+            .where(Task.column_id.in_(target_columns))
+            .order_by(Task.column_id, Task.position, Task.id)
+        )
+        for column_id, position, task_id in rows:
+            orders[column_id].rows.append((position, task_id))
+
+    # Replay the operations in memory
+    creates: List[Tuple[int, TaskCreate, str]] = []
+    changes: Dict[int, dict] = {}
+    tag_changes: Dict[int, List[str]] = {}
+    deleted: Set[int] = set()
+    rebalance: Set[int] = set()
+    for index, (operation, payload) in enumerate(zip(operations, parsed)):
+        if results[index] is not None:
+            continue
+        task_id = operation.task_id
+        if task_id in deleted:
+            results[index] = _error(index, operation, "Task deleted earlier in this batch")
+            continue
+
+        if operation.op == "create":
+            position, needs = orders[payload.column_id].append(None)
+            creates.append((index, payload, position))
+            column_id = payload.column_id
+        elif operation.op == "update":
+            fields = payload.model_dump(include=payload.model_fields_set)
+            if "tags" in fields:
+                tag_changes[task_id] = fields.pop("tags") or []
+            changes.setdefault(task_id, {}).update(fields)
+            estimated, used, completed = figures[task_id]
+            figures[task_id] = (
+                fields.get("estimated_hours", estimated), fields.get("hours_used", used), fields.get("completed_hours", completed)
+            )
+            column_id, position = tasks[task_id]
+            needs = False
+        elif operation.op == "move":
+            if tasks[task_id][0] in orders:
+                orders[tasks[task_id][0]].remove(task_id)
+            position, needs = orders[payload.column_id].insert(payload.position, task_id)
+            column_id = payload.column_id
+            tasks[task_id] = (column_id, position)
+            changes.setdefault(task_id, {}).update(column_id=column_id, position=position)
+        else:
+            column_id, position = tasks[task_id]
+            if column_id in orders:
+                orders[column_id].remove(task_id)
+            deleted.add(task_id)
+            changes.pop(task_id, None)
+            tag_changes.pop(task_id, None)
+            needs = False
+
+        if needs:
+            rebalance.add(column_id)
+        results[index] = TaskBatchResult(
+            index=index, op=operation.op, status="ok", task_id=task_id, column_id=column_id, position=position
+        )
+
+    if any(result.status == "error" for result in results):
+        return results, set(), set()
+
+    # ... and after it: the surviving tasks where they ended up, plus the new ones
+    stats_changes += [(column_id, 1, figures[task_id]) for task_id, (column_id, _) in tasks.items() if task_id not in deleted]
+    stats_changes += [(payload.column_id, 1, task_figures(payload)) for _, payload, _ in creates]
+
+    # Tags: resolve every name once (creating missing tags), then flush for their ids
+    names = normalize_tag_names(
+        [name for _, payload, _ in creates for name in (payload.tags or [])]
+        + [name for tag_names in tag_changes.values() for name in tag_names]
+    )
+    tag_ids: Dict[str, int] = {}
+    if names:
+        tags = await resolve_tags(db, names)
+        await db.flush()
+        tag_ids = {tag.name: tag.id for tag in tags}
+
+    if creates:
+        new_ids = (await db.scalars(
+            insert(Task).returning(Task.id, sort_by_parameter_order=True),
+            [
+                {
+                    **payload.model_dump(exclude={"tags"}),
+                    "board_id": board_id,
+                    "created_by": user_id,
+                    "position": position,
+                }
+                for _, payload, position in creates
+            ],
+        )).all()
+        for (index, payload, _), task_id in zip(creates, new_ids):
+            results[index].task_id = task_id
+            if payload.tags:
+                tag_changes[task_id] = payload.tags
+
+    if changes:
+        await db.execute(update(Task), [{"id": task_id, **fields} for task_id, fields in changes.items()])
+
+    if tag_changes:
+        await db.execute(delete(TaskTag).where(TaskTag.task_id.in_(tag_changes.keys())))
+        links = [
+            {"task_id": task_id, "tag_id": tag_ids[name]}
+            for task_id, tag_names in tag_changes.items()
+            for name in normalize_tag_names(tag_names)
+        ]
+        if links:
+            await db.execute(insert(TaskTag), links)
+
+    if deleted:
+        # Bulk deletes bypass ORM cascades, so remove dependent rows explicitly
+        await db.execute(delete(TaskTag).where(TaskTag.task_id.in_(deleted)))
+        await db.execute(delete(Comment).where(Comment.task_id.in_(deleted)))
+        await db.execute(delete(Task).where(Task.id.in_(deleted)))
+
+    changed_columns = await record_task_changes(db, board_id, stats_changes)
+    return results, rebalance, changed_columns
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark bcrypt on this host and pick BCRYPT_ROUNDS for a target login latency.
+
+Each extra round doubles the cost; the command picks the highest cost whose
+hash stays within the target. Existing hashes are moved to the new cost the
+next time their user logs in.
+
+Usage:
+    python -m app.calibrate_bcrypt                       # target 250 ms, print the setting
+    python -m app.calibrate_bcrypt --target-ms 400
+    python -m app.calibrate_bcrypt --write-env .env      # also store BCRYPT_ROUNDS in .env
+"""
+
+from passlib.hash import bcrypt
+import argparse
+import logging
+import statistics
+import time
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Below 10 rounds bcrypt is too cheap to slow down offline guessing
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+
+
+def time_rounds(rounds: int, samples: int) -> float:
+    """Median seconds for one hash at this cost"""
+    hasher = bcrypt.using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hasher.hash("calibration-password")
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def calibrate(target_seconds: float, samples: int = 3) -> int:
+    chosen = None
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        seconds = time_rounds(rounds, samples)
+        logger.info(f"⏱️  {rounds} rounds: {seconds * 1000:.0f} ms")
+        if seconds > target_seconds:
+            break
+        chosen = rounds
+    if chosen is None:
+        logger.warning(f"⚠️ Even {MIN_ROUNDS} rounds exceed {target_seconds * 1000:.0f} ms on this host; using {MIN_ROUNDS}")
+        chosen = MIN_ROUNDS
+    return chosen
+
+
+def write_env(path: str, rounds: int) -> None:
+    """Set BCRYPT_ROUNDS in a dotenv file, keeping its other lines"""
+    try:
+        with open(path) as f:
+            lines = [line for line in f.read().splitlines() if not line.startswith("BCRYPT_ROUNDS=")]
+    except FileNotFoundError:
+        lines = []
+    lines.append(f"BCRYPT_ROUNDS={rounds}")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pick BCRYPT_ROUNDS for a target hashing latency")
+    parser.add_argument("--target-ms", type=float, default=250, help="longest acceptable hash time (default 250)")
+    parser.add_argument("--samples", type=int, default=3, help="hashes timed per cost (median is used)")
+    parser.add_argument("--write-env", metavar="PATH", help="store BCRYPT_ROUNDS in this dotenv file")
+    args = parser.parse_args()
+
+    rounds = calibrate(args.target_ms / 1000, args.samples)
+    logger.info(f"✅ BCRYPT_ROUNDS={rounds}")
+    if args.write_env:
+        write_env(args.write_env, rounds)
+        logger.info(f"📝 Written to {args.write_env}; restart the backend to apply")
+
+
+if __name__ == "__main__":
+    main()
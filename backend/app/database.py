@@ -1,25 +1,310 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
+from starlette.requests import HTTPConnection
+import asyncio
+import hashlib
+import hmac
+from contextlib import asynccontextmanager
+import importlib.util
+import itertools
+import jwt
 import os
+import time
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
 # Use SQLite for development, PostgreSQL for production
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./kanban.db")
+RAW_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./kanban.db")
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Async mode: "auto" (use an async driver when one is installed), "true" or "false"
+DATABASE_ASYNC = os.getenv("DATABASE_ASYNC", "auto").lower()
+
+# dialect -> (async driver, module that provides it)
+ASYNC_DRIVERS = {
+    "sqlite": ("aiosqlite", "aiosqlite"),
+    "postgresql": ("asyncpg", "asyncpg"),
+}
+
+
+def _split_url(url: str):
+    scheme, _, rest = url.partition("://")
+    dialect, _, driver = scheme.partition("+")
+    return dialect, driver, rest
+
+
+def _sync_url(url: str) -> str:
+    """Strip an async driver from a URL so scripts and Alembic can use it"""
+    dialect, driver, rest = _split_url(url)
+    if driver and driver == ASYNC_DRIVERS.get(dialect, (None,))[0]:
+        return f"{dialect}://{rest}"
+    return url
+
+
+def _async_url(url: str) -> Optional[str]:
+    """Return the async flavour of a URL, or None when async mode is off or unavailable"""
+    dialect, driver, rest = _split_url(url)
+    async_driver, module = ASYNC_DRIVERS.get(dialect, (None, None))
+    if driver and driver == async_driver:
+        return url
+    if DATABASE_ASYNC == "false" or async_driver is None:
+        return None
+    if importlib.util.find_spec(module) is None:
+        if DATABASE_ASYNC == "true":
+            raise RuntimeError(f"DATABASE_ASYNC=true but the '{module}' driver is not installed")
+        return None
+    return f"{dialect}+{async_driver}://{rest}"
+
+
+# Sync URL (scripts, Alembic, create_db.py) and async URL (request handlers)
+DATABASE_URL = _sync_url(RAW_DATABASE_URL)
+ASYNC_DATABASE_URL = _async_url(RAW_DATABASE_URL)
+
+# Optional read replicas (comma-separated); GET endpoints are spread across them round-robin
+DATABASE_REPLICA_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+
+# After a user writes, their reads stay on the primary for this long to hide replica lag
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+# Response header carrying that deadline; the client sends it back with its next requests
+READ_YOUR_WRITES_HEADER = "X-Read-Your-Writes"
+# Same settings as auth.SECRET_KEY / ALGORITHM (auth imports this module)
+SECRET_KEY = os.getenv("SECRET_KEY", "development-secret-key-change-in-production")
+ALGORITHM = os.getenv("ALGORITHM", "HS256")
+
+
+def _connect_args(url: str) -> dict:
+    return {"check_same_thread": False} if "sqlite" in url else {}
+
+
+# Opt-in SQLite production profile: WAL journal, tuned pragmas, and separate
+# single-writer / pooled read-only engines so readers never queue behind the write lock
+SQLITE_PERFORMANCE_PROFILE = os.getenv("SQLITE_PERFORMANCE_PROFILE", "false").lower() == "true"
+
+
+def _uses_sqlite_profile(url: str) -> bool:
+    return SQLITE_PERFORMANCE_PROFILE and url.startswith("sqlite") and ":memory:" not in url
+
+SQLITE_PRAGMAS = [
+    "journal_mode = WAL",
+    "synchronous = NORMAL",
+    # Negative cache_size is in KiB
+    f"cache_size = -{int(os.getenv('SQLITE_CACHE_SIZE_KB', '65536'))}",
+    f"mmap_size = {int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))}",
+    f"busy_timeout = {int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))}",
+    "temp_store = MEMORY",
+]
+SQLITE_READ_POOL_SIZE = int(os.getenv("SQLITE_READ_POOL_SIZE", "8"))
+
+
+def _apply_sqlite_profile(sync_engine, read_only: bool) -> None:
+    """Run the profile pragmas on every new connection of an engine"""
+    @event.listens_for(sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(f"PRAGMA {pragma}")
+        if read_only:
+            cursor.execute("PRAGMA query_only = ON")
+        cursor.close()
+
+
+def _engine_options(url: str, read_only: bool, is_async: bool) -> dict:
+    options = {"connect_args": _connect_args(url)}
+    if _uses_sqlite_profile(url):
+        # One writer connection serialises writes in-process instead of spinning on
+        # SQLITE_BUSY; readers get their own pool (WAL lets them run alongside the writer)
+        options.update(
+            poolclass=AsyncAdaptedQueuePool if is_async else QueuePool,
+            pool_size=SQLITE_READ_POOL_SIZE if read_only else 1,
+            max_overflow=0,
+        )
+    return options
+
+
+def _build_engines(raw_url: str, read_only: bool):
+    """Create the sync engine for a URL and, when enabled, its async counterpart"""
+    sync_url, async_url = _sync_url(raw_url), _async_url(raw_url)
+    sync_engine = create_engine(sync_url, **_engine_options(sync_url, read_only, is_async=False))
+    async_engine = (
+        create_async_engine(async_url, **_engine_options(sync_url, read_only, is_async=True))
+        if async_url else None
+    )
+    if _uses_sqlite_profile(sync_url):
+        _apply_sqlite_profile(sync_engine, read_only)
+        if async_engine is not None:
+            _apply_sqlite_profile(async_engine.sync_engine, read_only)
+    return sync_engine, async_engine
+
+
+def _session_factories(sync_engine, async_engine):
+    sync_factory = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
+    async_factory = (
+        async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False) if async_engine else None
+    )
+    return sync_factory, async_factory
+
+
+# Write (primary) engines - also used by scripts and Alembic
+engine, async_engine = _build_engines(RAW_DATABASE_URL, read_only=False)
+SessionLocal, AsyncSessionLocal = _session_factories(engine, async_engine)
+
+# Read engines: the replicas when configured, else a read-only pool on the primary
+# under the SQLite profile, else the primary engines themselves
+if DATABASE_REPLICA_URLS:
+    read_engines = [_build_engines(url, read_only=True) for url in DATABASE_REPLICA_URLS]
+elif _uses_sqlite_profile(DATABASE_URL):
+    read_engines = [_build_engines(RAW_DATABASE_URL, read_only=True)]
+else:
+    read_engines = [(engine, async_engine)]
+_read_session_factories = itertools.cycle([_session_factories(*engines) for engines in read_engines])
 
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
+
+class SyncFallbackSession:
+    """Exposes a sync Session through the AsyncSession call surface.
+
+    Used when no async driver is available so handlers can be written once
+    against the async API. Blocking calls run in a worker thread to keep the
+    event loop free.
+    """
+
+    def __init__(self, sync_session: Session):
+        self.sync_session = sync_session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    def get_bind(self, *args, **kwargs):
+        return self.sync_session.get_bind(*args, **kwargs)
+
+    async def _run(self, fn, *args, **kwargs):
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    async def execute(self, statement, *args, **kwargs):
+        return await self._run(self.sync_session.execute, statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await self._run(self.sync_session.scalar, statement, *args, **kwargs)
+
+    async def scalars(self, statement, *args, **kwargs):
+        return await self._run(self.sync_session.scalars, statement, *args, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await self._run(self.sync_session.get, entity, ident, **kwargs)
+
+    async def delete(self, instance):
+        await self._run(self.sync_session.delete, instance)
+
+    async def flush(self, objects=None):
+        await self._run(self.sync_session.flush, objects)
+
+    async def refresh(self, instance, attribute_names=None):
+        await self._run(self.sync_session.refresh, instance, attribute_names)
+
+    async def commit(self):
+        await self._run(self.sync_session.commit)
+
+    async def rollback(self):
+        await self._run(self.sync_session.rollback)
+
+    async def close(self):
+        await self._run(self.sync_session.close)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await self._run(fn, self.sync_session, *args, **kwargs)
+
+
+@asynccontextmanager
+async def _session_scope(async_factory, sync_factory):
+    """Yield an AsyncSession, or a SyncFallbackSession when async mode is unavailable"""
+    if async_factory is not None:
+        async with async_factory() as db:
+            yield db
+        return
+
+    db = SyncFallbackSession(sync_factory(expire_on_commit=False))
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
+
+
+def _affinity_key(connection: HTTPConnection) -> Optional[str]:
+    """User id from a valid bearer token, used only to pick a database"""
+    token = connection.query_params.get("token")
+    authorization = connection.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    if not token:
+        return None
+    try:
+        sub = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except jwt.PyJWTError:
+        return None
+    return str(sub) if sub else None
+
+
+def _sign_pin(value: str) -> str:
+    return hmac.new(SECRET_KEY.encode(), f"read-your-writes:{value}".encode(), hashlib.sha256).hexdigest()
+
+
+def read_your_writes_pin(connection: HTTPConnection, status_code: int) -> Optional[str]:
+    """Header value for the response to a successful write: "<user id>.<deadline ms>.<signature>".
+
+    The pin travels with the client rather than living in this process, so
+    any worker that serves the client's next read sends it to the primary.
+    """
+    if not DATABASE_REPLICA_URLS or status_code >= 400:
+        return None
+    if connection.scope["type"] != "http" or connection.scope["method"] in ("GET", "HEAD", "OPTIONS"):
+        return None
+    key = _affinity_key(connection)
+    if key is None:
+        return None
+    value = f"{key}.{int((time.time() + READ_YOUR_WRITES_SECONDS) * 1000)}"
+    return f"{value}.{_sign_pin(value)}"
+
+
+def _reads_pinned_to_primary(connection: HTTPConnection) -> bool:
+    pin = connection.headers.get(READ_YOUR_WRITES_HEADER)
+    if not pin:
+        return False
+    value, _, signature = pin.rpartition(".")
+    key, _, deadline = value.partition(".")
+    if not hmac.compare_digest(_sign_pin(value), signature) or not deadline.isdigit():
+        return False
+    # Only the user the pin was issued to, while it lasts
+    return int(deadline) > time.time() * 1000 and key == _affinity_key(connection)
+
+
+def write_session():
+    """Session on the primary for work outside a request (background jobs, scripts)"""
+    return _session_scope(AsyncSessionLocal, SessionLocal)
+
+
+async def get_db(connection: HTTPConnection):
+    """Session on the primary, for handlers that write"""
+    async with _session_scope(AsyncSessionLocal, SessionLocal) as db:
+        yield db
+
+
+async def get_read_db(connection: HTTPConnection):
+    """Session for read-only handlers, routed to the next read engine.
+
+    Falls back to the primary, when replicas are configured, for a request
+    that carries a valid read-your-writes pin (read_your_writes_pin) for its user.
+    """
+    if DATABASE_REPLICA_URLS and _reads_pinned_to_primary(connection):
+        sync_factory, async_factory = SessionLocal, AsyncSessionLocal
+    else:
+        sync_factory, async_factory = next(_read_session_factories)
+    async with _session_scope(async_factory, sync_factory) as db:
+        yield db
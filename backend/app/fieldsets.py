@@ -0,0 +1,201 @@
+"""Sparse fieldsets (?fields=) and expansion (?expand=) for read endpoints.
+
+    ?fields=id,title,comments.content      properties to return; dotted paths
+                                            reach into expanded relations
+    ?expand=assignee,comments.author       relations to embed; a path expands
+                                            its parents, "*" every relation below
+
+A level with no fields entry returns all of its plain fields. Relations are
+embedded only when expand (or a fields path) names them, and the parsed
+fieldset drives both the loader options -- load_only() for the columns,
+selectinload() for the relations -- and the serializer, so nothing that
+was not asked for is read from the database or validated.
+
+Requests without either parameter keep the endpoints' full response models.
+"""
+from fastapi import HTTPException
+from sqlalchemy.orm import load_only, selectinload
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from .models import Board, Column, Task, Comment, User, Tag, BoardStats, ColumnStats, BoardSummary
+
+
+class Relation:
+    def __init__(self, attribute, resource: "Resource", many: bool):
+        self.attribute = attribute
+        self.resource = resource
+        self.many = many
+
+
+class Resource:
+    """The fields and relations one response type exposes for an ORM model"""
+
+    def __init__(
+        self,
+        model,
+        fields: Sequence[str],
+        relations: Optional[Dict[str, Relation]] = None,
+        # name -> (loader option, value) for fields that are not plain columns
+        computed: Optional[Dict[str, Tuple[Callable[[], Any], Callable[[Any], Any]]]] = None,
+    ):
+        self.model = model
+        self.fields = tuple(fields)
+        self.relations = relations or {}
+        self.computed = computed or {}
+
+
+USER = Resource(User, ("id", "email", "username", "full_name", "is_active", "is_admin", "created_at"))
+
+STATS_FIELDS = ("task_count", "open_count", "estimated_hours", "hours_used", "completed_hours", "updated_at")
+
+COMMENT = Resource(
+    Comment,
+    ("id", "content", "task_id", "author_id", "created_at"),
+    {"author": Relation(Comment.author, USER, many=False)},
+)
+
+TASK = Resource(
+    Task,
+    (
+        "id", "title", "description", "board_id", "column_id", "assignee_id", "priority", "tags", "due_date",
+        "estimated_hours", "hours_used", "completed_hours", "created_by", "position", "is_active", "created_at",
+    ),
+    {
+        "assignee": Relation(Task.assignee, USER, many=False),
+        "comments": Relation(Task.comments, COMMENT, many=True),
+    },
+    # Tags are Tag rows in task_tags; the API exposes their names
+    computed={"tags": (lambda: selectinload(Task.tags).load_only(Tag.name), lambda task: [tag.name for tag in task.tags])},
+)
+
+COLUMN = Resource(
+    Column,
+    ("id", "name", "board_id", "position"),
+    {
+        "stats": Relation(Column.stats, Resource(ColumnStats, STATS_FIELDS), many=False),
+        "tasks": Relation(Column.tasks, TASK, many=True),
+    },
+)
+
+BOARD = Resource(
+    Board,
+    ("id", "name", "description", "created_by", "is_active", "version", "created_at"),
+    {
+        "stats": Relation(Board.stats, Resource(BoardStats, STATS_FIELDS), many=False),
+        "columns": Relation(Board.columns, COLUMN, many=True),
+    },
+)
+
+# GET /boards without expand: summary rows, which only fields can trim
+BOARD_SUMMARY = Resource(BoardSummary, tuple(BoardSummary.model_fields))
+
+
+class Fieldset:
+    """Parsed fields/expand for one level of a response"""
+
+    def __init__(self, resource: Resource):
+        self.resource = resource
+        # None: every plain field
+        self.fields: Optional[List[str]] = None
+        self.expand: Dict[str, "Fieldset"] = {}
+
+    def child(self, name: str) -> "Fieldset":
+        if name not in self.expand:
+            self.expand[name] = Fieldset(self.resource.relations[name].resource)
+        return self.expand[name]
+
+    def expand_all(self) -> None:
+        for name in self.resource.relations:
+            self.child(name).expand_all()
+
+    @property
+    def output_fields(self) -> Tuple[str, ...]:
+        if self.fields is None:
+            return self.resource.fields
+        return tuple(name for name in self.resource.fields if name in self.fields)
+
+
+def _invalid(detail: str) -> HTTPException:
+    return HTTPException(status_code=400, detail=detail)
+
+
+def _split(value: Optional[str]) -> List[List[str]]:
+    return [item.strip().split(".") for item in (value or "").split(",") if item.strip()]
+
+
+def parse_fieldset(resource: Resource, fields: Optional[str], expand: Optional[str]) -> Fieldset:
+    """Parse ?fields= and ?expand= for a resource; 400 for unknown names"""
+    root = Fieldset(resource)
+
+    for path in _split(expand):
+        node = root
+        for name in path:
+            if name == "*":
+                node.expand_all()
+                break
+            if name not in node.resource.relations:
+                raise _invalid(f"Unknown relation '{name}' in expand '{'.'.join(path)}'")
+            node = node.child(name)
+
+    for path in _split(fields):
+        node = root
+        for name in path[:-1]:
+            if name not in node.resource.relations:
+                raise _invalid(f"Unknown relation '{name}' in fields '{'.'.join(path)}'")
+            node = node.child(name)
+        name = path[-1]
+        if name in node.resource.relations:
+            node.child(name)
+        elif name in node.resource.fields:
+            node.fields = (node.fields or []) + [name]
+        else:
+            raise _invalid(f"Unknown field '{name}' in fields '{'.'.join(path)}'")
+    return root
+
+
+def _columns(model, attributes: Iterable) -> list:
+    """Mapped attributes of model for a mix of names, attributes and Column objects"""
+    mapper = model.__mapper__
+    result = []
+    for attribute in attributes:
+        if isinstance(attribute, str):
+            attribute = getattr(model, attribute)
+        elif not hasattr(attribute, "property"):
+            attribute = getattr(model, mapper.get_property_by_column(attribute).key)
+        result.append(attribute)
+    return result
+
+
+def _level_options(fieldset: Fieldset, required: Iterable = ()) -> list:
+    """load_only for one level plus the loaders of its relations and computed fields"""
+    resource = fieldset.resource
+    names = [name for name in fieldset.output_fields if name not in resource.computed]
+    keys = list(resource.model.__mapper__.primary_key) + list(required)
+    children = []
+    for name, child in fieldset.expand.items():
+        attribute = resource.relations[name].attribute
+        # Join columns on both sides, so selectinload can match children to parents
+        keys += list(attribute.property.local_columns)
+        remote = [column for column in attribute.property.remote_side if column.table is child.resource.model.__table__]
+        children.append(selectinload(attribute).options(*_level_options(child, remote)))
+    computed = [resource.computed[name][0]() for name in fieldset.output_fields if name in resource.computed]
+    return [load_only(*_columns(resource.model, names + keys)), *computed, *children]
+
+
+def loader_options(fieldset: Fieldset, required: Iterable = ()) -> tuple:
+    """Loader options for the root entity; required are extra columns the caller needs (e.g. sort keys)"""
+    return tuple(_level_options(fieldset, required))
+
+
+def serialize(obj, fieldset: Fieldset) -> Optional[dict]:
+    """The requested fields and expansions of a loaded object (or a summary model) as a plain dict"""
+    if obj is None:
+        return None
+    resource = fieldset.resource
+    data = {}
+    for name in fieldset.output_fields:
+        data[name] = resource.computed[name][1](obj) if name in resource.computed else getattr(obj, name)
+    for name, child in fieldset.expand.items():
+        relation = resource.relations[name]
+        value = getattr(obj, relation.attribute.key)
+        data[name] = [serialize(item, child) for item in value] if relation.many else serialize(value, child)
+    return data
@@ -0,0 +1,117 @@
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Optional
+from .models import Board, Column, Task, Comment, BoardStats
+
+# Eager-load strategy for the full board tree.
+# Each selectinload issues one "WHERE parent_id IN (...)" query per level,
+# so a board snapshot costs a fixed number of round-trips no matter how many
+# columns, tasks or comments it contains:
+#   boards -> stats
+#          -> columns -> stats
+#                     -> tasks -> assignees
+#                              -> tags (one query for the whole board)
+#                              -> comments -> authors
+# Everything a response model touches must be eager-loaded: lazy loads are
+# not available on an AsyncSession.
+TASK_TREE_OPTIONS = (
+    selectinload(Task.assignee),
+    selectinload(Task.tags),
+    selectinload(Task.comments).selectinload(Comment.author),
+)
+
+COLUMN_TREE_OPTIONS = tuple(
+    selectinload(Column.tasks).options(option) for option in TASK_TREE_OPTIONS
+) + (selectinload(Column.stats),)
+
+BOARD_TREE_OPTIONS = tuple(
+    selectinload(Board.columns).options(option) for option in COLUMN_TREE_OPTIONS
+) + (selectinload(Board.stats),)
+
+COMMENT_OPTIONS = (selectinload(Comment.author),)
+
+# Reload even if the objects are already in the session, so values written by
+# the database (updated_at, defaults) and new children show up in responses
+_REFRESH = {"populate_existing": True}
+
+
+async def load_boards(db: AsyncSession, *criteria, limit: Optional[int] = None, options: tuple = BOARD_TREE_OPTIONS) -> List[Board]:
+    """Load boards matching the given criteria, oldest first, with their whole tree (or the given options) populated"""
+    stmt = select(Board).options(*options).where(*criteria).order_by(Board.created_at, Board.id).limit(limit)
+    return list((await db.scalars(stmt)).all())
+
+
+async def load_board_summaries(db: AsyncSession, *criteria, limit: Optional[int] = None) -> list:
+    """Boards matching the given criteria, oldest first, as BoardSummary rows from one aggregate query"""
+    stmt = (
+        select(
+            Board.id, Board.name, Board.description, Board.created_by, Board.is_active, Board.version,
+            Board.created_at,
+            Board.updated_at.label("last_activity"),
+            func.count(Column.id).label("column_count"),
+            # Counters maintained by app/stats.py, so no task rows are read
+            func.coalesce(BoardStats.task_count, 0).label("task_count"),
+            func.coalesce(BoardStats.open_count, 0).label("open_count"),
+        )
+        .outerjoin(Column, Column.board_id == Board.id)
+        .outerjoin(BoardStats, BoardStats.board_id == Board.id)
+        .where(*criteria)
+        .group_by(Board.id, BoardStats.board_id)
+        .order_by(Board.created_at, Board.id)
+        .limit(limit)
+    )
+    return list((await db.execute(stmt)).all())
+
+
+async def load_board(db: AsyncSession, *criteria, options: tuple = BOARD_TREE_OPTIONS) -> Optional[Board]:
+    """Load a single board matching the given criteria with its whole tree (or the given options) populated"""
+    stmt = select(Board).options(*options).where(*criteria).execution_options(**_REFRESH)
+    return (await db.scalars(stmt)).first()
+
+
+async def load_column(db: AsyncSession, *criteria) -> Optional[Column]:
+    """Load a single column (joined to its board) with its tasks populated"""
+    stmt = (
+        select(Column).join(Board).options(*COLUMN_TREE_OPTIONS).where(*criteria)
+        .execution_options(**_REFRESH)
+    )
+    return (await db.scalars(stmt)).first()
+
+
+async def load_columns(db: AsyncSession, *criteria, options: tuple = COLUMN_TREE_OPTIONS) -> List[Column]:
+    """Load columns matching the given criteria, in board order, with their tasks (or the given options) populated"""
+    stmt = (
+        select(Column).options(*options).where(*criteria).order_by(Column.board_id, Column.position, Column.id)
+        .execution_options(**_REFRESH)
+    )
+    return list((await db.scalars(stmt)).all())
+
+
+async def load_task(db: AsyncSession, *criteria, options: tuple = TASK_TREE_OPTIONS) -> Optional[Task]:
+    """Load a single task (joined to its board) with assignee and comments (or the given options) populated"""
+    stmt = (
+        select(Task).join(Board).options(*options).where(*criteria)
+        .execution_options(**_REFRESH)
+    )
+    return (await db.scalars(stmt)).first()
+
+
+async def load_tasks(
+    db: AsyncSession, *criteria, order_by: Optional[tuple] = None, limit: Optional[int] = None, options: tuple = TASK_TREE_OPTIONS
+) -> List[Task]:
+    """Load tasks matching the given criteria, in column order unless order_by is given, with their tree (or the given options) populated"""
+    stmt = (
+        select(Task).options(*options).where(*criteria)
+        .order_by(*(order_by or (Task.column_id, Task.position, Task.id))).limit(limit)
+    )
+    return list((await db.scalars(stmt)).all())
+
+
+async def load_comments(db: AsyncSession, *criteria, limit: Optional[int] = None, options: tuple = COMMENT_OPTIONS) -> List[Comment]:
+    """Load comments matching the given criteria, oldest first, with their authors (or the given options) populated"""
+    stmt = (
+        select(Comment).options(*options).where(*criteria)
+        .order_by(Comment.created_at, Comment.id).limit(limit).execution_options(**_REFRESH)
+    )
+    return list((await db.scalars(stmt)).all())
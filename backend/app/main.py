@@ -1,12 +1,18 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException, status, Request
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException, status, Request, BackgroundTasks, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update, delete, func, literal_column, Float, Integer
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+import asyncio
 import json
 import logging
-from typing import List, Optional
+from typing import List, Optional, Union
 from pydantic import BaseModel
 import os
+from datetime import datetime
 
 # Configure logging
 logging.basicConfig(
@@ -21,9 +27,24 @@ logger.info("📊 Enhanced logging is ENABLED")
 logger.info("🔍 Debug level logging is ACTIVE")
 
 from . import models, database
-from .database import get_db
-from .models import User, Board, Column, Task, Comment
-from .models import UserCreate, UserResponse, AuthResponse, BoardCreate, BoardResponse, ColumnCreate, ColumnResponse, TaskCreate, TaskResponse, CommentCreate, CommentResponse
+from .database import get_db, get_read_db
+from .models import User, Board, Column, Task, Comment, Tag, TaskTag, RefreshToken
+from .models import UserCreate, UserResponse, AuthResponse, BoardCreate, BoardResponse, BoardSummary, ColumnCreate, ColumnResponse, TaskCreate, TaskResponse, CommentCreate, CommentResponse
+from .models import RefreshRequest, TaskBatchRequest, TaskBatchResponse, PurgeJobResponse, Page, SearchResult, WorkloadResponse, BoardChangesResponse
+from .loaders import BOARD_TREE_OPTIONS, TASK_TREE_OPTIONS, COMMENT_OPTIONS, load_boards, load_board_summaries, load_board, load_columns, load_column, load_task, load_tasks, load_comments
+from .tags import resolve_tags
+from .ordering import key_between, evenly_spaced_keys, needs_rebalance, position_at_index, rebalance_positions
+from .batch import apply_task_batch, MAX_BATCH_OPERATIONS
+from .purge import create_purge_job, get_purge_job, purge_board, start_resumed_purges, run_purge_resume
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_criteria, page_of, encode_cursor, decode_cursor
+from .task_query import task_filters, parse_sort, sort_order, sort_after
+from .search import search_terms, search_documents
+from .versioning import BOARD as BOARD_ENTITY, COLUMN as COLUMN_ENTITY, TASK as TASK_ENTITY, record_changes, record_user_changes, changes_since, board_etag, etag_matches
+from .workload import compute_workload, total_metrics
+from .snapshots import get_snapshot, store_snapshot
+from . import metrics
+from .fieldsets import BOARD, BOARD_SUMMARY, TASK, COMMENT, Fieldset, parse_fieldset, loader_options, serialize
+from .stats import record_task_changes, task_figures, create_stats_rows, column_renamed, column_removed
 
 # CORS configuration (env-driven with safe localhost defaults)
 DEFAULT_ALLOWED_ORIGINS = [
@@ -56,11 +77,73 @@ class LoginCredentials(BaseModel):
     password: str
 
 from .websocket import manager, WebSocketEvent, create_event_message, notify_task_assignment
-from .auth import get_current_user, get_current_user_ws, authenticate_user, create_access_token, get_password_hash
+from .auth import get_current_user, get_current_user_ws, authenticate_user, create_user_token, hash_password
 from .seed_admin import ensure_admin_user
+from .password_pool import run_hashing
+from .rate_limit import limit_auth_attempt, limit_ip_attempt
+from .principals import invalidate_user
+from .revocations import revoke_tokens, refresh_revocations, run_revocation_refresh
+from .refresh_tokens import issue_refresh_token, rotate_refresh_token, revoke_refresh_token_family, revoke_refresh_tokens
 
 app = FastAPI(title="Kanban Board API", version="1.0.0")
 
+# Keyset pagination: list endpoints return a plain list unless ?limit= or ?after= is given
+USER_PAGE_KEYS = (User.created_at, User.id)
+BOARD_PAGE_KEYS = (Board.created_at, Board.id)
+COMMENT_PAGE_KEYS = (Comment.created_at, Comment.id)
+TASK_PAGE_KEYS = (Task.column_id, Task.position, Task.id)
+SEARCH_PAGE_KEYS = (literal_column("score", Float()), literal_column("doc_id", Integer()))
+
+class PageParams:
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; returns {items, next_cursor}"),
+        after: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    ):
+        self.paginated = limit is not None or after is not None
+        self.limit = limit or DEFAULT_PAGE_SIZE
+        self.after = after
+
+class FieldParams:
+    """?fields= / ?expand= (see app/fieldsets.py); without them endpoints return their full models"""
+    def __init__(
+        self,
+        fields: Optional[str] = Query(None, description="Comma-separated fields; dotted paths reach into expanded relations"),
+        expand: Optional[str] = Query(None, description="Comma-separated relation paths to embed; * for all"),
+    ):
+        self.fields = fields
+        self.expand = expand
+        self.sparse = fields is not None or expand is not None
+
+    def parse(self, resource) -> Fieldset:
+        return parse_fieldset(resource, self.fields, self.expand)
+
+def sparse_response(objects, fieldset: Fieldset, paginated: bool = False, next_cursor: Optional[str] = None, headers: Optional[dict] = None) -> JSONResponse:
+    """Serialize a loaded object or list of objects (as a page when paginated) for a fields/expand request"""
+    if not isinstance(objects, list):
+        content = serialize(objects, fieldset)
+    else:
+        content = [serialize(obj, fieldset) for obj in objects]
+        if paginated:
+            content = {"items": content, "next_cursor": next_cursor}
+    return JSONResponse(jsonable_encoder(content), headers=headers)
+
+class ConditionalGet:
+    """ETag / If-None-Match for reads whose content only changes with their board's version"""
+    def __init__(self, request: Request, response: Response):
+        self.if_none_match = request.headers.get("if-none-match")
+        self.response = response
+        self.headers: dict = {}
+
+    def not_modified(self, etag: str) -> Optional[Response]:
+        """A 304 when the client's copy is current; otherwise None, and the ETag goes on the response"""
+        # no-cache: clients may store the body but must revalidate it on every poll
+        self.headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(self.if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=self.headers)
+        self.response.headers.update(self.headers)
+        return None
+
 # Request logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -83,6 +166,15 @@ async def log_requests(request: Request, call_next):
     logger.info(f"🟢 RESPONSE: {response.status_code} for {request.method} {request.url}")
     return response
 
+# Read-your-writes with replicas: a write's response carries a signed deadline the client sends back
+@app.middleware("http")
+async def pin_reads_after_writes(request: Request, call_next):
+    response = await call_next(request)
+    pin = database.read_your_writes_pin(request, response.status_code)
+    if pin:
+        response.headers[database.READ_YOUR_WRITES_HEADER] = pin
+    return response
+
 # CORS middleware for frontend communication
 app.add_middleware(
     CORSMiddleware,
@@ -91,6 +183,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[database.READ_YOUR_WRITES_HEADER],
 )
 
 # OAuth2 scheme for authentication
@@ -103,10 +196,23 @@ async def startup_seed_admin() -> None:
     password = os.getenv("ADMIN_PASSWORD")
     if email and username and password:
         logger.info("🛠️  Ensuring admin user exists based on environment configuration")
-        ensure_admin_user(email=email, username=username, password=password)
+        # Blocking DB and bcrypt work: keep it off the event loop, on the hashing pool
+        await run_hashing(ensure_admin_user, email, username, password)
     else:
         logger.info("ℹ️  ADMIN_ env vars not set; skipping admin seed")
 
+# Access tokens are trusted on their claims unless revoked; load the revocations before serving
+@app.on_event("startup")
+async def startup_token_revocations() -> None:
+    await refresh_revocations()
+    asyncio.create_task(run_revocation_refresh())
+
+# Finish the purges interrupted by a restart, then keep taking over those of dead workers
+@app.on_event("startup")
+async def startup_resume_purges() -> None:
+    await start_resumed_purges()
+    asyncio.create_task(run_purge_resume())
+
 
 
 # Enhanced WebSocket endpoint for real-time updates
@@ -165,29 +271,36 @@ async def websocket_endpoint(websocket: WebSocket, board_id: int, current_user:
         manager.disconnect(board_id, current_user.id)
 
 # API Routes
-@app.get("/users", response_model=List[UserResponse])
-async def list_users(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+@app.get("/users", response_model=Union[List[UserResponse], Page[UserResponse]])
+async def list_users(page: PageParams = Depends(), current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required")
-    users = db.query(User).all()
-    return [UserResponse.model_validate(u, from_attributes=True) for u in users]
+    stmt = select(User).order_by(*USER_PAGE_KEYS)
+    if not page.paginated:
+        users = (await db.scalars(stmt)).all()
+        return [UserResponse.model_validate(u, from_attributes=True) for u in users]
+
+    stmt = stmt.where(*keyset_criteria(db, USER_PAGE_KEYS, page.after)).limit(page.limit + 1)
+    users, next_cursor = page_of((await db.scalars(stmt)).all(), USER_PAGE_KEYS, page.limit)
+    return Page[UserResponse](items=[UserResponse.model_validate(u, from_attributes=True) for u in users], next_cursor=next_cursor)
 
 @app.post("/users", response_model=UserResponse)
-async def admin_create_user(user: models.UserCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def admin_create_user(user: models.UserCreate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if not current_user or not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Admin only")
-    existing_email = db.query(User).filter(User.email == user.email).first()
+    existing_email = await db.scalar(select(User).where(User.email == user.email))
     if existing_email:
         raise HTTPException(status_code=400, detail="Email already registered")
-    existing_username = db.query(User).filter(User.username == user.username).first()
+    existing_username = await db.scalar(select(User).where(User.username == user.username))
     if existing_username:
         raise HTTPException(status_code=400, detail="Username already taken")
-    hashed = create_access_token  # placeholder to keep imports - real hash below
-    hashed = get_password_hash(user.password)
+    hashed = await hash_password(user.password)
     db_user = User(email=user.email, username=user.username, full_name=user.full_name, hashed_password=hashed)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    # SQLite can reuse the id of a deleted user
+    invalidate_user(db_user.id)
     return UserResponse.model_validate(db_user, from_attributes=True)
 
 
@@ -197,10 +310,13 @@ async def root():
     return {"message": "Kanban Board API", "version": "1.0.0", "debug": "Enhanced logging is active!"}
 
 @app.post("/auth/register", response_model=AuthResponse)
-async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user: UserCreate, request: Request, db: AsyncSession = Depends(get_db)):
     import logging
     logger = logging.getLogger(__name__)
 
+    # 429 before any query or hash (app/rate_limit.py)
+    await limit_auth_attempt(request, user.email)
+
     # Enhanced logging for debugging
     logger.info(f"📝 REGISTRATION ATTEMPT: {user.username} ({user.email})")
     logger.info(f"📧 Email: {user.email}")
@@ -213,20 +329,22 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
     logger.info(f"⚙️ Pending registration mode: {pending_registration}")
 
     # Check if user already exists
-    existing_email = db.query(User).filter(User.email == user.email).first()
+    existing_email = await db.scalar(select(User).where(User.email == user.email))
     if existing_email:
         logger.warning(f"❌ Registration failed: Email already exists: {user.email}")
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    existing_username = db.query(User).filter(User.username == user.username).first()
+    existing_username = await db.scalar(select(User).where(User.username == user.username))
     if existing_username:
         logger.warning(f"❌ Registration failed: Username already taken: {user.username}")
         raise HTTPException(status_code=400, detail="Username already taken")
+    # Nothing written yet: free the connection (the single writer under the SQLite profile) while bcrypt runs
+    await db.rollback()
 
     try:
         # Hash password and create user
         logger.info("🔨 Creating new user account...")
-        hashed_password = get_password_hash(user.password)
+        hashed_password = await hash_password(user.password)
         
         # Set is_active based on pending registration setting
         is_active = not pending_registration
@@ -240,8 +358,9 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
         )
 
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
+        invalidate_user(db_user.id)
 
         logger.info(f"✅ User account created successfully: {db_user.username} (ID: {db_user.id}, Active: {is_active})")
 
@@ -263,11 +382,14 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
             }
 
         # Create access token for immediate login
-        access_token = create_access_token(data={"sub": str(db_user.id)})
+        access_token = create_user_token(db_user)
+        refresh_token = await issue_refresh_token(db, db_user.id)
+        await db.commit()
 
         logger.info("🎉 Registration completed successfully")
         return {
             "access_token": access_token,
+            "refresh_token": refresh_token,
             "token_type": "bearer",
             "user": {
                 "id": db_user.id,
@@ -279,13 +401,16 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
                 "created_at": db_user.created_at
             }
         }
+    except HTTPException:
+        # e.g. 503 from a saturated hashing pool
+        raise
     except Exception as e:
         logger.error(f"💥 Registration error for {user.username}: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Registration failed due to server error")
 
 @app.post("/auth/login", response_model=AuthResponse)
-async def login_user(credentials: LoginCredentials, db: Session = Depends(get_db)):
+async def login_user(credentials: LoginCredentials, request: Request, db: AsyncSession = Depends(get_db), read_db: AsyncSession = Depends(get_read_db)):
     import logging
     logger = logging.getLogger(__name__)
 
@@ -308,8 +433,12 @@ async def login_user(credentials: LoginCredentials, db: Session = Depends(get_db
             detail="Username/email and password are required"
         )
 
+    # 429 before any query or hash (app/rate_limit.py); the account is limited once the user is looked up
+    await limit_ip_attempt(request)
+
     logger.info(f"🔎 Authenticating user: {username_or_email}")
-    user = authenticate_user(db, username_or_email, password)
+    # Looked up on the read session; the writer is only taken for the rehash and refresh token after bcrypt
+    user = await authenticate_user(db, username_or_email, password, read_db=read_db)
     if not user:
         logger.warning(f"❌ Login failed: Invalid credentials for {username_or_email}")
         raise HTTPException(
@@ -327,10 +456,13 @@ async def login_user(credentials: LoginCredentials, db: Session = Depends(get_db
         )
 
     logger.info(f"✅ Login successful for user: {user.username} (ID: {user.id})")
-    access_token = create_access_token(data={"sub": str(user.id)})
+    access_token = create_user_token(user)
+    refresh_token = await issue_refresh_token(db, user.id)
+    await db.commit()
 
     return {
         "access_token": access_token,
+        "refresh_token": refresh_token,
         "token_type": "bearer",
         "user": {
             "id": user.id,
@@ -343,148 +475,336 @@ async def login_user(credentials: LoginCredentials, db: Session = Depends(get_db
         }
     }
 
+@app.post("/auth/refresh", response_model=AuthResponse)
+async def refresh_access_token(body: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    # One indexed lookup and an HMAC (app/refresh_tokens.py); no password check
+    user, refresh_token = await rotate_refresh_token(db, body.refresh_token)
+    await db.commit()
+    logger.info(f"🔄 Access token refreshed for user: {user.username} (ID: {user.id})")
+    return {
+        "access_token": create_user_token(user),
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "user": UserResponse.model_validate(user, from_attributes=True),
+    }
+
+@app.post("/auth/logout")
+async def logout_user(body: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    await revoke_refresh_token_family(db, body.refresh_token)
+    await db.commit()
+    return {"message": "Logged out"}
+
 # Board endpoints
-@app.get("/boards", response_model=List[BoardResponse])
-async def get_boards(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+@app.get("/boards", response_model=Union[List[BoardSummary], Page[BoardSummary]])
+async def get_boards(page: PageParams = Depends(), fieldset: FieldParams = Depends(), current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required")
-    # Return all boards (visible to every authenticated user)
-    boards = db.query(Board).all()
-    return [BoardResponse.from_orm(board) for board in boards]
+    # Return all boards (visible to every authenticated user) except deleted ones awaiting purge
+    criteria = [Board.is_active == True]
+    limit = None
+    if page.paginated:
+        criteria += keyset_criteria(db, BOARD_PAGE_KEYS, page.after)
+        limit = page.limit + 1
+
+    if fieldset.expand is not None:
+        parsed = fieldset.parse(BOARD)
+        boards = await load_boards(db, *criteria, limit=limit, options=loader_options(parsed, BOARD_PAGE_KEYS))
+    else:
+        # Without expand boards are listed as summaries from one aggregate query
+        parsed = fieldset.parse(BOARD_SUMMARY) if fieldset.sparse else None
+        boards = [BoardSummary.model_validate(row) for row in await load_board_summaries(db, *criteria, limit=limit)]
+
+    next_cursor = None
+    if page.paginated:
+        boards, next_cursor = page_of(boards, BOARD_PAGE_KEYS, page.limit)
+    if parsed:
+        return sparse_response(boards, parsed, page.paginated, next_cursor)
+    return Page[BoardSummary](items=boards, next_cursor=next_cursor) if page.paginated else boards
 
 @app.post("/boards", response_model=BoardResponse)
-async def create_board(board: BoardCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def create_board(board: BoardCreate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required")
 
     db_board = Board(name=board.name, description=board.description, created_by=current_user.id)
     db.add(db_board)
-    db.commit()
-    db.refresh(db_board)
+    await db.commit()
+    await db.refresh(db_board)
 
     # Create default columns
-    default_columns = [
-        {"name": "Backlog", "position": 0},
-        {"name": "To Do", "position": 1},
-        {"name": "In Progress", "position": 2},
-        {"name": "Done", "position": 3}
-    ]
+    default_columns = ["Backlog", "To Do", "In Progress", "Done"]
 
-    for col_data in default_columns:
-        db_column = Column(name=col_data["name"], board_id=db_board.id, position=col_data["position"])
-        db.add(db_column)
+    db_columns = [
+        Column(name=name, board_id=db_board.id, position=position)
+        for name, position in zip(default_columns, evenly_spaced_keys(len(default_columns)))
+    ]
+    db.add_all(db_columns)
+    await db.flush()
+    await create_stats_rows(db, db_board.id, [db_column.id for db_column in db_columns], board=True)
 
-    db.commit()
-    db.refresh(db_board)
+    await db.commit()
+    db_board = await load_board(db, Board.id == db_board.id)
     return BoardResponse.from_orm(db_board)
 
 @app.get("/boards/{board_id}", response_model=BoardResponse)
-async def get_board(board_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_board(board_id: int, fieldset: FieldParams = Depends(), conditional: ConditionalGet = Depends(), current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Authentication required")
+
+    # Unchanged polls stop at this lookup
+    current = (await db.execute(
+        select(Board.version, Board.created_at)
+        .where(Board.id == board_id, Board.created_by == current_user.id, Board.is_active == True)
+    )).first()
+    if not current:
+        raise HTTPException(status_code=404, detail="Board not found")
+    etag = board_etag(board_id, current.version, current.created_at, "board", fieldset.fields, fieldset.expand)
+    not_modified = conditional.not_modified(etag)
+    if not_modified:
+        return not_modified
+
+    # Full trees are served from the snapshot cache (app/snapshots.py) while the version holds
+    if not fieldset.sparse:
+        body = get_snapshot(board_id, current.version)
+        if body is not None:
+            return Response(body, media_type="application/json", headers=conditional.headers)
+
+    parsed = fieldset.parse(BOARD) if fieldset.sparse else None
+    board = await load_board(
+        db, Board.id == board_id, Board.created_by == current_user.id, Board.is_active == True,
+        options=loader_options(parsed) if parsed else BOARD_TREE_OPTIONS
+    )
+    if not board:
+        raise HTTPException(status_code=404, detail="Board not found")
+    if parsed:
+        return sparse_response(board, parsed, headers=conditional.headers)
+    response = JSONResponse(jsonable_encoder(BoardResponse.from_orm(board)), headers=conditional.headers)
+    store_snapshot(board_id, current.version, response.body)
+    return response
+
+@app.get("/boards/{board_id}/changes", response_model=BoardChangesResponse)
+async def get_board_changes(
+    board_id: int,
+    since: int = Query(..., ge=0, description="Board version of the client's copy"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required")
 
-    board = db.query(Board).filter(Board.id == board_id, Board.created_by == current_user.id).first()
+    board = await load_board(
+        db, Board.id == board_id, Board.created_by == current_user.id, Board.is_active == True,
+        options=(selectinload(Board.stats),)
+    )
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
-    return BoardResponse.from_orm(board)
+    # Older changes were compacted away (or the version is from another database): reload the board
+    if since < board.compacted_version or since > board.version:
+        raise HTTPException(status_code=410, detail="Changes since this version are no longer available; reload the board")
+
+    changed = {COLUMN_ENTITY: [], TASK_ENTITY: []}
+    deleted = {"columns": [], "tasks": []}
+    for entity, entity_id, is_deleted in await changes_since(db, board_id, since, board.version):
+        if entity == BOARD_ENTITY:
+            continue
+        if is_deleted:
+            deleted[f"{entity}s"].append(entity_id)
+        else:
+            changed[entity].append(entity_id)
+
+    columns = await load_columns(db, Column.id.in_(changed[COLUMN_ENTITY]), options=(selectinload(Column.stats),)) if changed[COLUMN_ENTITY] else []
+    tasks = await load_tasks(db, Task.id.in_(changed[TASK_ENTITY])) if changed[TASK_ENTITY] else []
+    return BoardChangesResponse(
+        board_id=board_id,
+        version=board.version,
+        board=BoardResponse.from_orm(board),
+        columns=[ColumnResponse.from_orm(column) for column in columns],
+        tasks=[TaskResponse.from_orm(task) for task in tasks],
+        deleted=deleted,
+    )
 
-@app.delete("/boards/{board_id}")
-async def delete_board(board_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+@app.delete("/boards/{board_id}", status_code=status.HTTP_202_ACCEPTED)
+async def delete_board(board_id: int, background_tasks: BackgroundTasks, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required")
 
     # Verify board ownership
-    board = db.query(Board).filter(Board.id == board_id, Board.created_by == current_user.id).first()
+    board = await db.scalar(select(Board).where(Board.id == board_id, Board.created_by == current_user.id, Board.is_active == True))
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
 
-    # Delete all tasks, columns, and comments associated with the board
-    # First delete tasks (which will cascade to comments)
-    db.query(Task).filter(Task.board_id == board_id).delete()
+    # Soft-delete now; comments, tasks and columns are removed in chunks by a background job
+    board.is_active = False
+    version = await record_changes(db, board_id, [(BOARD_ENTITY, board_id, True)])
+    job = create_purge_job(db, board_id, current_user.id)
+    await db.commit()
+
+    background_tasks.add_task(purge_board, job.id, board_id)
+    logger.info(f"🗑️ Board {board_id} deleted by {current_user.username}; purge job {job.id} queued")
+
+    delete_message = create_event_message(
+        WebSocketEvent.BOARD_DELETED,
+        {
+            "id": board_id,
+            "deleted_by": current_user.username
+        },
+        board_id=board_id,
+        version=version
+    )
+    await manager.broadcast_to_board(delete_message, board_id, exclude_user_id=current_user.id)
 
-    # Then delete columns
-    db.query(Column).filter(Column.board_id == board_id).delete()
+    return {"message": "Board deleted successfully", "job_id": job.id, "status_url": f"/jobs/{job.id}"}
 
-    # Finally delete the board
-    db.delete(board)
-    db.commit()
+@app.get("/jobs/{job_id}", response_model=PurgeJobResponse)
+async def get_job(job_id: str, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Authentication required")
 
-    return {"message": "Board deleted successfully"}
+    job = await get_purge_job(db, job_id)
+    if not job or (job.requested_by != current_user.id and not getattr(current_user, "is_admin", False)):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return PurgeJobResponse.model_validate(job)
 
 # Column endpoints
 @app.post("/boards/{board_id}/columns", response_model=ColumnResponse)
-async def create_column(board_id: int, column: ColumnCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def create_column(board_id: int, column: ColumnCreate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required")
 
     # Verify board ownership
-    board = db.query(Board).filter(Board.id == board_id, Board.created_by == current_user.id).first()
+    board = await db.scalar(select(Board).where(Board.id == board_id, Board.created_by == current_user.id, Board.is_active == True))
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
 
-    db_column = Column(name=column.name, board_id=board_id, position=column.position)
+    position, rebalance = await position_at_index(db, Column, Column.board_id == board_id, column.position)
+    db_column = Column(name=column.name, board_id=board_id, position=position)
     db.add(db_column)
-    db.commit()
-    db.refresh(db_column)
-    return db_column
+    await db.flush()
+    await create_stats_rows(db, board_id, [db_column.id])
+    rebalanced = await rebalance_positions(db, Column, Column.board_id, board_id) if rebalance else {}
+    version = await record_changes(
+        db, board_id, [(COLUMN_ENTITY, column_id, False) for column_id in [db_column.id, *rebalanced]]
+    )
+    await db.commit()
+    db_column = await load_column(db, Column.id == db_column.id)
+
+    column_message = create_event_message(
+        WebSocketEvent.COLUMN_CREATED,
+        {
+            "id": db_column.id,
+            "name": db_column.name,
+            "position": db_column.position,
+            "created_by": current_user.username
+        },
+        board_id=board_id,
+        version=version
+    )
+    await manager.broadcast_to_board(column_message, board_id, exclude_user_id=current_user.id)
+
+    return ColumnResponse.from_orm(db_column)
 
 @app.put("/columns/{column_id}", response_model=ColumnResponse)
-async def update_column(column_id: int, column_update: ColumnCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def update_column(column_id: int, column_update: ColumnCreate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required")
 
-    column = db.query(Column).join(Board).filter(
+    column = await db.scalar(select(Column).join(Board).where(
         Column.id == column_id,
-        Board.created_by == current_user.id
-    ).first()
+        Board.created_by == current_user.id, Board.is_active == True
+    ))
 
     if not column:
         raise HTTPException(status_code=404, detail="Column not found")
 
     column.name = column_update.name
-    column.position = column_update.position
-    db.commit()
-    db.refresh(column)
-    return column
+    await column_renamed(db, column.id, column.board_id, column.name)
+    column.position, rebalance = await position_at_index(
+        db, Column, Column.board_id == column.board_id, column_update.position, exclude_id=column.id
+    )
+    board_id = column.board_id
+    rebalanced = {}
+    if rebalance:
+        await db.flush()
+        rebalanced = await rebalance_positions(db, Column, Column.board_id, board_id)
+    version = await record_changes(
+        db, board_id, [(COLUMN_ENTITY, changed_id, False) for changed_id in [column_id, *rebalanced]]
+    )
+    await db.commit()
+    column = await load_column(db, Column.id == column_id)
+
+    column_message = create_event_message(
+        WebSocketEvent.COLUMN_UPDATED,
+        {
+            "id": column.id,
+            "name": column.name,
+            "position": column.position,
+            "updated_by": current_user.username
+        },
+        board_id=board_id,
+        version=version
+    )
+    await manager.broadcast_to_board(column_message, board_id, exclude_user_id=current_user.id)
+
+    return ColumnResponse.from_orm(column)
 
 @app.delete("/columns/{column_id}")
-async def delete_column(column_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def delete_column(column_id: int, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required")
 
-    column = db.query(Column).join(Board).filter(
+    column = await db.scalar(select(Column).join(Board).where(
         Column.id == column_id,
-        Board.created_by == current_user.id
-    ).first()
+        Board.created_by == current_user.id, Board.is_active == True
+    ))
 
     if not column:
         raise HTTPException(status_code=404, detail="Column not found")
 
-    db.delete(column)
-    db.commit()
+    # Its tasks go with it
+    board_id = column.board_id
+    task_ids = (await db.scalars(select(Task.id).where(Task.column_id == column_id))).all()
+    await column_removed(db, column_id, board_id)
+    await db.delete(column)
+    version = await record_changes(
+        db, board_id, [(COLUMN_ENTITY, column_id, True)] + [(TASK_ENTITY, task_id, True) for task_id in task_ids]
+    )
+    await db.commit()
+
+    column_message = create_event_message(
+        WebSocketEvent.COLUMN_DELETED,
+        {
+            "id": column_id,
+            "deleted_by": current_user.username
+        },
+        board_id=board_id,
+        version=version
+    )
+    await manager.broadcast_to_board(column_message, board_id, exclude_user_id=current_user.id)
+
     return {"message": "Column deleted successfully"}
 
 # Task endpoints
 @app.post("/boards/{board_id}/tasks", response_model=TaskResponse)
-async def create_task(board_id: int, task: TaskCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def create_task(board_id: int, task: TaskCreate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required")
 
     # Verify board ownership
-    board = db.query(Board).filter(Board.id == board_id, Board.created_by == current_user.id).first()
+    board = await db.scalar(select(Board).where(Board.id == board_id, Board.created_by == current_user.id, Board.is_active == True))
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
 
     # Get the column
-    column = db.query(Column).filter(Column.id == task.column_id).first()
+    column = await db.get(Column, task.column_id)
     if not column or column.board_id != board_id:
         raise HTTPException(status_code=404, detail="Column not found")
 
-    # Get max position for the column
-    max_position = db.query(Task).filter(Task.column_id == task.column_id).count()
+    # Append after the column's last order key (one row read from the (column_id, position) index)
+    last_position = await db.scalar(select(func.max(Task.position)).where(Task.column_id == task.column_id))
+    position = key_between(last_position, None)
 
-    # Convert tags array to JSON string for storage
-    tags_json = json.dumps(task.tags) if task.tags else None
+    # Resolve tag names to shared Tag rows
+    tags = await resolve_tags(db, task.tags)
     
     db_task = Task(
         title=task.title,
@@ -493,18 +813,26 @@ async def create_task(board_id: int, task: TaskCreate, current_user: User = Depe
         column_id=task.column_id,
         assignee_id=task.assignee_id,
         priority=task.priority,
-        tags=tags_json,
+        tags=tags,
         due_date=task.due_date,
         estimated_hours=task.estimated_hours,
         hours_used=task.hours_used,
         completed_hours=task.completed_hours,
         created_by=current_user.id,
-        position=max_position
+        position=position
     )
 
     db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    await db.flush()
+    rebalanced = await rebalance_positions(db, Task, Task.column_id, task.column_id) if needs_rebalance(position) else {}
+    columns = await record_task_changes(db, board_id, [(task.column_id, 1, task_figures(task))])
+    version = await record_changes(
+        db, board_id,
+        [(TASK_ENTITY, task_id, False) for task_id in [db_task.id, *rebalanced]]
+        + [(COLUMN_ENTITY, column_id, False) for column_id in columns]
+    )
+    await db.commit()
+    db_task = await load_task(db, Task.id == db_task.id)
 
     # Broadcast task creation via WebSocket
     task_message = create_event_message(
@@ -516,7 +844,8 @@ async def create_task(board_id: int, task: TaskCreate, current_user: User = Depe
             "position": db_task.position,
             "created_by": current_user.username
         },
-        board_id=board_id
+        board_id=board_id,
+        version=version
     )
     await manager.broadcast_to_board(task_message, board_id, exclude_user_id=current_user.id)
 
@@ -526,100 +855,306 @@ async def create_task(board_id: int, task: TaskCreate, current_user: User = Depe
 
     return TaskResponse.from_orm(db_task)
 
+@app.post("/boards/{board_id}/tasks:batch", response_model=TaskBatchResponse)
+async def batch_tasks(board_id: int, batch: TaskBatchRequest, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Authentication required")
+
+    if len(batch.operations) > MAX_BATCH_OPERATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_OPERATIONS} operations per batch")
+
+    board = await db.scalar(select(Board).where(Board.id == board_id, Board.created_by == current_user.id, Board.is_active == True))
+    if not board:
+        raise HTTPException(status_code=404, detail="Board not found")
+
+    # All-or-nothing: any invalid operation rejects the whole batch, with 422 if a payload failed validation
+    results, rebalance, columns = await apply_task_batch(db, board_id, current_user.id, batch.operations)
+    errors = [result.status_code for result in results if result.status == "error"]
+    if errors:
+        await db.rollback()
+        raise HTTPException(status_code=max(errors), detail=[result.model_dump() for result in results])
+
+    rebalanced = {}
+    for column_id in rebalance:
+        rebalanced.update(await rebalance_positions(db, Task, Task.column_id, column_id))
+    for result in results:
+        result.position = rebalanced.get(result.task_id, result.position)
+
+    version = await record_changes(
+        db, board_id,
+        [(TASK_ENTITY, task_id, False) for task_id in rebalanced]
+        + [(TASK_ENTITY, result.task_id, result.op == "delete") for result in results]
+        + [(COLUMN_ENTITY, column_id, False) for column_id in columns]
+    )
+    await db.commit()
+    logger.info(f"📦 Applied {len(results)} batched task operations on board {board_id}")
+
+    # One coalesced event instead of one per operation
+    batch_message = create_event_message(
+        WebSocketEvent.TASKS_BATCH,
+        {
+            "operations": [result.model_dump(exclude={"status", "detail", "status_code"}) for result in results],
+            "updated_by": current_user.username
+        },
+        board_id=board_id,
+        version=version
+    )
+    await manager.broadcast_to_board(batch_message, board_id, exclude_user_id=current_user.id)
+
+    return TaskBatchResponse(results=results)
+
+@app.get("/boards/{board_id}/tasks", response_model=Union[List[TaskResponse], Page[TaskResponse]])
+async def get_board_tasks(board_id: int, tag: Optional[str] = None, page: PageParams = Depends(), fieldset: FieldParams = Depends(), current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Authentication required")
+
+    board = await db.scalar(select(Board).where(Board.id == board_id, Board.created_by == current_user.id, Board.is_active == True))
+    if not board:
+        raise HTTPException(status_code=404, detail="Board not found")
+
+    criteria = [Task.board_id == board_id]
+    if tag:
+        # Resolved through the unique tags.name index and task_tags(tag_id, task_id)
+        criteria.append(Task.id.in_(
+            select(TaskTag.task_id).join(Tag, Tag.id == TaskTag.tag_id).where(Tag.name == tag)
+        ))
+    parsed = fieldset.parse(TASK) if fieldset.sparse else None
+    options = loader_options(parsed, TASK_PAGE_KEYS) if parsed else TASK_TREE_OPTIONS
+    if not page.paginated:
+        tasks = await load_tasks(db, *criteria, options=options)
+        if parsed:
+            return sparse_response(tasks, parsed)
+        return [TaskResponse.from_orm(task) for task in tasks]
+
+    # Pages follow board order: column, then position within the column
+    tasks = await load_tasks(
+        db, *criteria, *keyset_criteria(db, TASK_PAGE_KEYS, page.after), limit=page.limit + 1, options=options
+    )
+    tasks, next_cursor = page_of(tasks, TASK_PAGE_KEYS, page.limit)
+    if parsed:
+        return sparse_response(tasks, parsed, True, next_cursor)
+    return Page[TaskResponse](items=[TaskResponse.from_orm(task) for task in tasks], next_cursor=next_cursor)
+
+# Declared before /tasks/{task_id} so "search" is not parsed as a task id
+@app.get("/tasks/search", response_model=Page[TaskResponse])
+async def search_tasks(
+    board_id: Optional[int] = None,
+    column_id: Optional[int] = None,
+    assignee_id: Optional[int] = None,
+    priority: Optional[List[str]] = Query(None),
+    tag: Optional[List[str]] = Query(None),
+    due_after: Optional[datetime] = None,
+    due_before: Optional[datetime] = None,
+    is_active: Optional[bool] = None,
+    sort: str = "position",
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fieldset: FieldParams = Depends(),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Authentication required")
+
+    try:
+        keys, descending = parse_sort(sort)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    criteria = task_filters(
+        current_user.id,
+        board_id=board_id,
+        column_id=column_id,
+        assignee_id=assignee_id,
+        priority=priority,
+        tag=tag,
+        due_after=due_after,
+        due_before=due_before,
+        is_active=is_active,
+    )
+    parsed = fieldset.parse(TASK) if fieldset.sparse else None
+    tasks = await load_tasks(
+        db, *criteria, *sort_after(db, keys, descending, after),
+        order_by=sort_order(keys, descending), limit=limit + 1,
+        options=loader_options(parsed, keys) if parsed else TASK_TREE_OPTIONS
+    )
+    tasks, next_cursor = page_of(tasks, keys, limit)
+    if parsed:
+        return sparse_response(tasks, parsed, True, next_cursor)
+    return Page[TaskResponse](items=[TaskResponse.from_orm(task) for task in tasks], next_cursor=next_cursor)
+
 @app.get("/tasks/{task_id}", response_model=TaskResponse)
-async def get_task(task_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_task(task_id: int, fieldset: FieldParams = Depends(), conditional: ConditionalGet = Depends(), current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required")
 
-    task = db.query(Task).join(Board).filter(
-        Task.id == task_id,
-        Board.created_by == current_user.id
-    ).first()
+    current = (await db.execute(
+        select(Board.id, Board.version, Board.created_at).join(Task, Task.board_id == Board.id)
+        .where(Task.id == task_id, Board.created_by == current_user.id, Board.is_active == True)
+    )).first()
+    if not current:
+        raise HTTPException(status_code=404, detail="Task not found")
+    etag = board_etag(current.id, current.version, current.created_at, "task", task_id, fieldset.fields, fieldset.expand)
+    not_modified = conditional.not_modified(etag)
+    if not_modified:
+        return not_modified
+
+    parsed = fieldset.parse(TASK) if fieldset.sparse else None
+    task = await load_task(
+        db, Task.id == task_id, Board.created_by == current_user.id, Board.is_active == True,
+        options=loader_options(parsed) if parsed else TASK_TREE_OPTIONS
+    )
 
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
+    if parsed:
+        return sparse_response(task, parsed, headers=conditional.headers)
     return TaskResponse.from_orm(task)
 
 @app.put("/tasks/{task_id}", response_model=TaskResponse)
-async def update_task(task_id: int, task_update: TaskCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def update_task(task_id: int, task_update: TaskCreate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required")
 
-    task = db.query(Task).join(Board).filter(
+    task = await db.scalar(select(Task).join(Board).options(selectinload(Task.tags)).where(
         Task.id == task_id,
-        Board.created_by == current_user.id
-    ).first()
+        Board.created_by == current_user.id, Board.is_active == True
+    ))
 
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
+    if task_update.column_id != task.column_id:
+        # Verify the new column exists and belongs to the same board
+        new_column = await db.scalar(select(Column).where(
+            Column.id == task_update.column_id,
+            Column.board_id == task.board_id
+        ))
+
+        if not new_column:
+            raise HTTPException(status_code=404, detail="Target column not found")
+
     # Update task fields
+    before = (task.column_id, -1, task_figures(task))
     update_payload = task_update.dict(exclude_unset=True)
-    # Convert tags list to JSON string for storage
+    # Tags live in task_tags; replace the task's set with the given names
     if "tags" in update_payload:
-        try:
-            update_payload["tags"] = json.dumps(update_payload["tags"]) if update_payload["tags"] is not None else None
-        except Exception:
-            update_payload["tags"] = None
+        task.tags = await resolve_tags(db, update_payload.pop("tags") or [])
 
     for field, value in update_payload.items():
         setattr(task, field, value)
 
-    db.commit()
-    db.refresh(task)
+    board_id = task.board_id
+    columns = await record_task_changes(db, board_id, [before, (task.column_id, 1, task_figures(task))])
+    version = await record_changes(
+        db, board_id, [(TASK_ENTITY, task_id, False)] + [(COLUMN_ENTITY, column_id, False) for column_id in columns]
+    )
+    await db.commit()
+    task = await load_task(db, Task.id == task_id)
+
+    update_message = create_event_message(
+        WebSocketEvent.TASK_UPDATED,
+        {
+            "id": task.id,
+            "title": task.title,
+            "column_id": task.column_id,
+            "position": task.position,
+            "updated_by": current_user.username
+        },
+        board_id=board_id,
+        version=version
+    )
+    await manager.broadcast_to_board(update_message, board_id, exclude_user_id=current_user.id)
+
     return TaskResponse.from_orm(task)
 
 @app.put("/tasks/{task_id}/move", response_model=TaskResponse)
-async def move_task(task_id: int, move_data: dict, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def move_task(task_id: int, move_data: dict, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required")
 
     # Get the task
-    task = db.query(Task).join(Board).filter(
+    task = await db.scalar(select(Task).join(Board).where(
         Task.id == task_id,
-        Board.created_by == current_user.id
-    ).first()
+        Board.created_by == current_user.id, Board.is_active == True
+    ))
 
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    # Get new column and position from move_data
-    new_column_id = move_data.get("column_id")
-    new_position = move_data.get("position", 0)
+    # Get new column and target index from move_data (column defaults to the current one)
+    new_column_id = move_data.get("column_id") or task.column_id
+    new_index = move_data.get("position", 0)
     
-    if new_column_id:
+    if new_column_id != task.column_id:
         # Verify the new column exists and belongs to the same board
-        new_column = db.query(Column).filter(
+        new_column = await db.scalar(select(Column).where(
             Column.id == new_column_id,
             Column.board_id == task.board_id
-        ).first()
+        ))
         
         if not new_column:
             raise HTTPException(status_code=404, detail="Target column not found")
-        
-        # Update task's column and position
-        task.column_id = new_column_id
-        task.position = new_position
 
-    db.commit()
-    db.refresh(task)
-    return TaskResponse.from_orm(task)
+    # Only the moved row is rewritten: its key goes between its new neighbours
+    position, rebalance = await position_at_index(
+        db, Task, Task.column_id == new_column_id, new_index, exclude_id=task.id
+    )
+    board_id, old_column_id = task.board_id, task.column_id
+    columns = set()
+    if new_column_id != old_column_id:
+        figures = task_figures(task)
+        columns = await record_task_changes(db, board_id, [(old_column_id, -1, figures), (new_column_id, 1, figures)])
+    task.column_id = new_column_id
+    task.position = position
+    rebalanced = {}
+    if rebalance:
+        await db.flush()
+        rebalanced = await rebalance_positions(db, Task, Task.column_id, new_column_id)
+        position = rebalanced[task_id]
+
+    version = await record_changes(
+        db, board_id,
+        [(TASK_ENTITY, changed_id, False) for changed_id in [task_id, *rebalanced]]
+        + [(COLUMN_ENTITY, column_id, False) for column_id in columns]
+    )
+    await db.commit()
+
+    move_message = create_event_message(
+        WebSocketEvent.TASK_MOVED,
+        {
+            "id": task_id,
+            "from_column_id": old_column_id,
+            "column_id": new_column_id,
+            "position": position,
+            "moved_by": current_user.username
+        },
+        board_id=board_id,
+        version=version
+    )
+    await manager.broadcast_to_board(move_message, board_id, exclude_user_id=current_user.id)
+
+    return TaskResponse.from_orm(await load_task(db, Task.id == task_id))
 
 @app.delete("/tasks/{task_id}")
-async def delete_task(task_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def delete_task(task_id: int, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required")
 
-    task = db.query(Task).join(Board).filter(
+    task = await db.scalar(select(Task).join(Board).where(
         Task.id == task_id,
-        Board.created_by == current_user.id
-    ).first()
+        Board.created_by == current_user.id, Board.is_active == True
+    ))
 
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    db.delete(task)
-    db.commit()
+    columns = await record_task_changes(db, task.board_id, [(task.column_id, -1, task_figures(task))])
+    await db.delete(task)
+    version = await record_changes(
+        db, task.board_id, [(TASK_ENTITY, task_id, True)] + [(COLUMN_ENTITY, column_id, False) for column_id in columns]
+    )
+    await db.commit()
 
     # Broadcast task deletion via WebSocket
     delete_message = create_event_message(
@@ -628,7 +1163,8 @@ async def delete_task(task_id: int, current_user: User = Depends(get_current_use
             "id": task_id,
             "deleted_by": current_user.username
         },
-        board_id=task.board_id
+        board_id=task.board_id,
+        version=version
     )
     await manager.broadcast_to_board(delete_message, task.board_id, exclude_user_id=current_user.id)
 
@@ -636,15 +1172,15 @@ async def delete_task(task_id: int, current_user: User = Depends(get_current_use
 
 # Comment endpoints
 @app.post("/tasks/{task_id}/comments", response_model=CommentResponse)
-async def create_comment(task_id: int, comment: CommentCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def create_comment(task_id: int, comment: CommentCreate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required")
 
     # Verify task exists and user has access
-    task = db.query(Task).join(Board).filter(
+    task = await db.scalar(select(Task).join(Board).where(
         Task.id == task_id,
-        Board.created_by == current_user.id
-    ).first()
+        Board.created_by == current_user.id, Board.is_active == True
+    ))
 
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -656,8 +1192,10 @@ async def create_comment(task_id: int, comment: CommentCreate, current_user: Use
     )
 
     db.add(db_comment)
-    db.commit()
-    db.refresh(db_comment)
+    # The task's comments changed
+    version = await record_changes(db, task.board_id, [(TASK_ENTITY, task_id, False)])
+    await db.commit()
+    db_comment, = await load_comments(db, Comment.id == db_comment.id)
 
     # Broadcast comment creation via WebSocket
     comment_message = create_event_message(
@@ -669,27 +1207,55 @@ async def create_comment(task_id: int, comment: CommentCreate, current_user: Use
             "author_id": current_user.id,
             "author_name": current_user.username
         },
-        board_id=task.board_id
+        board_id=task.board_id,
+        version=version
     )
     await manager.broadcast_to_board(comment_message, task.board_id, exclude_user_id=current_user.id)
 
     return db_comment
 
-@app.get("/tasks/{task_id}/comments", response_model=List[CommentResponse])
-async def get_task_comments(task_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+@app.get("/tasks/{task_id}/comments", response_model=Union[List[CommentResponse], Page[CommentResponse]])
+async def get_task_comments(task_id: int, page: PageParams = Depends(), fieldset: FieldParams = Depends(), conditional: ConditionalGet = Depends(), current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required")
 
-    comments = db.query(Comment).filter(Comment.task_id == task_id).all()
-    return comments
+    current = (await db.execute(
+        select(Board.id, Board.version, Board.created_at).join(Task, Task.board_id == Board.id).where(Task.id == task_id)
+    )).first()
+    # Comments of a missing task are an empty list, as before; it gets no ETag
+    if current:
+        etag = board_etag(
+            current.id, current.version, current.created_at,
+            "comments", task_id, page.paginated, page.limit, page.after, fieldset.fields, fieldset.expand,
+        )
+        not_modified = conditional.not_modified(etag)
+        if not_modified:
+            return not_modified
+
+    parsed = fieldset.parse(COMMENT) if fieldset.sparse else None
+    options = loader_options(parsed, COMMENT_PAGE_KEYS) if parsed else COMMENT_OPTIONS
+    if not page.paginated:
+        comments = await load_comments(db, Comment.task_id == task_id, options=options)
+        if parsed:
+            return sparse_response(comments, parsed, headers=conditional.headers)
+        return comments
+
+    comments = await load_comments(
+        db, Comment.task_id == task_id, *keyset_criteria(db, COMMENT_PAGE_KEYS, page.after), limit=page.limit + 1,
+        options=options
+    )
+    comments, next_cursor = page_of(comments, COMMENT_PAGE_KEYS, page.limit)
+    if parsed:
+        return sparse_response(comments, parsed, True, next_cursor, headers=conditional.headers)
+    return Page[CommentResponse](items=comments, next_cursor=next_cursor)
 
 # Comment management endpoints
 @app.put("/comments/{comment_id}", response_model=CommentResponse)
-async def update_comment(comment_id: int, comment_update: CommentCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def update_comment(comment_id: int, comment_update: CommentCreate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required")
 
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
+    comment = await db.get(Comment, comment_id)
     if not comment:
         raise HTTPException(status_code=404, detail="Comment not found")
 
@@ -698,16 +1264,18 @@ async def update_comment(comment_id: int, comment_update: CommentCreate, current
         raise HTTPException(status_code=403, detail="Not allowed to edit this comment")
 
     comment.content = comment_update.content
-    db.commit()
-    db.refresh(comment)
+    board_id = await db.scalar(select(Task.board_id).where(Task.id == comment.task_id))
+    await record_changes(db, board_id, [(TASK_ENTITY, comment.task_id, False)])
+    await db.commit()
+    comment, = await load_comments(db, Comment.id == comment_id)
     return comment
 
 @app.delete("/comments/{comment_id}")
-async def delete_comment(comment_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def delete_comment(comment_id: int, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required")
 
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
+    comment = await db.get(Comment, comment_id)
     if not comment:
         raise HTTPException(status_code=404, detail="Comment not found")
 
@@ -715,68 +1283,184 @@ async def delete_comment(comment_id: int, current_user: User = Depends(get_curre
     if comment.author_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not allowed to delete this comment")
 
-    db.delete(comment)
-    db.commit()
+    board_id = await db.scalar(select(Task.board_id).where(Task.id == comment.task_id))
+    await record_changes(db, board_id, [(TASK_ENTITY, comment.task_id, False)])
+    await db.delete(comment)
+    await db.commit()
     return {"message": "Comment deleted"}
 
+# Full-text search
+@app.get("/search", response_model=Page[SearchResult])
+async def search(
+    q: str,
+    board_id: Optional[int] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Authentication required")
+
+    terms = search_terms(q)
+    if not terms:
+        return Page[SearchResult](items=[], next_cursor=None)
+
+    # Cursor: (score, doc_id) of the last hit, see app/search.py
+    cursor = decode_cursor(after, SEARCH_PAGE_KEYS) if after else None
+    hits = await search_documents(db, terms, current_user.id, board_id=board_id, limit=limit + 1, after=cursor)
+    next_cursor = None
+    if len(hits) > limit:
+        hits = hits[:limit]
+        next_cursor = encode_cursor([hits[-1]["score"], hits[-1]["doc_id"]])
+    return Page[SearchResult](items=[SearchResult(**hit) for hit in hits], next_cursor=next_cursor)
+
+# Workload
+@app.get("/workload", response_model=WorkloadResponse)
+async def get_workload(board_id: Optional[int] = None, assignee_id: Optional[int] = None, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Authentication required")
+
+    criteria = [Board.created_by == current_user.id, Board.is_active == True]
+    if board_id is not None:
+        criteria.append(Board.id == board_id)
+    board_versions = dict((await db.execute(select(Board.id, Board.version).where(*criteria))).all())
+    if board_id is not None and not board_versions:
+        raise HTTPException(status_code=404, detail="Board not found")
+
+    # One GROUP BY query, skipped while the boards' versions are unchanged
+    entries = await compute_workload(db, board_versions, assignee_id)
+    return WorkloadResponse(board_ids=sorted(board_versions), assignees=entries, totals=total_metrics(entries))
+
 # Admin-only: Get pending users
-@app.get("/users/pending", response_model=List[UserResponse])
-async def get_pending_users(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+@app.get("/users/pending", response_model=Union[List[UserResponse], Page[UserResponse]])
+async def get_pending_users(page: PageParams = Depends(), current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
     if not current_user or not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Admin only")
     
-    pending_users = db.query(User).filter(User.is_active == False).all()
-    return [UserResponse.model_validate(u, from_attributes=True) for u in pending_users]
+    stmt = select(User).where(User.is_active == False).order_by(*USER_PAGE_KEYS)
+    if not page.paginated:
+        pending_users = (await db.scalars(stmt)).all()
+        return [UserResponse.model_validate(u, from_attributes=True) for u in pending_users]
+
+    stmt = stmt.where(*keyset_criteria(db, USER_PAGE_KEYS, page.after)).limit(page.limit + 1)
+    pending_users, next_cursor = page_of((await db.scalars(stmt)).all(), USER_PAGE_KEYS, page.limit)
+    return Page[UserResponse](items=[UserResponse.model_validate(u, from_attributes=True) for u in pending_users], next_cursor=next_cursor)
 
 # Admin-only: Approve a pending user
 @app.post("/users/{user_id}/approve", response_model=UserResponse)
-async def approve_user(user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def approve_user(user_id: int, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if not current_user or not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Admin only")
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     user.is_active = True
-    db.commit()
-    db.refresh(user)
+    # Users are embedded in task and comment responses
+    await record_user_changes(db, user_id)
+    await db.commit()
+    invalidate_user(user_id)
+    await db.refresh(user)
     
     logger.info(f"✅ User approved: {user.username} (ID: {user.id}) by admin {current_user.username}")
     return UserResponse.model_validate(user, from_attributes=True)
 
 # Admin-only: Promote a user to admin
 @app.post("/users/{user_id}/make_admin", response_model=UserResponse)
-async def make_user_admin(user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def make_user_admin(user_id: int, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if not current_user or not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Admin only")
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     user.is_admin = True
-    db.commit()
-    db.refresh(user)
+    await record_user_changes(db, user_id)
+    # Issued tokens still claim a non-admin; send them to the database until the user logs in again
+    await revoke_tokens(db, user_id)
+    await db.commit()
+    invalidate_user(user_id)
+    await db.refresh(user)
     
     logger.info(f"👑 User promoted to admin: {user.username} (ID: {user.id}) by admin {current_user.username}")
     return UserResponse.model_validate(user, from_attributes=True)
 
+# Admin-only: Remove a user's admin role
+@app.post("/users/{user_id}/revoke_admin", response_model=UserResponse)
+async def revoke_user_admin(user_id: int, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    if not current_user or not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin only")
+    if user_id == current_user.id:
+        raise HTTPException(status_code=400, detail="Admins cannot revoke their own admin role")
+
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    user.is_admin = False
+    await record_user_changes(db, user_id)
+    await revoke_tokens(db, user_id)
+    await db.commit()
+    invalidate_user(user_id)
+    await db.refresh(user)
+
+    logger.info(f"🔻 Admin role revoked: {user.username} (ID: {user.id}) by admin {current_user.username}")
+    return UserResponse.model_validate(user, from_attributes=True)
+
+# Admin-only: Deactivate a user; their tokens stop working within REVOCATION_REFRESH_SECONDS
+@app.post("/users/{user_id}/deactivate", response_model=UserResponse)
+async def deactivate_user(user_id: int, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    if not current_user or not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin only")
+    if user_id == current_user.id:
+        raise HTTPException(status_code=400, detail="Admins cannot deactivate their own account")
+
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    user.is_active = False
+    await record_user_changes(db, user_id)
+    await revoke_tokens(db, user_id)
+    await revoke_refresh_tokens(db, user_id=user_id)
+    await db.commit()
+    invalidate_user(user_id)
+    await db.refresh(user)
+
+    logger.info(f"🚫 User deactivated: {user.username} (ID: {user.id}) by admin {current_user.username}")
+    return UserResponse.model_validate(user, from_attributes=True)
+
 # Admin-only delete user and reassign tasks
 @app.delete("/users/{user_id}")
-async def admin_delete_user(user_id: int, reassign_to_id: Optional[int] = None, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def admin_delete_user(user_id: int, reassign_to_id: Optional[int] = None, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if not current_user or not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Admin only")
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     # Reassign tasks
-    db.query(Task).filter(Task.assignee_id == user_id).update({Task.assignee_id: reassign_to_id})
-    db.delete(user)
-    db.commit()
+    await record_user_changes(db, user_id)
+    await revoke_tokens(db, user_id)
+    await db.execute(delete(RefreshToken).where(RefreshToken.user_id == user_id))
+    await db.execute(
+        update(Task).where(Task.assignee_id == user_id).values(assignee_id=reassign_to_id)
+    )
+    await db.delete(user)
+    await db.commit()
+    invalidate_user(user_id)
     return {"message": "User deleted"}
 
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+# Admin-only: in-process cache and pool metrics (app/metrics.py)
+@app.get("/metrics")
+async def get_metrics(current_user: User = Depends(get_current_user)):
+    if not current_user or not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin only")
+    return metrics.snapshot()
@@ -0,0 +1,34 @@
+"""In-process counters and gauges, served as JSON by GET /metrics.
+
+Counters only go up (hits, misses, rejections); gauges are read from a
+callback when the metrics are requested (bytes cached, pool in use);
+observations (latencies) keep a count, sum and max. Values are per
+process: with several workers, each reports its own.
+"""
+from collections import defaultdict
+from typing import Callable, Dict
+
+_counters: Dict[str, float] = defaultdict(float)
+_gauges: Dict[str, Callable[[], float]] = {}
+
+
+def increment(name: str, value: float = 1) -> None:
+    _counters[name] += value
+
+
+def observe(name: str, value: float) -> None:
+    _counters[f"{name}.count"] += 1
+    _counters[f"{name}.sum"] += value
+    _counters[f"{name}.max"] = max(_counters[f"{name}.max"], value)
+
+
+def register_gauge(name: str, read: Callable[[], float]) -> None:
+    _gauges[name] = read
+
+
+def snapshot() -> Dict[str, float]:
+    """Current value of every counter and gauge, by name"""
+    values = dict(_counters)
+    for name, read in _gauges.items():
+        values[name] = read()
+    return dict(sorted(values.items()))
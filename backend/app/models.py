@@ -1,13 +1,16 @@
-from sqlalchemy import Integer, String, Text, DateTime, Float, ForeignKey, Boolean, func
+from sqlalchemy import Integer, String, Text, DateTime, Float, ForeignKey, Boolean, Index, func, inspect
 from sqlalchemy.orm import relationship, Mapped, mapped_column
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, field_validator
+from typing import Any, Dict, Generic, List, Literal, Optional, TypeVar
 from datetime import datetime
 from .database import Base
 
 # Database Models
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     email: Mapped[str] = mapped_column(String, unique=True, nullable=False)
@@ -16,6 +19,8 @@ class User(Base):
     hashed_password: Mapped[str] = mapped_column(String, nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     is_admin: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Stamped into access tokens; raised when the claims of issued tokens must stop being trusted
+    token_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -25,38 +30,86 @@ class User(Base):
     owned_boards = relationship("Board", back_populates="creator")
     comments = relationship("Comment", back_populates="author")
 
+class TokenRevocation(Base):
+    """Tokens of user_id with a lower token version are no longer trusted on their claims (see app/revocations.py)"""
+    __tablename__ = "token_revocations"
+
+    # No foreign key: the row must outlive a deleted user's tokens
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    token_version: Mapped[int] = mapped_column(Integer, nullable=False)
+    revoked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+class RefreshToken(Base):
+    """A refresh token ("<id>.<secret>"); only an HMAC of the secret is stored (see app/refresh_tokens.py)"""
+    __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        Index("ix_refresh_tokens_user_id", "user_id"),
+        Index("ix_refresh_tokens_family_id", "family_id"),
+    )
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # Tokens descended from one login by rotation; reuse of a rotated token revokes them all
+    family_id: Mapped[str] = mapped_column(String, nullable=False)
+    token_hash: Mapped[str] = mapped_column(String, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    used_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    revoked_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
 class Board(Base):
     __tablename__ = "boards"
+    __table_args__ = (
+        Index("ix_boards_created_by", "created_by"),
+        Index("ix_boards_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String, nullable=False)
     description: Mapped[str] = mapped_column(Text)
     created_by: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    # Incremented on every change to the board's columns, tasks or comments (app/versioning.py)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # board_changes holds every change after this version; older ones were compacted away
+    compacted_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     creator = relationship("User", back_populates="owned_boards")
-    columns = relationship("Column", back_populates="board", cascade="all, delete-orphan")
+    columns = relationship("Column", back_populates="board", cascade="all, delete-orphan", order_by="[Column.position, Column.id]")
     tasks = relationship("Task", back_populates="board", cascade="all, delete-orphan")
+    stats = relationship("BoardStats", uselist=False, cascade="all, delete-orphan")
 
 class Column(Base):
     __tablename__ = "columns"
+    __table_args__ = (
+        Index("ix_columns_board_id_position", "board_id", "position"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String, nullable=False)
     board_id: Mapped[int] = mapped_column(Integer, ForeignKey("boards.id"), nullable=False)
-    position: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Fractional order key, see app/ordering.py
+    position: Mapped[str] = mapped_column(String, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     board = relationship("Board", back_populates="columns")
-    tasks = relationship("Task", back_populates="column", cascade="all, delete-orphan")
+    tasks = relationship("Task", back_populates="column", cascade="all, delete-orphan", order_by="[Task.position, Task.id]")
+    stats = relationship("ColumnStats", uselist=False, cascade="all, delete-orphan")
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_column_id_position", "column_id", "position"),
+        Index("ix_tasks_board_id_is_active", "board_id", "is_active"),
+        Index("ix_tasks_assignee_id", "assignee_id"),
+        Index("ix_tasks_created_by", "created_by"),
+        Index("ix_tasks_board_id_due_date", "board_id", "due_date"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     title: Mapped[str] = mapped_column(String, nullable=False)
@@ -65,13 +118,13 @@ class Task(Base):
     column_id: Mapped[int] = mapped_column(Integer, ForeignKey("columns.id"), nullable=False)
     assignee_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("users.id"), nullable=True)
     priority: Mapped[Optional[str]] = mapped_column(String, nullable=True)
-    tags: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     due_date: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     estimated_hours: Mapped[Optional[float]] = mapped_column(Float, nullable=True, default=0.0)
     hours_used: Mapped[Optional[float]] = mapped_column(Float, nullable=True, default=0.0)
     completed_hours: Mapped[Optional[float]] = mapped_column(Float, nullable=True, default=0.0)
     created_by: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
-    position: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Fractional order key within the column, see app/ordering.py
+    position: Mapped[str] = mapped_column(String, nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -82,9 +135,63 @@ class Task(Base):
     assignee = relationship("User", back_populates="assigned_tasks", foreign_keys=[assignee_id])
     creator = relationship("User", back_populates="created_tasks", foreign_keys=[created_by])
     comments = relationship("Comment", back_populates="task", cascade="all, delete-orphan")
+    tags = relationship("Tag", secondary="task_tags", back_populates="tasks", order_by="Tag.name")
+
+class ColumnStats(Base):
+    """Task counters of one column, maintained by the task write paths (app/stats.py)"""
+    __tablename__ = "column_stats"
+    __table_args__ = (
+        Index("ix_column_stats_board_id", "board_id"),
+    )
+
+    column_id: Mapped[int] = mapped_column(Integer, ForeignKey("columns.id", ondelete="CASCADE"), primary_key=True)
+    board_id: Mapped[int] = mapped_column(Integer, ForeignKey("boards.id", ondelete="CASCADE"), nullable=False)
+    task_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # Tasks not in a done column (see app/workload.py)
+    open_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    estimated_hours: Mapped[float] = mapped_column(Float, nullable=False, default=0.0, server_default="0")
+    hours_used: Mapped[float] = mapped_column(Float, nullable=False, default=0.0, server_default="0")
+    completed_hours: Mapped[float] = mapped_column(Float, nullable=False, default=0.0, server_default="0")
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class BoardStats(Base):
+    """Task counters of one board, maintained by the task write paths (app/stats.py)"""
+    __tablename__ = "board_stats"
+
+    board_id: Mapped[int] = mapped_column(Integer, ForeignKey("boards.id", ondelete="CASCADE"), primary_key=True)
+    task_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    open_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    estimated_hours: Mapped[float] = mapped_column(Float, nullable=False, default=0.0, server_default="0")
+    hours_used: Mapped[float] = mapped_column(Float, nullable=False, default=0.0, server_default="0")
+    completed_hours: Mapped[float] = mapped_column(Float, nullable=False, default=0.0, server_default="0")
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class Tag(Base):
+    __tablename__ = "tags"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String, unique=True, index=True, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    tasks = relationship("Task", secondary="task_tags", back_populates="tags")
+
+class TaskTag(Base):
+    __tablename__ = "task_tags"
+    __table_args__ = (
+        # Tag filter: tag name -> tag id -> task ids (the primary key covers task -> tags)
+        Index("ix_task_tags_tag_id_task_id", "tag_id", "task_id"),
+    )
+
+    task_id: Mapped[int] = mapped_column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True)
+    tag_id: Mapped[int] = mapped_column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
 
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        Index("ix_comments_task_id_created_at_id", "task_id", "created_at", "id"),
+        Index("ix_comments_author_id", "author_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     content: Mapped[str] = mapped_column(Text, nullable=False)
@@ -97,6 +204,55 @@ class Comment(Base):
     task = relationship("Task", back_populates="comments")
     author = relationship("User", back_populates="comments")
 
+class BoardChange(Base):
+    """Latest change to one column or task (or the board itself), for GET /boards/{id}/changes"""
+    __tablename__ = "board_changes"
+    __table_args__ = (
+        Index("ix_board_changes_board_id_entity", "board_id", "entity", "entity_id", unique=True),
+        Index("ix_board_changes_board_id_version", "board_id", "version"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    board_id: Mapped[int] = mapped_column(Integer, ForeignKey("boards.id", ondelete="CASCADE"), nullable=False)
+    # "board", "column" or "task"; comment changes are logged as changes to their task
+    entity: Mapped[str] = mapped_column(String, nullable=False)
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Board.version the change was made at
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    deleted: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+class PurgeJob(Base):
+    """Background purge of a soft-deleted board, for GET /jobs/{id} (see app/purge.py)"""
+    __tablename__ = "purge_jobs"
+    __table_args__ = (
+        Index("ix_purge_jobs_status", "status"),
+    )
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    # No foreign keys: the job outlives the board it purges
+    board_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    requested_by: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    # "queued", "running", "completed" or "failed"
+    status: Mapped[str] = mapped_column(String, nullable=False, default="queued")
+    deleted_comments: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    deleted_tasks: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    deleted_columns: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    deleted_changes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Worker running the job; claimed_at is renewed with every chunk, a stale claim may be taken over
+    claimed_by: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    claimed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    @property
+    def deleted(self) -> Dict[str, int]:
+        return {
+            "comments": self.deleted_comments, "tasks": self.deleted_tasks,
+            "columns": self.deleted_columns, "changes": self.deleted_changes,
+        }
+
 # Pydantic Models for API
 class UserCreate(BaseModel):
     email: str
@@ -120,6 +276,29 @@ class AuthResponse(BaseModel):
     access_token: str
     token_type: str
     user: UserResponse
+    # Exchange at POST /auth/refresh for a new access token (absent for pending registrations)
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class StatsResponse(BaseModel):
+    task_count: int
+    open_count: int
+    estimated_hours: float
+    hours_used: float
+    completed_hours: float
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+    @classmethod
+    def from_loaded(cls, obj) -> Optional["StatsResponse"]:
+        # Only when the loader fetched obj.stats; a lazy load is not possible on an AsyncSession
+        if "stats" in inspect(obj).unloaded or obj.stats is None:
+            return None
+        return cls.model_validate(obj.stats)
 
 class BoardCreate(BaseModel):
     name: str
@@ -131,7 +310,9 @@ class BoardResponse(BaseModel):
     description: Optional[str]
     created_by: int
     is_active: bool
+    version: int
     created_at: datetime
+    stats: Optional[StatsResponse] = None
     columns: List['ColumnResponse'] = []
 
     class Config:
@@ -139,8 +320,8 @@ class BoardResponse(BaseModel):
     
     @classmethod
     def from_orm(cls, obj):
-        # Convert columns using ColumnResponse.from_orm
-        columns = [ColumnResponse.from_orm(column) for column in obj.columns] if obj.columns else []
+        # Convert columns using ColumnResponse.from_orm (left empty when the loader skipped them)
+        columns = [] if "columns" in inspect(obj).unloaded else [ColumnResponse.from_orm(column) for column in obj.columns]
         
         return cls(
             id=obj.id,
@@ -148,19 +329,41 @@ class BoardResponse(BaseModel):
             description=obj.description,
             created_by=obj.created_by,
             is_active=obj.is_active,
+            version=obj.version,
             created_at=obj.created_at,
+            stats=StatsResponse.from_loaded(obj),
             columns=columns
         )
 
+class BoardSummary(BaseModel):
+    """A board without its contents, for listings (GET /boards)"""
+    id: int
+    name: str
+    description: Optional[str]
+    created_by: int
+    is_active: bool
+    version: int
+    created_at: datetime
+    # Board.updated_at moves with every version bump
+    last_activity: Optional[datetime] = None
+    column_count: int
+    task_count: int
+    open_count: int
+
+    class Config:
+        from_attributes = True
+
 class ColumnCreate(BaseModel):
     name: str
+    # Index among the board's columns; stored as an order key
     position: int
 
 class ColumnResponse(BaseModel):
     id: int
     name: str
     board_id: int
-    position: int
+    position: str
+    stats: Optional[StatsResponse] = None
     tasks: List['TaskResponse'] = []
 
     class Config:
@@ -168,14 +371,15 @@ class ColumnResponse(BaseModel):
     
     @classmethod
     def from_orm(cls, obj):
-        # Convert tasks using TaskResponse.from_orm
-        tasks = [TaskResponse.from_orm(task) for task in obj.tasks] if obj.tasks else []
+        # Convert tasks using TaskResponse.from_orm (left empty when the loader skipped them)
+        tasks = [] if "tasks" in inspect(obj).unloaded else [TaskResponse.from_orm(task) for task in obj.tasks]
         
         return cls(
             id=obj.id,
             name=obj.name,
             board_id=obj.board_id,
             position=obj.position,
+            stats=StatsResponse.from_loaded(obj),
             tasks=tasks
         )
 
@@ -191,6 +395,14 @@ class TaskCreate(BaseModel):
     hours_used: Optional[float] = 0.0
     completed_hours: Optional[float] = 0.0
 
+    @field_validator("priority")
+    @classmethod
+    def priority_not_null(cls, value):
+        # Defaults to "medium" when left out; TaskResponse.priority is never null
+        if value is None:
+            raise ValueError("priority may not be null")
+        return value
+
 class TaskResponse(BaseModel):
     id: int
     title: str
@@ -205,7 +417,7 @@ class TaskResponse(BaseModel):
     hours_used: Optional[float] = 0.0
     completed_hours: Optional[float] = 0.0
     created_by: int
-    position: int
+    position: str
     is_active: bool
     created_at: datetime
     assignee: Optional[UserResponse] = None
@@ -216,14 +428,8 @@ class TaskResponse(BaseModel):
     
     @classmethod
     def from_orm(cls, obj):
-        # Convert JSON string tags back to list
-        tags = []
-        if obj.tags:
-            try:
-                import json
-                tags = json.loads(obj.tags) if isinstance(obj.tags, str) else obj.tags
-            except (json.JSONDecodeError, TypeError):
-                tags = []
+        # Tags are eager-loaded Tag rows; the API exposes their names
+        tags = [tag.name for tag in obj.tags]
         
         return cls(
             id=obj.id,
@@ -246,6 +452,67 @@ class TaskResponse(BaseModel):
             comments=obj.comments
         )
 
+class TaskUpdate(BaseModel):
+    # Partial update used by batch operations; only the fields sent are applied
+    title: Optional[str] = None
+    description: Optional[str] = None
+    assignee_id: Optional[int] = None
+    priority: Optional[str] = None
+    tags: Optional[List[str]] = None
+    due_date: Optional[datetime] = None
+    estimated_hours: Optional[float] = None
+    hours_used: Optional[float] = None
+    completed_hours: Optional[float] = None
+
+    @field_validator("title", "priority")
+    @classmethod
+    def not_null(cls, value, info):
+        # Optional so they can be left out, but a task always has a title and a priority
+        if value is None:
+            raise ValueError(f"{info.field_name} may not be null")
+        return value
+
+class TaskMove(BaseModel):
+    column_id: int
+    # Index within the target column
+    position: int = 0
+
+class TaskBatchOperation(BaseModel):
+    op: Literal["create", "update", "move", "delete"]
+    # Target task for update / move / delete
+    task_id: Optional[int] = None
+    # TaskCreate for create, TaskUpdate for update, TaskMove for move
+    data: Dict[str, Any] = {}
+
+class TaskBatchRequest(BaseModel):
+    operations: List[TaskBatchOperation]
+
+class TaskBatchResult(BaseModel):
+    index: int
+    op: str
+    status: Literal["ok", "error"]
+    task_id: Optional[int] = None
+    column_id: Optional[int] = None
+    position: Optional[str] = None
+    detail: Optional[str] = None
+    # HTTP status of a failed operation: 422 for an invalid payload, otherwise 400
+    status_code: Optional[int] = None
+
+class TaskBatchResponse(BaseModel):
+    results: List[TaskBatchResult]
+
+class PurgeJobResponse(BaseModel):
+    id: str
+    board_id: int
+    status: Literal["queued", "running", "completed", "failed"]
+    deleted: Dict[str, int]
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
 class CommentCreate(BaseModel):
     content: str
 
@@ -260,8 +527,61 @@ class CommentResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class WorkloadMetrics(BaseModel):
+    task_count: int
+    done_count: int
+    not_done_count: int
+    # Tasks in an "In Progress" column
+    wip_count: int
+    # Estimated hours of done / not-done tasks
+    hours_done: float
+    hours_not_done: float
+    hours_used: float
+    completed_hours: float
+    completion_ratio: float
+
+class WorkloadEntry(BaseModel):
+    # None for unassigned tasks
+    assignee_id: Optional[int] = None
+    metrics: WorkloadMetrics
+
+class WorkloadResponse(BaseModel):
+    board_ids: List[int]
+    assignees: List[WorkloadEntry]
+    totals: WorkloadMetrics
+
+class BoardChangesResponse(BaseModel):
+    board_id: int
+    # Apply the changes, then pass this as ?since= next time
+    version: int
+    # The board's own fields and stats (no columns)
+    board: BoardResponse
+    # Columns (without tasks) and tasks changed after `since`
+    columns: List[ColumnResponse]
+    tasks: List[TaskResponse]
+    # Entity kind ("columns", "tasks") -> ids deleted after `since`
+    deleted: Dict[str, List[int]]
+
+class SearchResult(BaseModel):
+    kind: Literal["task", "comment"]
+    task_id: int
+    comment_id: Optional[int] = None
+    board_id: int
+    # HTML with matches wrapped in <mark>; a comment hit carries its task's title
+    title: str
+    snippet: str
+    score: float
+
+PageItem = TypeVar("PageItem")
+
+class Page(BaseModel, Generic[PageItem]):
+    # Returned when a list endpoint is called with ?limit=; pass next_cursor as ?after= for the next page
+    items: List[PageItem]
+    next_cursor: Optional[str] = None
+
 # Update forward references
 BoardResponse.model_rebuild()
 ColumnResponse.model_rebuild()
 TaskResponse.model_rebuild()
 CommentResponse.model_rebuild()
+BoardChangesResponse.model_rebuild()
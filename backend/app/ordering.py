@@ -0,0 +1,135 @@
+"""Fractional order keys for tasks and columns.
+
+A key is a base-36 string read as the fraction 0.<digits>; sorting keys as
+plain strings sorts them numerically. There is always room for another key
+between two keys, so moving an item rewrites only that item's row. Keys never
+end in "0" (that would make "a0" and "a" the same position).
+
+Only lowercase letters and digits are used so that database collations
+order the keys the same way as Python does.
+"""
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+
+# Keys longer than this trigger a rebalance of their column/board
+MAX_KEY_LENGTH = 12
+
+
+def _midpoint(low: str, high: Optional[str]) -> str:
+    """Key strictly between 0.low and 0.high (high=None means 1.0)"""
+    if high is not None:
+        # Keep the common prefix (low padded with zeros) and recurse on the rest
+        n = 0
+        while n < len(high) and (low[n] if n < len(low) else "0") == high[n]:
+            n += 1
+        if n > 0:
+            return high[:n] + _midpoint(low[n:], high[n:])
+
+    digit_low = DIGITS.index(low[0]) if low else 0
+    digit_high = DIGITS.index(high[0]) if high else BASE
+    if digit_high - digit_low > 1:
+        return DIGITS[(digit_low + digit_high) // 2]
+    # Adjacent digits: the first digit of a longer high bound already fits
+    if high is not None and len(high) > 1:
+        return high[:1]
+    return DIGITS[digit_low] + _midpoint(low[1:], None)
+
+
+def key_between(before: Optional[str], after: Optional[str]) -> str:
+    """Return a key that sorts strictly after `before` and strictly before `after`.
+
+    Either bound may be None (start / end of the list).
+    """
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"order keys out of order: {before!r} >= {after!r}")
+
+    # Appending or prepending: step the last digit so repeated pushes
+    # grow the key by one character per ~35 items instead of per ~5
+    if after is None and before:
+        index = DIGITS.index(before[-1])
+        if index < BASE - 1:
+            return before[:-1] + DIGITS[index + 1]
+    if before is None and after:
+        index = DIGITS.index(after[-1])
+        if index > 1:
+            return after[:-1] + DIGITS[index - 1]
+
+    return _midpoint(before or "", after)
+
+
+def evenly_spaced_keys(count: int) -> List[str]:
+    """Return `count` ascending keys spread evenly over the key space"""
+    if count <= 0:
+        return []
+    length = 1
+    while BASE ** length <= count * 2:
+        length += 1
+    span = BASE ** length
+    keys = []
+    for i in range(1, count + 1):
+        value = i * span // (count + 1)
+        digits = []
+        for _ in range(length):
+            value, digit = divmod(value, BASE)
+            digits.append(DIGITS[digit])
+        keys.append("".join(reversed(digits)).rstrip("0"))
+    return keys
+
+
+def needs_rebalance(key: str) -> bool:
+    return len(key) > MAX_KEY_LENGTH
+
+
+async def position_at_index(db: AsyncSession, model, scope, index: int, exclude_id: Optional[int] = None):
+    """Order key that puts a row at `index` among the rows of `model` matching `scope`.
+
+    Reads at most two neighbouring keys through the (parent_id, position) index.
+    Returns (key, rebalance) where rebalance is True when the caller should
+    call rebalance_positions for the scope.
+    """
+    criteria = [scope] if exclude_id is None else [scope, model.id != exclude_id]
+    siblings = select(model.position).where(*criteria).order_by(model.position, model.id)
+
+    index = max(index or 0, 0)
+    if index == 0:
+        before, after = None, await db.scalar(siblings.limit(1))
+    else:
+        neighbours = (await db.scalars(siblings.offset(index - 1).limit(2))).all()
+        if neighbours:
+            before = neighbours[0]
+            after = neighbours[1] if len(neighbours) > 1 else None
+        else:
+            # Past the end: append after the last row
+            before, after = await db.scalar(select(func.max(model.position)).where(*criteria)), None
+
+    if before is not None and after is not None and before >= after:
+        # Duplicate keys (concurrent writers): land next to them and let a rebalance spread them out
+        return key_between(before, None), True
+    key = key_between(before, after)
+    return key, needs_rebalance(key)
+
+
+async def rebalance_positions(db: AsyncSession, model, parent_column, parent_id: int) -> Dict[int, str]:
+    """Rewrite every key under one parent with evenly spaced ones, in the caller's transaction.
+
+    Flush pending position changes first. Returns {row id: new key}: record
+    those rows as changed (their keys moved though the order did not) and
+    reload any of them you return. Runs inside the request rather than as a
+    background task, which under the SQLite profile would wait for the
+    request's own writer connection.
+    """
+    ids = (await db.scalars(
+        select(model.id).where(parent_column == parent_id).order_by(model.position, model.id)
+    )).all()
+    positions = dict(zip(ids, evenly_spaced_keys(len(ids))))
+    if positions:
+        await db.execute(update(model), [{"id": row_id, "position": key} for row_id, key in positions.items()])
+        logger.info(f"🔀 Rebalanced {len(ids)} {model.__tablename__} positions under {parent_column.key}={parent_id}")
+    return positions
@@ -0,0 +1,81 @@
+"""Keyset (cursor) pagination.
+
+A page is read as "the next `limit` rows after the last one you saw", using
+an indexed sort key such as (created_at, id). Unlike OFFSET this costs the
+same on page 1 and page 1000, and rows inserted meanwhile don't shift pages.
+
+Cursors are opaque to clients: base64 of the sort-key values of the last
+row of the previous page.
+"""
+from fastapi import HTTPException
+from sqlalchemy import DateTime, String, and_, literal, or_, tuple_
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence) -> List[Any]:
+    """Decode a cursor for the given sort keys; 400 when it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError("wrong number of values")
+        return [
+            datetime.fromisoformat(value) if value is not None and isinstance(key.type, DateTime) else value
+            for key, value in zip(keys, values)
+        ]
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+
+def keyset_after(db, keys: Sequence, values: Sequence[Any], descending: bool = False):
+    """Row-value comparison selecting the rows that sort after `values`"""
+    def after(bound):
+        return tuple_(*keys) < tuple_(*bound) if descending else tuple_(*keys) > tuple_(*bound)
+
+    first, rest = keys[0], keys[1:]
+    value = values[0]
+    if not (db.get_bind().dialect.name == "sqlite" and isinstance(first.type, DateTime) and isinstance(value, datetime)):
+        return after(values)
+
+    # SQLite stores datetimes as text in two shapes: "YYYY-MM-DD HH:MM:SS" from
+    # CURRENT_TIMESTAMP server defaults and "...HH:MM:SS.ffffff" from bound
+    # values. Compare against the long form and treat the short form of the
+    # same instant as equal to it.
+    long_form = literal(value.strftime("%Y-%m-%d %H:%M:%S.%f"), String())
+    short_form = literal(value.strftime("%Y-%m-%d %H:%M:%S"), String())
+    if value.microsecond:
+        return after([long_form, *values[1:]])
+    if descending:
+        # The short form sorts first, so it is the lower bound; long-form ties come after it
+        tie_breaker = tuple_(*rest) < tuple_(*values[1:])
+        return or_(after([short_form, *values[1:]]), and_(first == long_form, tie_breaker))
+    tie_breaker = tuple_(*rest) > tuple_(*values[1:])
+    return or_(after([long_form, *values[1:]]), and_(first == short_form, tie_breaker))
+
+
+def keyset_criteria(db, keys: Sequence, after: Optional[str], descending: bool = False) -> list:
+    """WHERE criteria selecting the rows that sort after the cursor (none for the first page)"""
+    if not after:
+        return []
+    return [keyset_after(db, keys, decode_cursor(after, keys), descending)]
+
+
+def page_of(rows: Sequence, keys: Sequence, limit: int) -> Tuple[list, Optional[str]]:
+    """Trim rows fetched with limit + 1 to one page and build the cursor for the next"""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, key.key) for key in keys])
@@ -0,0 +1,55 @@
+"""Bounded worker pool for password hashing.
+
+A bcrypt hash or verify takes a few hundred milliseconds of CPU. Run inside
+an async handler it stalls the event loop, and with it every request and
+WebSocket on the worker. run_hashing() moves the call to a dedicated thread
+pool (bcrypt releases the GIL) of PASSWORD_HASH_WORKERS threads.
+
+At most PASSWORD_HASH_QUEUE calls wait for a thread; past that, requests
+get 503 with Retry-After instead of queueing behind a burst of logins.
+Queue wait and hashing time are recorded in GET /metrics.
+"""
+from fastapi import HTTPException, status
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+import asyncio
+import os
+import time
+from . import metrics
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "32"))
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+# Calls running or waiting for a thread
+_pending = 0
+
+metrics.register_gauge("password_hash.pending", lambda: _pending)
+
+
+async def run_hashing(fn: Callable[..., Any], *args) -> Any:
+    """fn(*args) on the hashing pool; 503 when PASSWORD_HASH_QUEUE calls are already waiting"""
+    global _pending
+    if _pending >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE:
+        metrics.increment("password_hash.rejected")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    submitted = time.perf_counter()
+
+    def timed():
+        started = time.perf_counter()
+        result = fn(*args)
+        return result, started - submitted, time.perf_counter() - started
+
+    _pending += 1
+    try:
+        result, waited, took = await asyncio.get_running_loop().run_in_executor(_executor, timed)
+    finally:
+        _pending -= 1
+    metrics.observe("password_hash.wait_seconds", waited)
+    metrics.observe("password_hash.seconds", took)
+    return result
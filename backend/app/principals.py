@@ -0,0 +1,89 @@
+"""Cache of authenticated users for get_current_user.
+
+Every authenticated request used to load its User row. Handlers only read
+id, username and is_admin (and is_active), so those are kept per user id in
+a Principal for AUTH_CACHE_TTL_SECONDS, least recently used first out past
+AUTH_CACHE_SIZE entries. A warm entry means the request does not touch the
+users table.
+
+Endpoints that change a user call invalidate_user() after their commit.
+That clears this worker's entry; other workers drop theirs when it expires,
+when a revocation of the user's tokens reaches them (app/revocations.py),
+or at once if a listener added with add_invalidation_listener() broadcasts
+the id (Redis pub/sub, PostgreSQL NOTIFY, ...) and each receiver calls
+invalidate_user(user_id, propagate=False).
+"""
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+import os
+import time
+from . import metrics
+
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "30"))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+
+
+class Principal:
+    """The authenticated user as handlers see it, detached from any session"""
+    __slots__ = ("id", "username", "is_admin", "is_active", "created_at")
+
+    def __init__(self, id: int, username: str, is_admin: bool, is_active: bool, created_at: Optional[datetime] = None):
+        self.id = id
+        self.username = username
+        self.is_admin = bool(is_admin)
+        self.is_active = bool(is_active)
+        # Set when loaded from the users table, None when built from token claims
+        self.created_at = created_at
+
+    def __repr__(self) -> str:
+        return f"Principal(id={self.id}, username={self.username!r}, is_admin={self.is_admin}, is_active={self.is_active})"
+
+
+# user id -> (monotonic expiry, principal)
+_cache: "OrderedDict[int, Tuple[float, Principal]]" = OrderedDict()
+_listeners: List[Callable[[int], None]] = []
+# Incremented by every invalidation; a load that started before one is not stored
+_epoch = 0
+
+metrics.register_gauge("principals.entries", lambda: len(_cache))
+
+
+def get_principal(user_id: int) -> Optional[Principal]:
+    entry = _cache.get(user_id)
+    if entry is None or entry[0] <= time.monotonic():
+        metrics.increment("principals.misses")
+        return None
+    _cache.move_to_end(user_id)
+    metrics.increment("principals.hits")
+    return entry[1]
+
+
+def current_epoch() -> int:
+    return _epoch
+
+
+def store_principal(principal: Principal, epoch: int) -> None:
+    """Cache a principal loaded after current_epoch() returned epoch"""
+    if epoch != _epoch:
+        return
+    _cache[principal.id] = (time.monotonic() + AUTH_CACHE_TTL_SECONDS, principal)
+    _cache.move_to_end(principal.id)
+    while len(_cache) > AUTH_CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+def invalidate_user(user_id: int, propagate: bool = True) -> None:
+    """Forget a user after a change to it; propagate=False when applying another worker's invalidation"""
+    global _epoch
+    _epoch += 1
+    _cache.pop(user_id, None)
+    metrics.increment("principals.invalidations")
+    if propagate:
+        for listener in _listeners:
+            listener(user_id)
+
+
+def add_invalidation_listener(listener: Callable[[int], None]) -> None:
+    """Call listener(user_id) on every local invalidation, e.g. to publish it to the other workers"""
+    _listeners.append(listener)
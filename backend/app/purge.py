@@ -0,0 +1,159 @@
+"""Background purge of soft-deleted boards.
+
+DELETE /boards/{id} only flips Board.is_active and records a purge_jobs
+row; the rows are removed here in bounded chunks, each in its own short
+transaction, so a large board never holds the write lock for long. Comments,
+task tags and the stats rows are deleted explicitly because bulk deletes
+bypass the ORM cascades.
+
+Job status lives in purge_jobs, so GET /jobs/{id} answers on any worker. A
+job is claimed by the worker running it (claimed_by); each chunk renews
+claimed_at in the same transaction as its deletes. Every worker looks for
+unfinished jobs at startup and then every PURGE_LEASE_SECONDS, and takes
+over only those never claimed or whose claim went stale -- the worker
+running them died -- so each purge is resumed by one worker.
+"""
+from sqlalchemy import select, delete, update, Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from .database import write_session
+from .models import Board, BoardChange, Column, Task, Comment, TaskTag, ColumnStats, BoardStats, PurgeJob
+
+logger = logging.getLogger(__name__)
+
+# Rows deleted per transaction
+PURGE_CHUNK_SIZE = int(os.getenv("PURGE_CHUNK_SIZE", "500"))
+# A claim not renewed for this long belongs to a dead worker
+PURGE_LEASE_SECONDS = float(os.getenv("PURGE_LEASE_SECONDS", "60"))
+# Finished jobs are kept this long for the status endpoint
+PURGE_JOB_RETENTION = timedelta(days=int(os.getenv("PURGE_JOB_RETENTION_DAYS", "7")))
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+UNFINISHED = ("queued", "running")
+
+
+def create_purge_job(db: AsyncSession, board_id: int, requested_by: Optional[int] = None) -> PurgeJob:
+    """Add a job claimed by this worker; commit it with the board's soft delete"""
+    job = PurgeJob(
+        id=uuid.uuid4().hex, board_id=board_id, requested_by=requested_by, status="queued",
+        deleted_comments=0, deleted_tasks=0, deleted_columns=0, deleted_changes=0,
+        claimed_by=WORKER_ID, claimed_at=datetime.now(timezone.utc),
+    )
+    db.add(job)
+    return job
+
+
+async def get_purge_job(db: AsyncSession, job_id: str) -> Optional[PurgeJob]:
+    return await db.get(PurgeJob, job_id)
+
+
+def _renew(job_id: str, **values):
+    """Update this worker's job row and renew its claim"""
+    return (
+        update(PurgeJob).where(PurgeJob.id == job_id, PurgeJob.claimed_by == WORKER_ID)
+        .values(claimed_at=datetime.now(timezone.utc), **values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _delete_chunk(job_id: str, counter, ids_query, delete_statements) -> Optional[int]:
+    """Delete one chunk of ids and count it on the job in a single short transaction.
+
+    Returns the chunk size, or None when another worker has taken the job over.
+    """
+    async with write_session() as db:
+        claimed = await db.execute(_renew(job_id, status="running"))
+        if claimed.rowcount == 0:
+            await db.rollback()
+            return None
+        ids: List[int] = list((await db.scalars(ids_query.limit(PURGE_CHUNK_SIZE))).all())
+        if ids:
+            for statement in delete_statements(ids):
+                await db.execute(statement)
+            await db.execute(_renew(job_id, **{counter.key: counter + len(ids)}))
+        await db.commit()
+    # Let other requests get at the writer between chunks
+    await asyncio.sleep(0)
+    return len(ids)
+
+
+async def purge_board(job_id: str, board_id: int) -> None:
+    """Delete a soft-deleted board's comments, tasks, columns, change log and finally the board"""
+    task_ids = select(Task.id).where(Task.board_id == board_id)
+    steps = [
+        (PurgeJob.deleted_comments, select(Comment.id).where(Comment.task_id.in_(task_ids)),
+         lambda ids: [delete(Comment).where(Comment.id.in_(ids))]),
+        (PurgeJob.deleted_tasks, task_ids,
+         lambda ids: [delete(TaskTag).where(TaskTag.task_id.in_(ids)), delete(Task).where(Task.id.in_(ids))]),
+        (PurgeJob.deleted_columns, select(Column.id).where(Column.board_id == board_id),
+         lambda ids: [delete(ColumnStats).where(ColumnStats.column_id.in_(ids)), delete(Column).where(Column.id.in_(ids))]),
+        (PurgeJob.deleted_changes, select(BoardChange.id).where(BoardChange.board_id == board_id),
+         lambda ids: [delete(BoardChange).where(BoardChange.id.in_(ids))]),
+    ]
+    try:
+        for counter, ids_query, delete_statements in steps:
+            while True:
+                count = await _delete_chunk(job_id, counter, ids_query, delete_statements)
+                if count is None:
+                    logger.warning(f"⚠️ Purge job {job_id} was taken over by another worker")
+                    return
+                if count < PURGE_CHUNK_SIZE:
+                    break
+
+        async with write_session() as db:
+            await db.execute(delete(BoardStats).where(
+                BoardStats.board_id.in_(select(Board.id).where(Board.id == board_id, Board.is_active == False))
+            ))
+            await db.execute(delete(Board).where(Board.id == board_id, Board.is_active == False))
+            await db.execute(_renew(job_id, status="completed", finished_at=datetime.now(timezone.utc)))
+            await db.commit()
+        logger.info(f"🧹 Purged board {board_id} (job {job_id})")
+    except Exception as e:
+        logger.error(f"❌ Purge of board {board_id} failed: {e}")
+        async with write_session() as db:
+            await db.execute(_renew(job_id, status="failed", error=str(e), finished_at=datetime.now(timezone.utc)))
+            await db.commit()
+
+
+async def resume_purges() -> List[Row]:
+    """Claim the unfinished jobs no live worker is running, and forget long-finished ones: (id, board_id) rows"""
+    now = datetime.now(timezone.utc)
+    async with write_session() as db:
+        # One UPDATE: of two workers claiming the same job, only the first matches it
+        claimed = (await db.execute(
+            update(PurgeJob).where(
+                PurgeJob.status.in_(UNFINISHED),
+                PurgeJob.claimed_by.is_(None) | (PurgeJob.claimed_at < now - timedelta(seconds=PURGE_LEASE_SECONDS)),
+            )
+            .values(claimed_by=WORKER_ID, claimed_at=now)
+            .returning(PurgeJob.id, PurgeJob.board_id)
+            .execution_options(synchronize_session=False)
+        )).all()
+        await db.execute(delete(PurgeJob).where(
+            PurgeJob.status.not_in(UNFINISHED), PurgeJob.finished_at < now - PURGE_JOB_RETENTION
+        ))
+        await db.commit()
+    return claimed
+
+
+async def start_resumed_purges() -> None:
+    for job in await resume_purges():
+        logger.info(f"🧹 Resuming purge of board {job.board_id} (job {job.id})")
+        asyncio.create_task(purge_board(job.id, job.board_id))
+
+
+async def run_purge_resume() -> None:
+    """Pick up the jobs of dead workers every PURGE_LEASE_SECONDS"""
+    while True:
+        await asyncio.sleep(PURGE_LEASE_SECONDS)
+        try:
+            await start_resumed_purges()
+        except Exception as e:
+            logger.warning(f"⚠️ Purge resume failed: {e}")
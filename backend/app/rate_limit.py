@@ -0,0 +1,124 @@
+"""Token-bucket admission control for the authentication endpoints.
+
+Every login or registration attempt costs a bcrypt hash and several user
+queries, so a credential-stuffing burst is a CPU attack. Attempts take a
+token from two buckets -- one per client IP before any of that work, one
+per account before the hash -- and an empty bucket answers 429 with
+Retry-After. Accounts are keyed by their lowercased email: a login looks the
+user up first, so its email and its username share one bucket (an
+identifier matching no user gets its own).
+
+Buckets refill at *_PER_MINUTE tokens per minute up to *_BURST. They live
+in a RateLimitBackend: the default keeps them in this process, so each
+worker limits on its own. For a shared limit, point RATE_LIMIT_BACKEND at a
+"module:attribute" that is a backend (or a factory returning one), e.g.
+built on Redis, or call set_rate_limit_backend() at startup.
+
+Client IPs come from the ASGI scope; behind a proxy run uvicorn with
+--proxy-headers so that is the forwarded address.
+"""
+from fastapi import HTTPException, Request, status
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Tuple
+import importlib
+import math
+import os
+import time
+from . import metrics
+
+AUTH_RATE_LIMIT_ENABLED = os.getenv("AUTH_RATE_LIMIT_ENABLED", "true").lower() == "true"
+IP_BURST = int(os.getenv("AUTH_RATE_LIMIT_IP_BURST", "20"))
+IP_PER_MINUTE = float(os.getenv("AUTH_RATE_LIMIT_IP_PER_MINUTE", "10"))
+ACCOUNT_BURST = int(os.getenv("AUTH_RATE_LIMIT_ACCOUNT_BURST", "5"))
+ACCOUNT_PER_MINUTE = float(os.getenv("AUTH_RATE_LIMIT_ACCOUNT_PER_MINUTE", "5"))
+
+
+class RateLimitBackend(ABC):
+    """Storage for token buckets; subclass it to share buckets between workers"""
+
+    @abstractmethod
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """Take a token from key's bucket (rate tokens per second, at most burst).
+
+        Returns 0 when a token was taken, else the seconds until one is available.
+        """
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Buckets in this process; the least recently used are dropped past max_keys"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        # key -> (tokens, monotonic time of the last update)
+        self.buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        tokens, updated = self.buckets.pop(key, (float(burst), now))
+        tokens = min(float(burst), tokens + (now - updated) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        self.buckets[key] = (tokens, now)
+        while len(self.buckets) > self.max_keys:
+            self.buckets.popitem(last=False)
+        return wait
+
+
+def _configured_backend() -> RateLimitBackend:
+    path = os.getenv("RATE_LIMIT_BACKEND")
+    if not path:
+        return MemoryRateLimitBackend()
+    module_name, _, attribute = path.partition(":")
+    backend = getattr(importlib.import_module(module_name), attribute)
+    return backend if isinstance(backend, RateLimitBackend) else backend()
+
+
+_backend = _configured_backend()
+
+metrics.register_gauge(
+    "rate_limit.keys", lambda: len(_backend.buckets) if isinstance(_backend, MemoryRateLimitBackend) else 0
+)
+
+
+def set_rate_limit_backend(backend: RateLimitBackend) -> None:
+    global _backend
+    _backend = backend
+
+
+def _client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+async def _take(kind: str, value: str, per_minute: float, burst: int) -> None:
+    wait = await _backend.take(f"auth:{kind}:{value}", per_minute / 60, burst)
+    if wait > 0:
+        metrics.increment(f"rate_limit.rejected.{kind}")
+        retry_after = max(1, math.ceil(wait))
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Too many attempts, retry in {retry_after} seconds",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+async def limit_ip_attempt(request: Request) -> None:
+    """Admit one attempt from the client's IP or raise 429; call before any database or hashing work"""
+    if AUTH_RATE_LIMIT_ENABLED:
+        await _take("ip", _client_ip(request), IP_PER_MINUTE, IP_BURST)
+
+
+async def limit_account_attempt(account: Optional[str]) -> None:
+    """Admit one attempt on an account (its email) or raise 429; call before hashing"""
+    if AUTH_RATE_LIMIT_ENABLED and account:
+        await _take("account", account.strip().lower(), ACCOUNT_PER_MINUTE, ACCOUNT_BURST)
+        metrics.increment("rate_limit.allowed")
+
+
+async def limit_auth_attempt(request: Request, account: Optional[str]) -> None:
+    """Both limits at once, for a registration: the account is the email it registers"""
+    await limit_ip_attempt(request)
+    await limit_account_attempt(account)
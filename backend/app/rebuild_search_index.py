@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Create the full-text search index if needed and re-index every task and comment.
+Run after restoring data or on a database created without migrations.
+
+Usage:
+    python -m app.rebuild_search_index
+"""
+
+from .database import engine
+from .search import install_search_index, rebuild_search_index
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    with engine.begin() as connection:
+        install_search_index(connection)
+        rebuild_search_index(connection)
+    logger.info("✅ Search index rebuilt")
+
+
+if __name__ == "__main__":
+    main()
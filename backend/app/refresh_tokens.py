@@ -0,0 +1,122 @@
+"""Rotating refresh tokens for POST /auth/refresh.
+
+Login and registration return a refresh token next to the short-lived
+access token. Exchanging it costs one indexed lookup and an HMAC instead of
+a bcrypt verify: the token is "<id>.<secret>", the row is found by id and
+only an HMAC-SHA256 of the (random, high-entropy) secret is stored.
+
+Each exchange marks the token used and returns a new one in the same
+family. Presenting a used token again means it was copied, so the whole
+family -- that login -- is revoked. Tokens expire REFRESH_TOKEN_EXPIRE_DAYS
+after they were issued; deactivating or deleting the user revokes them.
+"""
+from fastapi import HTTPException, status
+from sqlalchemy import select, update, delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+import hashlib
+import hmac
+import os
+import secrets
+from .auth import SECRET_KEY
+from .models import User, RefreshToken
+from . import metrics
+
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+
+
+def _digest(secret: str) -> str:
+    return hmac.new(SECRET_KEY.encode(), secret.encode(), hashlib.sha256).hexdigest()
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite returns naive UTC timestamps
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _invalid() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def issue_refresh_token(db: AsyncSession, user_id: int, family_id: Optional[str] = None) -> str:
+    """A new refresh token for the user, starting a family (a login) unless family_id is given"""
+    token_id = secrets.token_urlsafe(16)
+    secret = secrets.token_urlsafe(32)
+    now = datetime.now(timezone.utc)
+    if family_id is None:
+        family_id = token_id
+        # Expired tokens of earlier logins are no longer needed for reuse detection
+        await db.execute(delete(RefreshToken).where(RefreshToken.user_id == user_id, RefreshToken.expires_at < now))
+    await db.execute(insert(RefreshToken), [{
+        "id": token_id,
+        "user_id": user_id,
+        "family_id": family_id,
+        "token_hash": _digest(secret),
+        "expires_at": now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    }])
+    return f"{token_id}.{secret}"
+
+
+async def _find(db: AsyncSession, token: str) -> Optional[Tuple[RefreshToken, User]]:
+    token_id, _, secret = token.partition(".")
+    if not token_id or not secret:
+        return None
+    row = (await db.execute(
+        select(RefreshToken, User).join(User, User.id == RefreshToken.user_id).where(RefreshToken.id == token_id)
+    )).first()
+    if row is None or not hmac.compare_digest(row[0].token_hash, _digest(secret)):
+        return None
+    return row[0], row[1]
+
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> Tuple[User, str]:
+    """Exchange a refresh token for its user and a new refresh token; 401 if it is not valid"""
+    found = await _find(db, token)
+    if found is None:
+        metrics.increment("refresh_tokens.rejected")
+        raise _invalid()
+    stored, user = found
+    now = datetime.now(timezone.utc)
+    if stored.revoked_at is not None or _aware(stored.expires_at) <= now or not user.is_active:
+        metrics.increment("refresh_tokens.rejected")
+        raise _invalid()
+
+    # Of two requests presenting the same token, only one claims it
+    claimed = await db.execute(
+        update(RefreshToken).where(RefreshToken.id == stored.id, RefreshToken.used_at.is_(None))
+        .values(used_at=now).execution_options(synchronize_session=False)
+    )
+    if claimed.rowcount != 1:
+        # A rotated token came back: end that login everywhere. Committed here, the 401 aborts the request
+        await revoke_refresh_tokens(db, family_id=stored.family_id)
+        await db.commit()
+        metrics.increment("refresh_tokens.reused")
+        raise _invalid()
+
+    metrics.increment("refresh_tokens.rotated")
+    return user, await issue_refresh_token(db, user.id, stored.family_id)
+
+
+async def revoke_refresh_token_family(db: AsyncSession, token: str) -> None:
+    """Log out the login a refresh token belongs to; unknown tokens are ignored"""
+    found = await _find(db, token)
+    if found is not None:
+        await revoke_refresh_tokens(db, family_id=found[0].family_id)
+
+
+async def revoke_refresh_tokens(db: AsyncSession, user_id: Optional[int] = None, family_id: Optional[str] = None) -> None:
+    """Revoke a user's refresh tokens, or one family's"""
+    criteria = [RefreshToken.revoked_at.is_(None)]
+    if user_id is not None:
+        criteria.append(RefreshToken.user_id == user_id)
+    if family_id is not None:
+        criteria.append(RefreshToken.family_id == family_id)
+    await db.execute(
+        update(RefreshToken).where(*criteria)
+        .values(revoked_at=datetime.now(timezone.utc)).execution_options(synchronize_session=False)
+    )
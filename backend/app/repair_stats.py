@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Check the column_stats / board_stats counters against the tasks table and
+rewrite the rows that drifted (or are missing).
+
+Usage:
+    python -m app.repair_stats            # repair
+    python -m app.repair_stats --check    # report only; exit status 1 on mismatches
+    python -m app.repair_stats --board 42 # one board
+"""
+
+from .database import engine
+from .stats import check_stats
+import argparse
+import logging
+import sys
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and repair the task counters")
+    parser.add_argument("--check", action="store_true", help="report mismatches without fixing them")
+    parser.add_argument("--board", type=int, help="only this board id")
+    args = parser.parse_args()
+
+    with engine.begin() as connection:
+        problems = check_stats(connection, repair=not args.check, board_id=args.board)
+
+    for problem in problems:
+        logger.warning(f"⚠️ {problem}")
+    if not problems:
+        logger.info("✅ Task counters are consistent")
+    elif args.check:
+        logger.error(f"❌ {len(problems)} counter rows out of date; run without --check to repair")
+        sys.exit(1)
+    else:
+        logger.info(f"🔧 Repaired {len(problems)} counter rows")
+
+
+if __name__ == "__main__":
+    main()
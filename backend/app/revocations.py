@@ -0,0 +1,106 @@
+"""Revocation of access-token claims.
+
+Access tokens carry the user's username, admin and active flags and token
+version (auth.create_user_token), and get_current_user trusts them without
+reading the database. Admin changes that must apply before a token expires
+-- deactivation, demotion, promotion, deletion -- call revoke_tokens(),
+which raises users.token_version and records the new value in
+token_revocations.
+
+Each worker holds token_revocations in memory as {user id: minimum token
+version}, reloaded every REVOCATION_REFRESH_SECONDS. A token below its
+user's minimum is resolved from the users table instead of its claims, which
+picks up the change (and rejects deleted or deactivated users). The worker
+that made the change applies it at once; the others within one refresh.
+Rows are pruned once older than the access-token lifetime, when every token
+they could apply to has expired.
+"""
+from sqlalchemy import select, update, delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Tuple
+import asyncio
+import logging
+import os
+from .database import write_session
+from .models import User, TokenRevocation
+from .principals import invalidate_user
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_REFRESH_SECONDS = float(os.getenv("REVOCATION_REFRESH_SECONDS", "5"))
+# Same setting as auth.ACCESS_TOKEN_EXPIRE_MINUTES: no token outlives it
+REVOCATION_RETENTION = timedelta(minutes=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")))
+
+# user id -> (minimum trusted token version, revoked at)
+_minimum_versions: Dict[int, Tuple[int, datetime]] = {}
+
+metrics.register_gauge("revocations.entries", lambda: len(_minimum_versions))
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite returns naive UTC timestamps
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def claims_trusted(user_id: int, token_version: int) -> bool:
+    """Whether a token's claims still describe the user"""
+    entry = _minimum_versions.get(user_id)
+    return entry is None or token_version >= entry[0]
+
+
+def _note(user_id: int, token_version: int, revoked_at: datetime) -> None:
+    current = _minimum_versions.get(user_id)
+    if current is None or current[0] < token_version:
+        _minimum_versions[user_id] = (token_version, revoked_at)
+
+
+async def revoke_tokens(db: AsyncSession, user_id: int) -> None:
+    """Stop trusting the claims of the user's issued tokens; call in the transaction that changes the user"""
+    version = await db.scalar(
+        update(User).where(User.id == user_id).values(token_version=User.token_version + 1)
+        .returning(User.token_version).execution_options(synchronize_session=False)
+    )
+    if version is None:
+        return
+    now = datetime.now(timezone.utc)
+    await db.execute(delete(TokenRevocation).where(
+        (TokenRevocation.user_id == user_id) | (TokenRevocation.revoked_at < now - REVOCATION_RETENTION)
+    ))
+    await db.execute(insert(TokenRevocation), [{"user_id": user_id, "token_version": version, "revoked_at": now}])
+    # Applied before the commit: at worst a rolled-back change sends this user's tokens to the database
+    _note(user_id, version, now)
+    metrics.increment("revocations.revoked")
+
+
+async def refresh_revocations() -> None:
+    """Reload the revocation map from token_revocations (on the primary, replicas may lag)"""
+    async with write_session() as db:
+        rows = (await db.execute(
+            select(TokenRevocation.user_id, TokenRevocation.token_version, TokenRevocation.revoked_at)
+        )).all()
+    cutoff = datetime.now(timezone.utc) - REVOCATION_RETENTION
+    local = dict(_minimum_versions)
+    _minimum_versions.clear()
+    for user_id, token_version, revoked_at in rows:
+        _note(user_id, token_version, _aware(revoked_at))
+    # Keep this worker's own revocations that the query may have missed (not yet committed)
+    for user_id, (token_version, revoked_at) in local.items():
+        if revoked_at > cutoff:
+            _note(user_id, token_version, revoked_at)
+    # Revoked by another worker: this worker's cached principal predates the change
+    for user_id, (token_version, _) in _minimum_versions.items():
+        if user_id not in local or local[user_id][0] < token_version:
+            invalidate_user(user_id, propagate=False)
+    metrics.increment("revocations.refreshes")
+
+
+async def run_revocation_refresh() -> None:
+    """Refresh the revocation map every REVOCATION_REFRESH_SECONDS"""
+    while True:
+        await asyncio.sleep(REVOCATION_REFRESH_SECONDS)
+        try:
+            await refresh_revocations()
+        except Exception as e:
+            logger.warning(f"⚠️ Token revocation refresh failed: {e}")
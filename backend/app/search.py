@@ -0,0 +1,263 @@
+"""Full-text search over task titles, descriptions and comments.
+
+SQLite: an FTS5 table, search_index, with one row per task and per comment,
+kept in sync by triggers on tasks and comments. Row ids are task id * 2 and
+comment id * 2 + 1 so both kinds share one id space.
+
+PostgreSQL: a generated tsvector column on tasks and comments, each with a
+GIN index, so the database keeps them current without triggers.
+
+Both flavours rank into the same cursor order, (score, doc_id) ascending:
+score is bm25() on SQLite (lower is better) and -ts_rank() on PostgreSQL.
+"""
+from fastapi import HTTPException, status
+from sqlalchemy import text
+from typing import List, Optional, Tuple
+import html
+import re
+
+# Highlight markers: private-use characters that cannot clash with user text.
+# Results are HTML-escaped and the markers turned into <mark> afterwards.
+_START, _STOP = "\ue000", "\ue001"
+
+# bm25 weights for (title, body)
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        title, body, kind UNINDEXED, task_id UNINDEXED, comment_id UNINDEXED, board_id UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_search_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO search_index (rowid, title, body, kind, task_id, comment_id, board_id)
+        VALUES (new.id * 2, new.title, coalesce(new.description, ''), 'task', new.id, NULL, new.board_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_search_update AFTER UPDATE OF title, description ON tasks BEGIN
+        UPDATE search_index SET title = new.title, body = coalesce(new.description, '')
+        WHERE rowid = new.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_search_delete AFTER DELETE ON tasks BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS comments_search_insert AFTER INSERT ON comments BEGIN
+        INSERT INTO search_index (rowid, title, body, kind, task_id, comment_id, board_id)
+        VALUES (new.id * 2 + 1, '', new.content, 'comment', new.task_id, new.id,
+                (SELECT board_id FROM tasks WHERE id = new.task_id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS comments_search_update AFTER UPDATE OF content ON comments BEGIN
+        UPDATE search_index SET body = new.content WHERE rowid = new.id * 2 + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS comments_search_delete AFTER DELETE ON comments BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 2 + 1;
+    END
+    """,
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS comments_search_delete",
+    "DROP TRIGGER IF EXISTS comments_search_update",
+    "DROP TRIGGER IF EXISTS comments_search_insert",
+    "DROP TRIGGER IF EXISTS tasks_search_delete",
+    "DROP TRIGGER IF EXISTS tasks_search_update",
+    "DROP TRIGGER IF EXISTS tasks_search_insert",
+    "DROP TABLE IF EXISTS search_index",
+]
+
+SQLITE_REBUILD = [
+    "DELETE FROM search_index",
+    """
+    INSERT INTO search_index (rowid, title, body, kind, task_id, comment_id, board_id)
+    SELECT id * 2, title, coalesce(description, ''), 'task', id, NULL, board_id FROM tasks
+    """,
+    """
+    INSERT INTO search_index (rowid, title, body, kind, task_id, comment_id, board_id)
+    SELECT c.id * 2 + 1, '', c.content, 'comment', c.task_id, c.id, t.board_id
+    FROM comments c JOIN tasks t ON t.id = c.task_id
+    """,
+    "INSERT INTO search_index (search_index) VALUES ('optimize')",
+]
+
+POSTGRES_DDL = [
+    """
+    ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'D')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_tasks_search_vector ON tasks USING gin (search_vector)",
+    """
+    ALTER TABLE comments ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(content, '')), 'D')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_comments_search_vector ON comments USING gin (search_vector)",
+]
+
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS ix_comments_search_vector",
+    "ALTER TABLE comments DROP COLUMN IF EXISTS search_vector",
+    "DROP INDEX IF EXISTS ix_tasks_search_vector",
+    "ALTER TABLE tasks DROP COLUMN IF EXISTS search_vector",
+]
+
+# Generated columns are always current; rebuilding only compacts the GIN indexes
+POSTGRES_REBUILD = [
+    "REINDEX INDEX ix_tasks_search_vector",
+    "REINDEX INDEX ix_comments_search_vector",
+]
+
+
+def _unsupported(dialect: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_501_NOT_IMPLEMENTED,
+        detail=f"Full-text search is not available on {dialect}",
+    )
+
+
+def _statements(connection, sqlite: List[str], postgres: List[str]) -> List[str]:
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        return sqlite
+    if dialect == "postgresql":
+        return postgres
+    raise _unsupported(dialect)
+
+
+def install_search_index(connection) -> None:
+    """Create the search index objects if they are missing (sync connection)"""
+    for statement in _statements(connection, SQLITE_DDL, POSTGRES_DDL):
+        connection.execute(text(statement))
+
+
+def drop_search_index(connection) -> None:
+    for statement in _statements(connection, SQLITE_DROP, POSTGRES_DROP):
+        connection.execute(text(statement))
+
+
+def rebuild_search_index(connection) -> None:
+    """Re-index every existing task and comment (sync connection)"""
+    for statement in _statements(connection, SQLITE_REBUILD, POSTGRES_REBUILD):
+        connection.execute(text(statement))
+
+
+def search_terms(query: str) -> List[str]:
+    """Words of a user query; punctuation and search operators are dropped"""
+    return re.findall(r"\w+", query or "")
+
+
+def highlight(value: Optional[str]) -> str:
+    """HTML-escape a highlighted fragment and turn the markers into <mark> tags"""
+    escaped = html.escape(value or "")
+    return escaped.replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+
+# Boards the caller may search: their own, not awaiting purge
+_BOARDS = "SELECT id FROM boards WHERE created_by = :user_id AND is_active {board_filter}"
+
+_SQLITE_SEARCH = f"""
+SELECT hits.*, tasks.title AS task_title FROM (
+    SELECT rowid AS doc_id, kind, task_id, comment_id, board_id,
+           highlight(search_index, 0, :start, :stop) AS title,
+           snippet(search_index, 1, :start, :stop, '…', 16) AS snippet,
+           bm25(search_index, {TITLE_WEIGHT}, {BODY_WEIGHT}) AS score
+    FROM search_index
+    WHERE search_index MATCH :match AND board_id IN ({{boards}})
+) AS hits JOIN tasks ON tasks.id = hits.task_id
+{{after}}
+ORDER BY score, doc_id
+LIMIT :limit
+"""
+
+_POSTGRES_SEARCH = """
+WITH q AS (SELECT to_tsquery('simple', :match) AS query),
+hits AS (
+    SELECT t.id * 2 AS doc_id, 'task' AS kind, t.id AS task_id, NULL::integer AS comment_id, t.board_id,
+           t.title AS task_title, coalesce(t.description, '') AS body,
+           -ts_rank(t.search_vector, q.query) AS score
+    FROM tasks t, q
+    WHERE t.search_vector @@ q.query AND t.board_id IN ({boards})
+    UNION ALL
+    SELECT c.id * 2 + 1, 'comment', c.task_id, c.id, t.board_id,
+           t.title, c.content, -ts_rank(c.search_vector, q.query)
+    FROM comments c JOIN tasks t ON t.id = c.task_id, q
+    WHERE c.search_vector @@ q.query AND t.board_id IN ({boards})
+),
+page AS (
+    SELECT * FROM hits {after} ORDER BY score, doc_id LIMIT :limit
+)
+-- Headlines are computed for the page only
+SELECT doc_id, kind, task_id, comment_id, board_id, task_title,
+       ts_headline('simple', task_title, q.query, :title_options) AS title,
+       ts_headline('simple', body, q.query, :snippet_options) AS snippet,
+       score
+FROM page, q
+ORDER BY score, doc_id
+"""
+
+
+async def search_documents(
+    db,
+    terms: List[str],
+    user_id: int,
+    board_id: Optional[int] = None,
+    limit: int = 50,
+    after: Optional[Tuple[float, int]] = None,
+) -> List[dict]:
+    """Ranked hits for all terms (prefix-matched) on the user's boards.
+
+    Returns up to `limit` dicts with doc_id, kind, task_id, comment_id,
+    board_id, title, snippet and score. Title and snippet are safe HTML;
+    a comment hit's title is its task's title.
+    """
+    dialect = db.get_bind().dialect.name
+    params = {"user_id": user_id, "limit": limit}
+    boards = _BOARDS.format(board_filter="AND id = :board_id" if board_id is not None else "")
+    if board_id is not None:
+        params["board_id"] = board_id
+    after_sql = ""
+    if after is not None:
+        after_sql = "WHERE (score, doc_id) > (:after_score, :after_doc_id)"
+        params.update(after_score=after[0], after_doc_id=after[1])
+
+    if dialect == "sqlite":
+        # Quote every term so FTS5 operators in user input are taken literally
+        params.update(match=" ".join(f'"{term}"*' for term in terms), start=_START, stop=_STOP)
+        sql = _SQLITE_SEARCH.format(boards=boards, after=after_sql)
+    elif dialect == "postgresql":
+        params.update(
+            match=" & ".join(f"{term}:*" for term in terms),
+            title_options=f"StartSel={_START}, StopSel={_STOP}, HighlightAll=true",
+            snippet_options=f"StartSel={_START}, StopSel={_STOP}, MaxWords=32, MinWords=8",
+        )
+        sql = _POSTGRES_SEARCH.format(boards=boards, after=after_sql)
+    else:
+        raise _unsupported(dialect)
+
+    rows = (await db.execute(text(sql), params)).mappings().all()
+    return [
+        {
+            "doc_id": row["doc_id"],
+            "kind": row["kind"],
+            "task_id": row["task_id"],
+            "comment_id": row["comment_id"],
+            "board_id": row["board_id"],
+            "title": highlight(row["title"]) if row["kind"] == "task" or dialect != "sqlite" else html.escape(row["task_title"]),
+            "snippet": highlight(row["snippet"]),
+            "score": row["score"],
+        }
+        for row in rows
+    ]
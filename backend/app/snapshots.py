@@ -0,0 +1,71 @@
+"""Serialized board snapshots for GET /boards/{id}.
+
+Building the full board tree (ORM load plus nested BoardResponse) is the
+most expensive read, and many users open the same boards. The JSON bytes
+of the full response are kept per board together with the version they
+were built at; a request whose version lookup finds the same version is
+answered with those bytes, skipping the load and response_model validation.
+
+Every write to a board goes through versioning.record_changes, which drops
+the board's entry. Since entries are also matched on version, a snapshot
+stored by a read that raced with a write is never served after it.
+
+Memory is bounded by BOARD_SNAPSHOT_CACHE_BYTES (least recently used
+boards are evicted first). Hits, misses and evictions are in GET /metrics.
+"""
+from collections import OrderedDict
+from typing import Optional, Tuple
+import os
+from . import metrics
+
+MAX_SNAPSHOT_BYTES = int(os.getenv("BOARD_SNAPSHOT_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+# board id -> (version, JSON bytes)
+_cache: "OrderedDict[int, Tuple[int, bytes]]" = OrderedDict()
+_size = 0
+
+metrics.register_gauge("board_snapshots.bytes", lambda: _size)
+metrics.register_gauge("board_snapshots.entries", lambda: len(_cache))
+
+
+def get_snapshot(board_id: int, version: int) -> Optional[bytes]:
+    """The board's serialized response at version, if cached"""
+    entry = _cache.get(board_id)
+    if entry is None or entry[0] != version:
+        metrics.increment("board_snapshots.misses")
+        return None
+    _cache.move_to_end(board_id)
+    metrics.increment("board_snapshots.hits")
+    return entry[1]
+
+
+def store_snapshot(board_id: int, version: int, body: bytes) -> None:
+    global _size
+    if len(body) > MAX_SNAPSHOT_BYTES:
+        return
+    current = _cache.get(board_id)
+    # A slower read of an older version must not replace a newer snapshot
+    if current is not None and current[0] > version:
+        return
+    _discard(board_id)
+    _cache[board_id] = (version, body)
+    _size += len(body)
+    while _size > MAX_SNAPSHOT_BYTES:
+        _, (_, evicted) = _cache.popitem(last=False)
+        _size -= len(evicted)
+        metrics.increment("board_snapshots.evictions")
+
+
+def invalidate_board(board_id: int) -> None:
+    """Drop a board's snapshot after a change to it"""
+    if _discard(board_id):
+        metrics.increment("board_snapshots.invalidations")
+
+
+def _discard(board_id: int) -> bool:
+    global _size
+    entry = _cache.pop(board_id, None)
+    if entry is None:
+        return False
+    _size -= len(entry[1])
+    return True
@@ -0,0 +1,185 @@
+"""Per-column and per-board task counters (column_stats / board_stats).
+
+The task write paths report what they changed as (column id, +1/-1, figures)
+entries: +1 adds a task's contribution to its column, -1 removes it. An edit
+is -1 old / +1 new, a move is -1 old column / +1 new column. The deltas are
+applied in the caller's transaction, so the counters commit or roll back
+together with the tasks.
+
+python -m app.repair_stats recomputes the counters from the tasks table.
+"""
+from sqlalchemy import select, insert, update, delete, func, case, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from .models import Board, Column, Task, ColumnStats, BoardStats
+from .workload import BACKLOG_COLUMNS, TODO_COLUMNS, IN_PROGRESS_COLUMNS, is_done_column
+
+# Counter columns shared by column_stats and board_stats
+FIELDS = ("task_count", "open_count", "estimated_hours", "hours_used", "completed_hours")
+
+# (estimated_hours, hours_used, completed_hours) of one task
+TaskFigures = Tuple[Optional[float], Optional[float], Optional[float]]
+
+
+def task_figures(task) -> TaskFigures:
+    """Figures of a Task row or a TaskCreate payload"""
+    return (task.estimated_hours, task.hours_used, task.completed_hours)
+
+
+def _zero() -> Dict[str, float]:
+    return dict.fromkeys(FIELDS, 0)
+
+
+async def record_task_changes(db: AsyncSession, board_id: int, changes: Iterable[Tuple[int, int, TaskFigures]]) -> Set[int]:
+    """Apply (column id, +1/-1, figures) entries to column_stats and board_stats; returns the columns whose counters changed"""
+    changes = list(changes)
+    if not changes:
+        return set()
+
+    # Done-ness decides open_count; one indexed lookup for all columns involved
+    column_ids = {column_id for column_id, _, _ in changes}
+    names = dict((await db.execute(select(Column.id, Column.name).where(Column.id.in_(column_ids)))).all())
+
+    column_deltas: Dict[int, Dict[str, float]] = defaultdict(_zero)
+    for column_id, sign, (estimated, used, completed) in changes:
+        delta = column_deltas[column_id]
+        delta["task_count"] += sign
+        if not is_done_column(names.get(column_id)):
+            delta["open_count"] += sign
+        delta["estimated_hours"] += sign * (estimated or 0)
+        delta["hours_used"] += sign * (used or 0)
+        delta["completed_hours"] += sign * (completed or 0)
+
+    board_delta = _zero()
+    for delta in column_deltas.values():
+        for field in FIELDS:
+            board_delta[field] += delta[field]
+
+    rows = [
+        {"key": column_id, **{f"d_{field}": delta[field] for field in FIELDS}}
+        for column_id, delta in column_deltas.items()
+        if any(delta.values())
+    ]
+    if rows:
+        table = ColumnStats.__table__
+        await db.execute(
+            update(table).where(table.c.column_id == bindparam("key"))
+            .values({field: table.c[field] + bindparam(f"d_{field}") for field in FIELDS}),
+            rows,
+        )
+    if any(board_delta.values()):
+        await db.execute(
+            update(BoardStats.__table__).where(BoardStats.board_id == board_id)
+            .values({field: getattr(BoardStats, field) + board_delta[field] for field in FIELDS})
+        )
+    return {row["key"] for row in rows}
+
+
+async def create_stats_rows(db: AsyncSession, board_id: int, column_ids: Iterable[int] = (), board: bool = False) -> None:
+    """Zeroed counter rows for new columns (and the board itself when board=True)"""
+    if board:
+        await db.execute(insert(BoardStats), [{"board_id": board_id}])
+    rows = [{"column_id": column_id, "board_id": board_id} for column_id in column_ids]
+    if rows:
+        await db.execute(insert(ColumnStats), rows)
+
+
+async def column_renamed(db: AsyncSession, column_id: int, board_id: int, name: str) -> None:
+    """Recount open_count after a rename that may have made the column (not) done"""
+    stats = await db.scalar(select(ColumnStats).where(ColumnStats.column_id == column_id))
+    if stats is None:
+        return
+    open_count = 0 if is_done_column(name) else stats.task_count
+    if open_count != stats.open_count:
+        await db.execute(
+            update(BoardStats.__table__).where(BoardStats.board_id == board_id)
+            .values(open_count=BoardStats.open_count + (open_count - stats.open_count))
+        )
+        stats.open_count = open_count
+
+
+async def column_removed(db: AsyncSession, column_id: int, board_id: int) -> None:
+    """Subtract a column that is being deleted (with its tasks) from its board"""
+    stats = await db.scalar(select(ColumnStats).where(ColumnStats.column_id == column_id))
+    if stats is None:
+        return
+    await db.execute(
+        update(BoardStats.__table__).where(BoardStats.board_id == board_id)
+        .values({field: getattr(BoardStats, field) - getattr(stats, field) for field in FIELDS})
+    )
+
+
+# Consistency check / repair (sync connection, used by the repair command and migrations)
+
+def _expected_column_stats(connection, board_id: Optional[int] = None) -> Dict[int, dict]:
+    """Counters recomputed from tasks for every column"""
+    not_done = func.lower(func.trim(Column.name)).in_(BACKLOG_COLUMNS + TODO_COLUMNS + IN_PROGRESS_COLUMNS)
+    stmt = (
+        select(
+            Column.id,
+            Column.board_id,
+            func.count(Task.id),
+            func.coalesce(func.sum(case((Task.id.is_not(None) & not_done, 1), else_=0)), 0),
+            func.coalesce(func.sum(Task.estimated_hours), 0),
+            func.coalesce(func.sum(Task.hours_used), 0),
+            func.coalesce(func.sum(Task.completed_hours), 0),
+        )
+        .select_from(Column)
+        .outerjoin(Task, Task.column_id == Column.id)
+        .group_by(Column.id, Column.board_id, Column.name)
+    )
+    if board_id is not None:
+        stmt = stmt.where(Column.board_id == board_id)
+    return {
+        row[0]: {"board_id": row[1], **dict(zip(FIELDS, row[2:]))}
+        for row in connection.execute(stmt)
+    }
+
+
+def _differs(actual: dict, expected: dict) -> bool:
+    return any(abs((actual.get(field) or 0) - (expected.get(field) or 0)) > 1e-6 for field in FIELDS)
+
+
+def check_stats(connection, repair: bool = False, board_id: Optional[int] = None) -> List[str]:
+    """Compare the counters with the tasks table; return the mismatches, fixing them if repair=True"""
+    expected_columns = _expected_column_stats(connection, board_id)
+    expected_boards: Dict[int, dict] = defaultdict(_zero)
+    board_stmt = select(Board.id)
+    if board_id is not None:
+        board_stmt = board_stmt.where(Board.id == board_id)
+    for (bid,) in connection.execute(board_stmt):
+        expected_boards[bid]
+    for values in expected_columns.values():
+        for field in FIELDS:
+            expected_boards[values["board_id"]][field] += values[field]
+
+    column_criteria = [] if board_id is None else [ColumnStats.board_id == board_id]
+    board_criteria = [] if board_id is None else [BoardStats.board_id == board_id]
+    actual_columns = {
+        row.column_id: row._asdict()
+        for row in connection.execute(select(ColumnStats.column_id, *[getattr(ColumnStats, f) for f in FIELDS]).where(*column_criteria))
+    }
+    actual_boards = {
+        row.board_id: row._asdict()
+        for row in connection.execute(select(BoardStats.board_id, *[getattr(BoardStats, f) for f in FIELDS]).where(*board_criteria))
+    }
+
+    problems = []
+    for kind, model, key, expected, actual in (
+        ("column", ColumnStats, "column_id", expected_columns, actual_columns),
+        ("board", BoardStats, "board_id", expected_boards, actual_boards),
+    ):
+        for row_id, values in expected.items():
+            current = actual.get(row_id)
+            if current is not None and not _differs(current, values):
+                continue
+            problems.append(f"{kind} {row_id}: {'missing' if current is None else current} != {values}")
+            if repair:
+                connection.execute(delete(model).where(getattr(model, key) == row_id))
+                connection.execute(insert(model).values({key: row_id, **values}))
+        for row_id in set(actual) - set(expected):
+            problems.append(f"{kind} {row_id}: counters for a deleted {kind}")
+            if repair:
+                connection.execute(delete(model).where(getattr(model, key) == row_id))
+    return problems
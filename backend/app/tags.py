@@ -0,0 +1,51 @@
+from sqlalchemy import select, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Iterable, List
+from .models import Tag
+
+# Dialects whose INSERT can skip rows that would violate tags.name's unique index
+_INSERT_IGNORING_CONFLICTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+def normalize_tag_names(names: Iterable[str]) -> List[str]:
+    """Strip blanks and duplicates while keeping the first spelling of each tag"""
+    seen = set()
+    result = []
+    for name in names or []:
+        name = (name or "").strip()
+        if name and name not in seen:
+            seen.add(name)
+            result.append(name)
+    return result
+
+
+async def _existing_tags(db: AsyncSession, names: List[str]) -> Dict[str, Tag]:
+    return {tag.name: tag for tag in (await db.scalars(select(Tag).where(Tag.name.in_(names)))).all()}
+
+
+async def resolve_tags(db: AsyncSession, names: Iterable[str]) -> List[Tag]:
+    """Return Tag rows for the given names, creating the missing ones.
+
+    One SELECT when every tag exists. Missing ones are inserted with ON
+    CONFLICT DO NOTHING and read back, so a concurrent request creating the
+    same tag does not fail on the unique name.
+    """
+    names = normalize_tag_names(names)
+    if not names:
+        return []
+
+    existing = await _existing_tags(db, names)
+    missing = [name for name in names if name not in existing]
+    if missing:
+        make_insert = _INSERT_IGNORING_CONFLICTS.get(db.get_bind().dialect.name)
+        if make_insert is None:
+            statement = insert(Tag)
+        else:
+            statement = make_insert(Tag).on_conflict_do_nothing(index_elements=[Tag.name])
+        await db.execute(statement, [{"name": name} for name in missing])
+        existing.update(await _existing_tags(db, missing))
+    return [existing[name] for name in names]
@@ -0,0 +1,89 @@
+"""Composable task filters for GET /tasks/search.
+
+Every filter becomes a WHERE criterion on tasks, so a search is one SELECT
+(plus the usual eager loads for the response) that the database can answer
+from the task indexes instead of the client downloading whole boards.
+"""
+from sqlalchemy import select, and_, or_
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+from .models import Board, Task, Tag, TaskTag
+from .pagination import decode_cursor, keyset_after
+
+# sort name -> keyset keys (the last key is always the unique id)
+TASK_SORTS = {
+    "position": (Task.column_id, Task.position, Task.id),
+    "created_at": (Task.created_at, Task.id),
+    "due_date": (Task.due_date, Task.id),
+}
+
+
+def parse_sort(sort: str) -> Tuple[Sequence, bool]:
+    """Return (keys, descending) for "name" or "-name"; ValueError for unknown names"""
+    descending = sort.startswith("-")
+    keys = TASK_SORTS.get(sort.lstrip("-"))
+    if keys is None:
+        raise ValueError(f"sort must be one of: {', '.join(TASK_SORTS)} (prefix with - for descending)")
+    return keys, descending
+
+
+def task_filters(
+    user_id: int,
+    board_id: Optional[int] = None,
+    column_id: Optional[int] = None,
+    assignee_id: Optional[int] = None,
+    priority: Optional[List[str]] = None,
+    tag: Optional[List[str]] = None,
+    due_after: Optional[datetime] = None,
+    due_before: Optional[datetime] = None,
+    is_active: Optional[bool] = None,
+) -> list:
+    """WHERE criteria for a task search; repeated priority/tag values match any of them"""
+    criteria = [
+        # Only tasks on the user's boards that are not awaiting purge
+        Task.board_id.in_(select(Board.id).where(Board.created_by == user_id, Board.is_active == True)),
+    ]
+    if board_id is not None:
+        criteria.append(Task.board_id == board_id)
+    if column_id is not None:
+        criteria.append(Task.column_id == column_id)
+    if assignee_id is not None:
+        criteria.append(Task.assignee_id == assignee_id)
+    if priority:
+        criteria.append(Task.priority.in_(priority))
+    if tag:
+        # Resolved through the unique tags.name index and task_tags(tag_id, task_id)
+        criteria.append(Task.id.in_(
+            select(TaskTag.task_id).join(Tag, Tag.id == TaskTag.tag_id).where(Tag.name.in_(tag))
+        ))
+    if due_after is not None:
+        criteria.append(Task.due_date >= due_after)
+    if due_before is not None:
+        criteria.append(Task.due_date < due_before)
+    if is_active is not None:
+        criteria.append(Task.is_active == is_active)
+    return criteria
+
+
+def sort_order(keys: Sequence, descending: bool) -> tuple:
+    """ORDER BY for a sort; tasks without a due date come last either way"""
+    order = [key.desc() if descending else key for key in keys]
+    if keys[0] is Task.due_date:
+        order.insert(0, Task.due_date.is_(None))
+    return tuple(order)
+
+
+def sort_after(db, keys: Sequence, descending: bool, after: Optional[str]) -> list:
+    """Keyset criteria continuing a search after the cursor"""
+    if not after:
+        return []
+    values = decode_cursor(after, keys)
+    if keys[0] is not Task.due_date:
+        return [keyset_after(db, keys, values, descending)]
+
+    # due_date is nullable and a row-value comparison with NULL is never true:
+    # dated tasks are paged first, then undated ones by id
+    due_date, task_id = values
+    if due_date is None:
+        return [and_(Task.due_date.is_(None), Task.id < task_id if descending else Task.id > task_id)]
+    return [or_(Task.due_date.is_(None), keyset_after(db, keys, values, descending))]
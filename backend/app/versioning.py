@@ -0,0 +1,123 @@
+"""Board versions and the board change log.
+
+Every change to a board's columns, tasks or comments increments
+Board.version and records what changed in board_changes, in the same
+transaction. Caches keyed by (board id, version) then never serve stale
+data, and GET /boards/{id}/changes?since=<version> can return just the
+entities changed after a client's copy.
+
+board_changes keeps one row per entity -- its latest change -- so it grows
+with the number of live columns and tasks, not with the number of edits.
+Deletion markers are dropped once they are CHANGE_RETENTION versions old;
+Board.compacted_version records how far back the log is still complete.
+
+The version also validates HTTP caches: board, task and comment reads send
+a strong ETag derived from it, and a matching If-None-Match is answered
+with 304 after one indexed lookup of the version.
+"""
+from sqlalchemy import select, update, delete, insert, tuple_, union
+from sqlalchemy.ext.asyncio import AsyncSession
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+import hashlib
+import os
+from .models import Board, BoardChange, Task, Comment
+from .snapshots import invalidate_board
+
+# Entity kinds in board_changes; comment changes are logged against their task
+BOARD = "board"
+COLUMN = "column"
+TASK = "task"
+
+# (entity, entity id, deleted)
+Change = Tuple[str, int, bool]
+
+# Versions a deletion stays visible to GET /boards/{id}/changes
+CHANGE_RETENTION = int(os.getenv("BOARD_CHANGE_RETENTION", "1000"))
+
+# Old deletion markers are pruned every this many versions of a board
+COMPACT_EVERY = 100
+
+
+async def record_changes(db: AsyncSession, board_id: int, changes: Iterable[Change]) -> int:
+    """Increment the board's version and log the changed entities at it; returns the new version.
+
+    Call in the same transaction as the change. Loaded Board objects are not
+    refreshed; reload them to read the new version.
+    """
+    version = await db.scalar(
+        update(Board).where(Board.id == board_id).values(version=Board.version + 1)
+        .returning(Board.version).execution_options(synchronize_session=False)
+    )
+    invalidate_board(board_id)
+
+    # The last change to an entity wins
+    latest = {(entity, entity_id): deleted for entity, entity_id, deleted in changes}
+    if latest:
+        await db.execute(delete(BoardChange).where(
+            BoardChange.board_id == board_id,
+            tuple_(BoardChange.entity, BoardChange.entity_id).in_(list(latest)),
+        ))
+        await db.execute(insert(BoardChange), [
+            {"board_id": board_id, "entity": entity, "entity_id": entity_id, "version": version, "deleted": deleted}
+            for (entity, entity_id), deleted in latest.items()
+        ])
+
+    if version and version % COMPACT_EVERY == 0:
+        await compact_changes(db, board_id, version - CHANGE_RETENTION)
+    return version
+
+
+async def compact_changes(db: AsyncSession, board_id: int, up_to_version: int) -> None:
+    """Drop deletion markers at or before up_to_version; clients behind it must reload the board"""
+    if up_to_version <= 0:
+        return
+    await db.execute(delete(BoardChange).where(
+        BoardChange.board_id == board_id, BoardChange.deleted == True, BoardChange.version <= up_to_version
+    ))
+    await db.execute(
+        update(Board).where(Board.id == board_id, Board.compacted_version < up_to_version)
+        .values(compacted_version=up_to_version).execution_options(synchronize_session=False)
+    )
+
+
+async def changes_since(db: AsyncSession, board_id: int, since: int, version: int) -> list:
+    """(entity, entity_id, deleted) of the board's changes after since, up to version"""
+    rows = await db.execute(
+        select(BoardChange.entity, BoardChange.entity_id, BoardChange.deleted)
+        .where(BoardChange.board_id == board_id, BoardChange.version > since, BoardChange.version <= version)
+    )
+    return list(rows.all())
+
+
+async def record_user_changes(db: AsyncSession, user_id: int) -> None:
+    """Log the tasks that embed a user (as assignee or comment author) after a change to that user"""
+    rows = (await db.execute(union(
+        select(Task.board_id, Task.id).where(Task.assignee_id == user_id),
+        select(Task.board_id, Task.id).join(Comment, Comment.task_id == Task.id).where(Comment.author_id == user_id),
+    ))).all()
+    tasks_by_board = defaultdict(list)
+    for board_id, task_id in rows:
+        tasks_by_board[board_id].append((TASK, task_id, False))
+    for board_id, changes in tasks_by_board.items():
+        await record_changes(db, board_id, changes)
+
+
+def board_etag(board_id: int, version: int, created_at: Optional[datetime], *variant) -> str:
+    """Strong ETag for a representation of a board's contents at a version.
+
+    variant tells apart the representations of one board version (resource,
+    id, fields/expand, page); created_at guards against reused board ids.
+    """
+    digest = hashlib.sha1(repr((created_at, variant)).encode()).hexdigest()[:16]
+    return f'"b{board_id}v{version}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches etag (weak comparison, as RFC 9110 specifies for it)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
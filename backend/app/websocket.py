@@ -110,6 +110,7 @@ class WebSocketEvent:
     TASK_UPDATED = "task_updated"
     TASK_DELETED = "task_deleted"
     TASK_MOVED = "task_moved"
+    TASKS_BATCH = "tasks_batch"
 
     # Comment events
     COMMENT_CREATED = "comment_created"
@@ -125,7 +126,7 @@ class WebSocketEvent:
     TASK_MENTIONED = "task_mentioned"
     COMMENT_MENTIONED = "comment_mentioned"
 
-def create_event_message(event_type: str, data: dict, board_id: int = None, user_id: int = None) -> dict:
+def create_event_message(event_type: str, data: dict, board_id: int = None, user_id: int = None, version: int = None) -> dict:
     """Create a standardized WebSocket message"""
     message = {
         "type": event_type,
@@ -137,6 +138,9 @@ def create_event_message(event_type: str, data: dict, board_id: int = None, user
         message["board_id"] = board_id
     if user_id:
         message["user_id"] = user_id
+    # Board version after the change; a client that skipped one catches up with GET /boards/{id}/changes
+    if version is not None:
+        message["version"] = version
 
     return message
 
@@ -0,0 +1,105 @@
+"""Per-assignee workload metrics computed in SQL.
+
+One GROUP BY over tasks joined to columns replaces the browser-side
+groupTasksByAssignee / computeMetricsForTasks pass over whole boards. A
+task's status comes from its column name, with the same rules as
+statusFromColumnName in frontend/src/utils/workload.ts.
+
+Results are cached per (boards, assignee) and keyed by the boards' versions,
+so any change to a board is picked up on the next request.
+"""
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+from .models import Column, Task, WorkloadMetrics, WorkloadEntry
+
+# Column names (trimmed, lowercase) of the not-done statuses; any other column counts as done
+BACKLOG_COLUMNS = ("backlog",)
+TODO_COLUMNS = ("to do", "todo")
+IN_PROGRESS_COLUMNS = ("in progress",)
+
+
+def is_done_column(name: Optional[str]) -> bool:
+    return (name or "").strip().lower() not in BACKLOG_COLUMNS + TODO_COLUMNS + IN_PROGRESS_COLUMNS
+
+
+# (board versions, assignee filter) -> entries
+MAX_CACHED_WORKLOADS = 1024
+_cache: "OrderedDict[Tuple, List[WorkloadEntry]]" = OrderedDict()
+
+
+def _column_key():
+    return func.lower(func.trim(Column.name))
+
+
+def _metrics(task_count, done_count, wip_count, hours_done, hours_not_done, hours_used, completed_hours) -> WorkloadMetrics:
+    task_count = task_count or 0
+    done_count = done_count or 0
+    return WorkloadMetrics(
+        task_count=task_count,
+        done_count=done_count,
+        not_done_count=task_count - done_count,
+        wip_count=wip_count or 0,
+        hours_done=float(hours_done or 0),
+        hours_not_done=float(hours_not_done or 0),
+        hours_used=float(hours_used or 0),
+        completed_hours=float(completed_hours or 0),
+        completion_ratio=done_count / task_count if task_count else 0.0,
+    )
+
+
+async def _aggregate(db: AsyncSession, board_ids: Sequence[int], assignee_id: Optional[int]) -> List[WorkloadEntry]:
+    column_key = _column_key()
+    done = column_key.not_in(BACKLOG_COLUMNS + TODO_COLUMNS + IN_PROGRESS_COLUMNS)
+    estimate = func.coalesce(Task.estimated_hours, 0)
+    stmt = (
+        select(
+            Task.assignee_id,
+            func.count(Task.id),
+            func.sum(case((done, 1), else_=0)),
+            func.sum(case((column_key.in_(IN_PROGRESS_COLUMNS), 1), else_=0)),
+            func.sum(case((done, estimate), else_=0)),
+            func.sum(case((done, 0), else_=estimate)),
+            func.sum(func.coalesce(Task.hours_used, 0)),
+            func.sum(func.coalesce(Task.completed_hours, 0)),
+        )
+        .join(Column, Column.id == Task.column_id)
+        .where(Task.board_id.in_(board_ids))
+        .group_by(Task.assignee_id)
+        .order_by(Task.assignee_id)
+    )
+    if assignee_id is not None:
+        stmt = stmt.where(Task.assignee_id == assignee_id)
+    rows = (await db.execute(stmt)).all()
+    return [WorkloadEntry(assignee_id=row[0], metrics=_metrics(*row[1:])) for row in rows]
+
+
+async def compute_workload(
+    db: AsyncSession, board_versions: Dict[int, int], assignee_id: Optional[int] = None
+) -> List[WorkloadEntry]:
+    """Workload entries (one per assignee, None = unassigned) for the given {board id: version}"""
+    key = (tuple(sorted(board_versions.items())), assignee_id)
+    entries = _cache.get(key)
+    if entries is not None:
+        _cache.move_to_end(key)
+        return entries
+
+    entries = await _aggregate(db, list(board_versions), assignee_id) if board_versions else []
+    _cache[key] = entries
+    while len(_cache) > MAX_CACHED_WORKLOADS:
+        _cache.popitem(last=False)
+    return entries
+
+
+def total_metrics(entries: List[WorkloadEntry]) -> WorkloadMetrics:
+    m = [entry.metrics for entry in entries]
+    return _metrics(
+        sum(x.task_count for x in m),
+        sum(x.done_count for x in m),
+        sum(x.wip_count for x in m),
+        sum(x.hours_done for x in m),
+        sum(x.hours_not_done for x in m),
+        sum(x.hours_used for x in m),
+        sum(x.completed_hours for x in m),
+    )
@@ -3,6 +3,8 @@
 from sqlalchemy import create_engine
 from app.database import Base
 from app.models import User, Board, Column, Task, Comment  # Import models to ensure they're registered
+from app.search import install_search_index
+from app.stats import check_stats
 import os
 
 def create_database():
@@ -12,6 +14,11 @@ def create_database():
 
     # Create all tables
     Base.metadata.create_all(bind=engine)
+    # Full-text search table and triggers live outside the ORM metadata
+    with engine.begin() as connection:
+        install_search_index(connection)
+        # Counter rows for boards that existed before column_stats/board_stats
+        check_stats(connection, repair=True)
     print("Database created successfully!")
 
 if __name__ == "__main__":
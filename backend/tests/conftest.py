@@ -0,0 +1,145 @@
+"""Shared fixtures: the API on a throwaway SQLite database.
+
+Settings are read when the app modules are imported, so the environment is
+fixed here before the first import. Tests share one database and create
+their own users and boards.
+"""
+import itertools
+import os
+import tempfile
+
+DATA_DIR = tempfile.mkdtemp(prefix="kanban-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{DATA_DIR}/test.db",
+    "SQLITE_PERFORMANCE_PROFILE": "false",
+    "DATABASE_REPLICA_URLS": "",
+    "PENDING_REGISTRATION": "false",
+    "AUTH_RATE_LIMIT_ENABLED": "false",
+    # The cheapest cost bcrypt accepts; tests do not measure hashing
+    "BCRYPT_ROUNDS": "4",
+})
+for name in ("ADMIN_EMAIL", "ADMIN_USERNAME", "ADMIN_PASSWORD"):
+    os.environ.pop(name, None)
+
+from contextlib import contextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, update
+
+from app import database
+from app.main import app
+from app.models import User
+from app.principals import invalidate_user
+from app.search import install_search_index
+
+_names = itertools.count(1)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    database.Base.metadata.create_all(database.engine)
+    with database.engine.begin() as connection:
+        install_search_index(connection)
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def register(client):
+    """register() -> (user json, auth headers) for a new active user"""
+    def register_user():
+        n = next(_names)
+        response = client.post("/auth/register", json={
+            "email": f"user{n}@example.com", "username": f"user{n}", "full_name": f"User {n}", "password": "secret",
+        })
+        assert response.status_code == 200, response.text
+        body = response.json()
+        return body["user"], {"Authorization": f"Bearer {body['access_token']}"}
+    return register_user
+
+
+@pytest.fixture
+def admin(client, register):
+    """An admin user with a token claiming it: (user json, auth headers)"""
+    user, _ = register()
+    with database.engine.begin() as connection:
+        connection.execute(update(User).where(User.id == user["id"]).values(is_admin=True))
+    invalidate_user(user["id"])
+    return user, login(client, user["username"])
+
+
+def login(client, username, password="secret"):
+    """Auth headers from POST /auth/login"""
+    response = client.post("/auth/login", json={"username": username, "password": password})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def board(client, register):
+    """A new board with its default columns, owned by a new user: (board json, auth headers)"""
+    user, headers = register()
+    response = client.post("/boards", json={"name": "Board", "description": "Test board"}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json(), headers
+
+
+def _sync_engines(*engines):
+    for engine in engines:
+        if engine is not None:
+            yield getattr(engine, "sync_engine", engine)
+
+
+@contextmanager
+def capture_statements(*engines):
+    """Collect (sql, parameters) of the statements run on the given engines (default: the primary ones) inside the block"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    targets = list(_sync_engines(*(engines or (database.engine, database.async_engine))))
+    for target in targets:
+        event.listen(target, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        for target in targets:
+            event.remove(target, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def sqlite_profile(monkeypatch):
+    """Serve requests through the SQLITE_PERFORMANCE_PROFILE engines: one writer connection and a read-only pool"""
+    monkeypatch.setattr(database, "SQLITE_PERFORMANCE_PROFILE", True)
+    writer = database._build_engines(database.RAW_DATABASE_URL, read_only=False)
+    reader = database._build_engines(database.RAW_DATABASE_URL, read_only=True)
+    # Fail in seconds rather than after the default 30 s pool timeout
+    for engine in _sync_engines(*writer):
+        engine.pool._timeout = 5
+    sync_factory, async_factory = database._session_factories(*writer)
+    monkeypatch.setattr(database, "engine", writer[0])
+    monkeypatch.setattr(database, "async_engine", writer[1])
+    monkeypatch.setattr(database, "SessionLocal", sync_factory)
+    monkeypatch.setattr(database, "AsyncSessionLocal", async_factory)
+    monkeypatch.setattr(database, "_read_session_factories", itertools.cycle([database._session_factories(*reader)]))
+    yield writer
+    for engine in (writer[0], reader[0]):
+        engine.dispose()
+
+
+@pytest.fixture
+def replica(monkeypatch, tmp_path):
+    """Route reads to a second SQLite database that never receives the writes: a replica lagging forever"""
+    url = f"sqlite:///{tmp_path}/replica.db"
+    engines = database._build_engines(url, read_only=True)
+    database.Base.metadata.create_all(engines[0])
+    monkeypatch.setattr(database, "DATABASE_REPLICA_URLS", [url])
+    monkeypatch.setattr(database, "_read_session_factories", itertools.cycle([database._session_factories(*engines)]))
+    yield engines
+    engines[0].dispose()
@@ -0,0 +1,134 @@
+"""Access tokens: claims, revocation and the principal cache."""
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import delete, insert, select, update
+
+from app import auth, database, principals, rate_limit, revocations
+from app.models import TokenRevocation, User
+from app.principals import Principal
+from conftest import capture_statements, login
+
+
+def _revoke_elsewhere(user_id, **values):
+    """Change a user and revoke its tokens the way another worker would: in the database only"""
+    with database.engine.begin() as connection:
+        connection.execute(update(User).where(User.id == user_id).values(token_version=User.token_version + 1, **values))
+        version = connection.scalar(select(User.token_version).where(User.id == user_id))
+        connection.execute(delete(TokenRevocation).where(TokenRevocation.user_id == user_id))
+        connection.execute(insert(TokenRevocation), [
+            {"user_id": user_id, "token_version": version, "revoked_at": datetime.now(timezone.utc)},
+        ])
+
+
+def _cache_stale(user, is_admin=True, is_active=True):
+    """This worker's cached principal from before the change"""
+    principals.store_principal(
+        Principal(user["id"], user["username"], is_admin, is_active, datetime.now(timezone.utc)), principals.current_epoch()
+    )
+
+
+def test_revoked_admin_token_is_refused_at_once(client, admin, register):
+    _, admin_headers = admin
+    user, _ = register()
+    assert client.post(f"/users/{user['id']}/make_admin", headers=admin_headers).status_code == 200
+    headers = login(client, user["username"])
+    assert client.get("/metrics", headers=headers).status_code == 200
+
+    _revoke_elsewhere(user["id"], is_admin=False)
+    _cache_stale(user)
+    asyncio.run(revocations.refresh_revocations())
+
+    assert principals.get_principal(user["id"]) is None
+    assert client.get("/metrics", headers=headers).status_code == 403
+
+
+def test_revoked_claims_do_not_use_the_principal_cache(client, register):
+    user, headers = register()
+    assert client.get("/boards", headers=headers).status_code == 200
+
+    _revoke_elsewhere(user["id"], is_active=False)
+    asyncio.run(revocations.refresh_revocations())
+    # Cached again before the request, e.g. by a request holding an older token
+    _cache_stale(user, is_admin=False)
+
+    assert client.get("/boards", headers=headers).status_code == 401
+
+
+def _stored_hash(user_id):
+    with database.engine.connect() as connection:
+        return connection.scalar(select(User.hashed_password).where(User.id == user_id))
+
+
+def _login_with_stored_cost(client, monkeypatch, register, stored_rounds, rounds):
+    """Log in with a password hashed at stored_rounds while the server hashes at rounds: (old hash, new hash)"""
+    user, _ = register()
+    stored = auth.password_context(stored_rounds).hash("secret")
+    with database.engine.begin() as connection:
+        connection.execute(update(User).where(User.id == user["id"]).values(hashed_password=stored))
+    monkeypatch.setattr(auth, "pwd_context", auth.password_context(rounds))
+    login(client, user["username"])
+    return stored, _stored_hash(user["id"])
+
+
+def test_login_keeps_a_stronger_hash(client, register, monkeypatch):
+    stored, after = _login_with_stored_cost(client, monkeypatch, register, stored_rounds=13, rounds=12)
+    assert after == stored
+
+
+def test_login_rehashes_a_weaker_hash(client, register, monkeypatch):
+    stored, after = _login_with_stored_cost(client, monkeypatch, register, stored_rounds=4, rounds=5)
+    assert after != stored and after.startswith("$2b$05$")
+    assert auth.verify_password("secret", after)
+
+
+@pytest.fixture
+def rate_limited(monkeypatch):
+    """Rate limiting on, with fresh in-memory buckets"""
+    monkeypatch.setattr(rate_limit, "AUTH_RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(rate_limit, "_backend", rate_limit.MemoryRateLimitBackend())
+    return monkeypatch
+
+
+def test_login_attempts_share_one_bucket_per_account(client, register, rate_limited):
+    rate_limited.setattr(rate_limit, "ACCOUNT_BURST", 3)
+    # Registering takes the first attempt from the email's bucket
+    user, _ = register()
+
+    by_email = client.post("/auth/login", json={"email": user["email"], "password": "wrong"})
+    by_username = client.post("/auth/login", json={"username": user["username"], "password": "wrong"})
+    assert (by_email.status_code, by_username.status_code) == (401, 401)
+
+    limited = client.post("/auth/login", json={"username": user["username"], "password": "secret"})
+    assert limited.status_code == 429, limited.text
+    assert int(limited.headers["Retry-After"]) >= 1
+
+
+def test_auth_attempts_are_limited_per_ip(client, rate_limited):
+    rate_limited.setattr(rate_limit, "IP_BURST", 1)
+    first = client.post("/auth/login", json={"username": "nobody", "password": "secret"})
+    assert first.status_code == 401, first.text
+
+    limited = client.post("/auth/register", json={
+        "email": "limited@example.com", "username": "limited", "full_name": "Limited", "password": "secret",
+    })
+    assert limited.status_code == 429, limited.text
+    assert int(limited.headers["Retry-After"]) >= 1
+
+
+def test_principal_cache_serves_repeat_requests_until_the_user_changes(client, admin, register):
+    _, admin_headers = admin
+    user, _ = register()
+    # A token without claims: every request needs the user's row
+    headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': str(user['id'])})}"}
+    principals.invalidate_user(user["id"])
+    assert client.get("/boards", headers=headers).status_code == 200
+
+    with capture_statements() as statements:
+        assert client.get("/boards", headers=headers).status_code == 200
+    assert not any("FROM users" in sql for sql, _ in statements)
+
+    assert client.post(f"/users/{user['id']}/deactivate", headers=admin_headers).status_code == 200
+    assert principals.get_principal(user["id"]) is None
+    assert client.get("/boards", headers=headers).status_code == 401
@@ -0,0 +1,53 @@
+"""POST /boards/{id}/tasks:batch rejects invalid payloads per item instead of failing in the database."""
+
+
+def test_batch_update_with_null_title_is_rejected(client, board):
+    board, headers = board
+    column_id = board["columns"][0]["id"]
+    task = client.post(f"/boards/{board['id']}/tasks", json={"title": "Task", "column_id": column_id}, headers=headers)
+    task_id = task.json()["id"]
+
+    response = client.post(f"/boards/{board['id']}/tasks:batch", json={"operations": [
+        {"op": "update", "task_id": task_id, "data": {"description": "Kept back"}},
+        {"op": "update", "task_id": task_id, "data": {"title": None}},
+    ]}, headers=headers)
+    assert response.status_code == 422, response.text
+    ok, invalid = response.json()["detail"]
+    assert ok["status"] == "ok"
+    assert invalid["status"] == "error" and invalid["status_code"] == 422
+    assert "title may not be null" in invalid["detail"]
+
+    # All-or-nothing: the valid update was not applied either
+    board = client.get(f"/boards/{board['id']}", headers=headers).json()
+    task = next(c for c in board["columns"] if c["id"] == column_id)["tasks"][0]
+    assert (task["title"], task["description"]) == ("Task", None)
+
+
+def test_batch_with_a_missing_task_is_a_bad_request(client, board):
+    board, headers = board
+    response = client.post(f"/boards/{board['id']}/tasks:batch", json={"operations": [
+        {"op": "update", "task_id": 0, "data": {"title": "Nope"}},
+    ]}, headers=headers)
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"][0]["detail"] == "Task not found"
+
+
+def test_null_priority_is_rejected(client, board):
+    board, headers = board
+    column_id = board["columns"][0]["id"]
+    created = client.post(f"/boards/{board['id']}/tasks", json={"title": "Task", "column_id": column_id, "priority": None}, headers=headers)
+    assert created.status_code == 422, created.text
+
+    task = client.post(f"/boards/{board['id']}/tasks", json={"title": "Task", "column_id": column_id}, headers=headers).json()
+    updated = client.put(f"/tasks/{task['id']}", json={"title": "Task", "column_id": column_id, "priority": None}, headers=headers)
+    assert updated.status_code == 422, updated.text
+
+    response = client.post(f"/boards/{board['id']}/tasks:batch", json={"operations": [
+        {"op": "update", "task_id": task["id"], "data": {"priority": None}},
+    ]}, headers=headers)
+    assert response.status_code == 422, response.text
+    assert "priority may not be null" in response.json()["detail"][0]["detail"]
+
+    board = client.get(f"/boards/{board['id']}", headers=headers)
+    assert board.status_code == 200, board.text
+    assert [t["priority"] for c in board.json()["columns"] for t in c["tasks"]] == ["medium"]
@@ -0,0 +1,51 @@
+"""GET /boards/{id}/changes?since= returns what changed after a client's board version."""
+from app import versioning
+
+
+def _changes(client, board, headers, since):
+    return client.get(f"/boards/{board['id']}/changes", params={"since": since}, headers=headers)
+
+
+def test_changes_since_a_version(client, board):
+    board, headers = board
+    column_id = board["columns"][0]["id"]
+    # Not the newest task removed: SQLite would hand its id to the next one
+    removed, edited, kept = [
+        client.post(f"/boards/{board['id']}/tasks", json={"title": f"Task {i}", "column_id": column_id}, headers=headers).json()
+        for i in range(3)
+    ]
+    since = client.get(f"/boards/{board['id']}", headers=headers).json()["version"]
+
+    client.put(f"/tasks/{edited['id']}", json={"title": "Edited", "column_id": column_id}, headers=headers)
+    client.delete(f"/tasks/{removed['id']}", headers=headers)
+    added = client.post(f"/boards/{board['id']}/tasks", json={"title": "Added", "column_id": column_id}, headers=headers).json()
+
+    response = _changes(client, board, headers, since)
+    assert response.status_code == 200, response.text
+    delta = response.json()
+    assert delta["version"] == since + 3
+    assert sorted(task["id"] for task in delta["tasks"]) == sorted([edited["id"], added["id"]])
+    assert kept["id"] not in [task["id"] for task in delta["tasks"]]
+    assert delta["deleted"]["tasks"] == [removed["id"]]
+    # The task's column changed too: its counters moved
+    assert column_id in [column["id"] for column in delta["columns"]]
+
+    current = _changes(client, board, headers, delta["version"]).json()
+    assert (current["tasks"], current["columns"], current["deleted"]) == ([], [], {"columns": [], "tasks": []})
+
+
+def test_versions_outside_the_log_must_reload(client, board, monkeypatch):
+    board, headers = board
+    column_id = board["columns"][0]["id"]
+    since = client.get(f"/boards/{board['id']}", headers=headers).json()["version"]
+    assert _changes(client, board, headers, since + 1).status_code == 410
+
+    # Compact on every write, keeping one version of deletions
+    monkeypatch.setattr(versioning, "COMPACT_EVERY", 1)
+    monkeypatch.setattr(versioning, "CHANGE_RETENTION", 1)
+    task = client.post(f"/boards/{board['id']}/tasks", json={"title": "Task", "column_id": column_id}, headers=headers).json()
+    client.delete(f"/tasks/{task['id']}", headers=headers)
+    client.post(f"/boards/{board['id']}/tasks", json={"title": "Task", "column_id": column_id}, headers=headers)
+
+    response = _changes(client, board, headers, since)
+    assert response.status_code == 410, response.text
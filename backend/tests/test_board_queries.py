@@ -0,0 +1,62 @@
+"""GET /boards/{id} loads the board tree in a fixed number of statements."""
+from conftest import capture_statements
+
+
+def _add_tasks(client, board, headers, user_id, count):
+    for i in range(count):
+        column = board["columns"][i % len(board["columns"])]
+        task = client.post(f"/boards/{board['id']}/tasks", json={
+            "title": f"Task {i}", "column_id": column["id"], "assignee_id": user_id, "tags": [f"tag{i % 3}"],
+        }, headers=headers)
+        assert task.status_code == 200, task.text
+        comment = client.post(f"/tasks/{task.json()['id']}/comments", json={"content": f"Comment {i}"}, headers=headers)
+        assert comment.status_code == 200, comment.text
+
+
+def _statements_for_board(client, board, headers):
+    with capture_statements() as statements:
+        response = client.get(f"/boards/{board['id']}", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json(), len(statements)
+
+
+def test_board_query_count_does_not_grow_with_tasks(client, board):
+    board, headers = board
+    owner_id = board["created_by"]
+
+    _add_tasks(client, board, headers, owner_id, 2)
+    small, small_count = _statements_for_board(client, board, headers)
+
+    _add_tasks(client, board, headers, owner_id, 28)
+    large, large_count = _statements_for_board(client, board, headers)
+
+    assert sum(len(column["tasks"]) for column in small["columns"]) == 2
+    assert sum(len(column["tasks"]) for column in large["columns"]) == 30
+    assert all(task["comments"] and task["tags"] for column in large["columns"] for task in column["tasks"])
+    assert large_count == small_count
+    # Version lookup, then board, stats, columns, column stats, tasks, assignees, tags, comments, authors
+    assert large_count <= 10
+
+
+def test_board_listing_is_summaries_from_one_query(client, board, register):
+    board, headers = board
+    owner_id = board["created_by"]
+    _add_tasks(client, board, headers, owner_id, 3)
+    # Two more boards with tasks: still one query
+    for _ in range(2):
+        other = client.post("/boards", json={"name": "Other", "description": ""}, headers=headers).json()
+        _add_tasks(client, other, headers, owner_id, 2)
+
+    with capture_statements() as statements:
+        response = client.get("/boards", headers=headers)
+    assert response.status_code == 200, response.text
+    summary = next(b for b in response.json() if b["id"] == board["id"])
+    assert "columns" not in summary
+    # Backlog, To Do and In Progress: none done
+    assert (summary["column_count"], summary["task_count"], summary["open_count"]) == (len(board["columns"]), 3, 3)
+    # One aggregate SELECT for all boards, none per board
+    assert len([sql for sql, _ in statements if "FROM boards" in sql]) == 1
+
+    expanded = client.get("/boards", params={"expand": "columns"}, headers=headers).json()
+    columns = next(b for b in expanded if b["id"] == board["id"])["columns"]
+    assert [column["id"] for column in columns] == [column["id"] for column in board["columns"]]
@@ -0,0 +1,30 @@
+"""GET /boards/{id} serves the full tree from a snapshot until the board changes."""
+from conftest import capture_statements
+
+
+def test_repeated_reads_skip_the_tree_load(client, board):
+    board, headers = board
+    column_id = board["columns"][0]["id"]
+    client.post(f"/boards/{board['id']}/tasks", json={"title": "Task", "column_id": column_id}, headers=headers)
+    first = client.get(f"/boards/{board['id']}", headers=headers)
+    assert first.status_code == 200, first.text
+
+    with capture_statements() as statements:
+        second = client.get(f"/boards/{board['id']}", headers=headers)
+    assert second.status_code == 200, second.text
+    assert second.json() == first.json()
+    assert not any("FROM tasks" in sql for sql, _ in statements)
+
+
+def test_writes_invalidate_the_snapshot(client, board):
+    board, headers = board
+    column_id = board["columns"][0]["id"]
+    client.get(f"/boards/{board['id']}", headers=headers)
+
+    task = client.post(f"/boards/{board['id']}/tasks", json={"title": "New task", "column_id": column_id}, headers=headers).json()
+    tasks = client.get(f"/boards/{board['id']}", headers=headers).json()["columns"][0]["tasks"]
+    assert [t["title"] for t in tasks] == ["New task"]
+
+    client.post(f"/tasks/{task['id']}/comments", json={"content": "Hello"}, headers=headers)
+    tasks = client.get(f"/boards/{board['id']}", headers=headers).json()["columns"][0]["tasks"]
+    assert [comment["content"] for comment in tasks[0]["comments"]] == ["Hello"]
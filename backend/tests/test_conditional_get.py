@@ -0,0 +1,47 @@
+"""Board, task and comment reads carry ETags and answer a matching If-None-Match with 304."""
+
+
+def _revalidate(client, url, headers, etag, **params):
+    return client.get(url, params=params, headers={**headers, "If-None-Match": etag})
+
+
+def test_board_etag_follows_writes(client, board):
+    board, headers = board
+    url = f"/boards/{board['id']}"
+    first = client.get(url, headers=headers)
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    unchanged = _revalidate(client, url, headers, etag)
+    assert unchanged.status_code == 304
+    assert unchanged.content == b"" and unchanged.headers["ETag"] == etag
+
+    client.post(f"/boards/{board['id']}/tasks", json={"title": "Task", "column_id": board["columns"][0]["id"]}, headers=headers)
+    changed = _revalidate(client, url, headers, etag)
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert sum(len(column["tasks"]) for column in changed.json()["columns"]) == 1
+
+
+def test_task_and_comment_etags(client, board):
+    board, headers = board
+    task = client.post(f"/boards/{board['id']}/tasks", json={"title": "Task", "column_id": board["columns"][0]["id"]}, headers=headers).json()
+    task_url, comments_url = f"/tasks/{task['id']}", f"/tasks/{task['id']}/comments"
+    task_etag = client.get(task_url, headers=headers).headers["ETag"]
+    comments_etag = client.get(comments_url, headers=headers).headers["ETag"]
+
+    assert _revalidate(client, task_url, headers, task_etag).status_code == 304
+    assert _revalidate(client, comments_url, headers, comments_etag).status_code == 304
+    # A different fieldset is a different representation
+    assert _revalidate(client, task_url, headers, task_etag, fields="id").status_code == 200
+
+    client.post(comments_url, json={"content": "Hello"}, headers=headers)
+    assert _revalidate(client, comments_url, headers, comments_etag).json()[0]["content"] == "Hello"
+    assert _revalidate(client, task_url, headers, task_etag).status_code == 200
+
+
+def test_etags_are_not_shared_across_users(client, board, register):
+    board, headers = board
+    etag = client.get(f"/boards/{board['id']}", headers=headers).headers["ETag"]
+    _, stranger = register()
+    assert _revalidate(client, f"/boards/{board['id']}", stranger, etag).status_code == 404
@@ -0,0 +1,49 @@
+"""?fields= and ?expand= trim read responses and the columns loaded for them."""
+from conftest import capture_statements
+
+
+def _task(client, board, headers, **fields):
+    response = client.post(f"/boards/{board['id']}/tasks", json={
+        "title": "Task", "description": "Long text", "column_id": board["columns"][0]["id"], **fields,
+    }, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_fields_trim_a_task_and_its_query(client, board):
+    board, headers = board
+    task = _task(client, board, headers)
+
+    with capture_statements() as statements:
+        response = client.get(f"/tasks/{task['id']}", params={"fields": "id,title"}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json() == {"id": task["id"], "title": "Task"}
+    assert not any("tasks.description" in sql for sql, _ in statements)
+
+
+def test_nested_fields_and_expand_on_a_board(client, board):
+    board, headers = board
+    task = _task(client, board, headers, assignee_id=board["created_by"])
+    client.post(f"/tasks/{task['id']}/comments", json={"content": "Hello"}, headers=headers)
+
+    response = client.get(f"/boards/{board['id']}", params={
+        "fields": "name,columns.name,columns.tasks.title,columns.tasks.comments.content",
+        "expand": "columns.tasks.assignee",
+    }, headers=headers)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert set(body) == {"name", "columns"}
+    first = body["columns"][0]
+    assert set(first) == {"name", "tasks"}
+    assert first["tasks"][0]["title"] == "Task"
+    assert first["tasks"][0]["comments"] == [{"content": "Hello"}]
+    assert first["tasks"][0]["assignee"]["id"] == board["created_by"]
+    assert all(column["tasks"] == [] for column in body["columns"][1:])
+
+
+def test_unknown_names_are_rejected(client, board):
+    board, headers = board
+    task = _task(client, board, headers)
+    for params in ({"fields": "id,secret"}, {"expand": "owner"}, {"fields": "owner.name"}):
+        response = client.get(f"/tasks/{task['id']}", params=params, headers=headers)
+        assert response.status_code == 400, (params, response.text)
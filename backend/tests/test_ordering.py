@@ -0,0 +1,65 @@
+"""Tasks are ordered by fractional keys: a move rewrites only the moved row."""
+import random
+
+from app.ordering import key_between
+from conftest import capture_statements
+
+
+def _column_tasks(client, board, headers, column_id):
+    board = client.get(f"/boards/{board['id']}", headers=headers).json()
+    return next(c for c in board["columns"] if c["id"] == column_id)["tasks"]
+
+
+def test_moves_keep_the_requested_order(client, board):
+    board, headers = board
+    column_id = board["columns"][0]["id"]
+    order = []
+    for i in range(5):
+        task = client.post(f"/boards/{board['id']}/tasks", json={"title": f"Task {i}", "column_id": column_id}, headers=headers)
+        order.append(task.json()["id"])
+
+    rng = random.Random(7)
+    for _ in range(20):
+        task_id = rng.choice(order)
+        index = rng.randrange(len(order))
+        response = client.put(f"/tasks/{task_id}/move", json={"column_id": column_id, "position": index}, headers=headers)
+        assert response.status_code == 200, response.text
+        order.remove(task_id)
+        order.insert(index, task_id)
+
+    tasks = _column_tasks(client, board, headers, column_id)
+    assert [task["id"] for task in tasks] == order
+    positions = [task["position"] for task in tasks]
+    assert positions == sorted(positions) and len(set(positions)) == len(positions)
+
+
+def test_move_rewrites_only_the_moved_task(client, board):
+    board, headers = board
+    column_id = board["columns"][0]["id"]
+    ids = [
+        client.post(f"/boards/{board['id']}/tasks", json={"title": f"Task {i}", "column_id": column_id}, headers=headers).json()["id"]
+        for i in range(4)
+    ]
+    before = {task["id"]: task["position"] for task in _column_tasks(client, board, headers, column_id)}
+
+    with capture_statements() as statements:
+        response = client.put(f"/tasks/{ids[3]}/move", json={"column_id": column_id, "position": 1}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert len([sql for sql, _ in statements if sql.lstrip().upper().startswith("UPDATE TASKS")]) == 1
+
+    after = {task["id"]: task["position"] for task in _column_tasks(client, board, headers, column_id)}
+    assert {task_id: after[task_id] for task_id in ids[:3]} == {task_id: before[task_id] for task_id in ids[:3]}
+    assert before[ids[0]] < after[ids[3]] < before[ids[1]]
+
+
+def test_key_between_always_finds_room():
+    keys = [key_between(None, None)]
+    rng = random.Random(3)
+    for _ in range(500):
+        index = rng.randrange(len(keys) + 1)
+        before = keys[index - 1] if index else None
+        after = keys[index] if index < len(keys) else None
+        key = key_between(before, after)
+        assert (before is None or before < key) and (after is None or key < after)
+        assert not key.endswith("0")
+        keys.insert(index, key)
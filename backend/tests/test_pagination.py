@@ -0,0 +1,50 @@
+"""Keyset pagination: ?limit= / ?after= walk a list without gaps or repeats."""
+
+
+def _walk(client, url, headers, limit, after=None):
+    """Every item from the page after `after` (default: the first page) to the last: (items, pages read)"""
+    items, pages = [], 0
+    while True:
+        params = {"limit": limit} if after is None else {"limit": limit, "after": after}
+        response = client.get(url, params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert len(page["items"]) <= limit
+        items += page["items"]
+        pages += 1
+        after = page["next_cursor"]
+        if after is None:
+            return items, pages
+
+
+def test_task_pages_cover_the_unpaginated_list(client, board):
+    board, headers = board
+    for i in range(7):
+        column = board["columns"][i % len(board["columns"])]
+        client.post(f"/boards/{board['id']}/tasks", json={"title": f"Task {i}", "column_id": column["id"]}, headers=headers)
+
+    everything = client.get(f"/boards/{board['id']}/tasks", headers=headers).json()
+    items, pages = _walk(client, f"/boards/{board['id']}/tasks", headers, limit=3)
+    assert [task["id"] for task in items] == [task["id"] for task in everything]
+    assert len(everything) == 7 and pages == 3
+
+
+def test_comment_pages_do_not_shift_when_rows_are_added(client, board):
+    board, headers = board
+    task = client.post(f"/boards/{board['id']}/tasks", json={"title": "Task", "column_id": board["columns"][0]["id"]}, headers=headers).json()
+    for i in range(4):
+        client.post(f"/tasks/{task['id']}/comments", json={"content": f"Comment {i}"}, headers=headers)
+
+    first = client.get(f"/tasks/{task['id']}/comments", params={"limit": 2}, headers=headers).json()
+    client.post(f"/tasks/{task['id']}/comments", json={"content": "Comment 4"}, headers=headers)
+    rest, _ = _walk(client, f"/tasks/{task['id']}/comments", headers, limit=2, after=first["next_cursor"])
+
+    contents = [comment["content"] for comment in first["items"] + rest]
+    assert contents == [f"Comment {i}" for i in range(5)]
+
+
+def test_malformed_cursor_is_a_bad_request(client, board):
+    board, headers = board
+    response = client.get(f"/boards/{board['id']}/tasks", params={"after": "not-a-cursor"}, headers=headers)
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"] == "Invalid cursor"
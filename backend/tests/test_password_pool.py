@@ -0,0 +1,28 @@
+"""Password hashing runs on a bounded pool; a full pool answers 503 instead of queueing."""
+from app import password_pool
+
+
+def _saturate(monkeypatch):
+    monkeypatch.setattr(password_pool, "_pending", password_pool.PASSWORD_HASH_WORKERS + password_pool.PASSWORD_HASH_QUEUE)
+
+
+def test_full_pool_refuses_sign_ins(client, register, monkeypatch):
+    user, _ = register()
+    _saturate(monkeypatch)
+
+    login = client.post("/auth/login", json={"username": user["username"], "password": "secret"})
+    assert login.status_code == 503, login.text
+    assert login.headers["Retry-After"] == "1"
+
+    signup = client.post("/auth/register", json={
+        "email": "busy@example.com", "username": "busy", "full_name": "Busy", "password": "secret",
+    })
+    assert signup.status_code == 503, signup.text
+
+
+def test_pool_slots_are_released(client, register):
+    user, _ = register()
+    for _ in range(3):
+        response = client.post("/auth/login", json={"username": user["username"], "password": "secret"})
+        assert response.status_code == 200, response.text
+    assert password_pool._pending == 0
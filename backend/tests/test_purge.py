@@ -0,0 +1,53 @@
+"""DELETE /boards/{id} purges in the background; job status is kept in purge_jobs."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, select, update
+
+from app import database, purge
+from app.models import Board, PurgeJob
+
+
+def test_delete_board_reports_the_purge(client, board):
+    board, headers = board
+    column_id = board["columns"][0]["id"]
+    for i in range(3):
+        task = client.post(f"/boards/{board['id']}/tasks", json={"title": f"Task {i}", "column_id": column_id}, headers=headers)
+        client.post(f"/tasks/{task.json()['id']}/comments", json={"content": "Comment"}, headers=headers)
+
+    response = client.delete(f"/boards/{board['id']}", headers=headers)
+    assert response.status_code == 202, response.text
+    job_id = response.json()["job_id"]
+
+    job = client.get(f"/jobs/{job_id}", headers=headers)
+    assert job.status_code == 200, job.text
+    assert job.json()["status"] == "completed"
+    deleted = job.json()["deleted"]
+    assert (deleted["comments"], deleted["tasks"], deleted["columns"]) == (3, 3, len(board["columns"]))
+    assert client.get(f"/boards/{board['id']}", headers=headers).status_code == 404
+    with database.engine.connect() as connection:
+        assert connection.scalar(select(Board.id).where(Board.id == board["id"])) is None
+
+
+def test_unfinished_purge_is_resumed_by_one_worker(client, board):
+    board, headers = board
+    # Soft-deleted by a worker that died before purging
+    with database.engine.begin() as connection:
+        connection.execute(update(Board).where(Board.id == board["id"]).values(is_active=False))
+        connection.execute(insert(PurgeJob), [{
+            "id": f"stale-{board['id']}", "board_id": board["id"], "requested_by": board["created_by"], "status": "running",
+            "deleted_comments": 0, "deleted_tasks": 0, "deleted_columns": 0, "deleted_changes": 0,
+            "claimed_by": "dead-worker", "claimed_at": datetime.now(timezone.utc) - timedelta(seconds=purge.PURGE_LEASE_SECONDS + 1),
+        }])
+
+    first = asyncio.run(purge.resume_purges())
+    second = asyncio.run(purge.resume_purges())
+    assert [(job.id, job.board_id) for job in first] == [(f"stale-{board['id']}", board["id"])]
+    assert second == []
+
+    asyncio.run(purge.purge_board(first[0].id, board["id"]))
+    job = client.get(f"/jobs/stale-{board['id']}", headers=headers)
+    assert job.status_code == 200, job.text
+    assert job.json()["status"] == "completed"
+    with database.engine.connect() as connection:
+        assert connection.scalar(select(Board.id).where(Board.id == board["id"])) is None
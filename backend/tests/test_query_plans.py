@@ -0,0 +1,67 @@
+"""The board-tree, task-listing and position queries are served by the access-path indexes (migration 003)."""
+import re
+
+import pytest
+
+from app import database
+from conftest import capture_statements
+
+
+def _plans(statements):
+    """(sql, EXPLAIN QUERY PLAN detail lines) for every SELECT run"""
+    plans = []
+    with database.engine.connect() as connection:
+        for sql, parameters in statements:
+            if not sql.lstrip().upper().startswith("SELECT"):
+                continue
+            rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", tuple(parameters)).all()
+            plans.append((" ".join(sql.split()), [row[3] for row in rows]))
+    return plans
+
+
+def _plan_for(plans, pattern):
+    matches = [detail for sql, detail in plans if re.search(pattern, sql)]
+    assert matches, f"no statement matched {pattern!r}"
+    return matches[0]
+
+
+def _assert_uses_index(detail, table, index):
+    assert any(re.match(rf"SEARCH {table} USING (COVERING )?INDEX {index}\b", line) for line in detail), detail
+    assert not any(line.startswith(f"SCAN {table}") for line in detail), detail
+
+
+@pytest.fixture
+def plans(client, board):
+    board, headers = board
+    column_id = board["columns"][0]["id"]
+    task_ids = []
+    for i in range(3):
+        task = client.post(f"/boards/{board['id']}/tasks", json={"title": f"Task {i}", "column_id": column_id}, headers=headers)
+        task_ids.append(task.json()["id"])
+        client.post(f"/tasks/{task_ids[-1]}/comments", json={"content": "Comment"}, headers=headers)
+
+    with capture_statements() as statements:
+        assert client.get(f"/boards/{board['id']}", headers=headers).status_code == 200
+        assert client.get(f"/boards/{board['id']}/tasks", headers=headers).status_code == 200
+        assert client.post(f"/boards/{board['id']}/tasks", json={"title": "Last", "column_id": column_id}, headers=headers).status_code == 200
+        move = client.put(f"/tasks/{task_ids[0]}/move", json={"column_id": column_id, "position": 2}, headers=headers)
+        assert move.status_code == 200
+    return _plans(statements)
+
+
+def test_board_tree_uses_indexes(plans):
+    _assert_uses_index(_plan_for(plans, r"FROM columns WHERE columns\.board_id IN"), "columns", "ix_columns_board_id_position")
+    _assert_uses_index(_plan_for(plans, r"FROM tasks WHERE tasks\.column_id IN"), "tasks", "ix_tasks_column_id_position")
+    _assert_uses_index(_plan_for(plans, r"FROM comments WHERE comments\.task_id IN"), "comments", "ix_comments_task_id_created_at_id")
+
+
+def test_task_listing_uses_board_index(plans):
+    # ix_tasks_board_id_is_active or ix_tasks_board_id_due_date: both lead with board_id and
+    # SQLite's pick between them follows the order create_all made them in
+    _assert_uses_index(_plan_for(plans, r"FROM tasks WHERE tasks\.board_id = \?"), "tasks", r"ix_tasks_board_id_\w+")
+
+
+def test_position_queries_use_column_position_index(plans):
+    # create_task: last key of the column; move_task: neighbours at the target index
+    _assert_uses_index(_plan_for(plans, r"max\(tasks\.position\)"), "tasks", "ix_tasks_column_id_position")
+    _assert_uses_index(_plan_for(plans, r"SELECT tasks\.position FROM tasks WHERE tasks\.column_id = \?"), "tasks", "ix_tasks_column_id_position")
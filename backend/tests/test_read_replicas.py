@@ -0,0 +1,66 @@
+"""Read-your-writes routing between the primary and a replica, with two SQLite files."""
+import time
+
+import jwt
+import pytest
+
+from app import database
+
+PIN = database.READ_YOUR_WRITES_HEADER
+
+
+@pytest.fixture
+def written(client, register, replica):
+    """A board created on the primary: (board id, auth headers, pin from the write's response)"""
+    _, headers = register()
+    response = client.post("/boards", json={"name": "Fresh", "description": "Only on the primary"}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["id"], headers, response.headers.get(PIN)
+
+
+def test_reads_go_to_the_replica_without_a_pin(client, written):
+    board_id, headers, _ = written
+    assert client.get(f"/boards/{board_id}", headers=headers).status_code == 404
+
+
+def test_pin_from_a_write_sends_reads_to_the_primary(client, written):
+    board_id, headers, pin = written
+    assert pin
+    response = client.get(f"/boards/{board_id}", headers={**headers, PIN: pin})
+    assert response.status_code == 200, response.text
+    assert response.json()["name"] == "Fresh"
+
+
+def test_pin_only_applies_to_its_user(client, register, written):
+    _, _, pin = written
+    _, other_headers = register()
+    assert not database._reads_pinned_to_primary(_connection({**other_headers, PIN: pin}))
+
+
+def test_tampered_or_expired_pins_are_ignored(written, monkeypatch):
+    _, headers, pin = written
+    user_id, deadline, signature = pin.split(".")
+    assert database._reads_pinned_to_primary(_connection({**headers, PIN: pin}))
+
+    later = f"{user_id}.{int(deadline) + 60_000}.{signature}"
+    assert not database._reads_pinned_to_primary(_connection({**headers, PIN: later}))
+
+    monkeypatch.setattr(time, "time", lambda: int(deadline) / 1000 + 1)
+    assert not database._reads_pinned_to_primary(_connection({**headers, PIN: pin}))
+
+
+def test_unverified_tokens_get_no_pin(written):
+    _, headers, pin = written
+    user_id = pin.split(".")[0]
+    forged = jwt.encode({"sub": user_id}, "not-the-secret", algorithm="HS256")
+    forged_headers = {"Authorization": f"Bearer {forged}"}
+    assert not database._reads_pinned_to_primary(_connection({**forged_headers, PIN: pin}))
+    assert database.read_your_writes_pin(_connection(forged_headers, method="POST"), 200) is None
+
+
+def _connection(headers, method="GET"):
+    from starlette.requests import Request
+    return Request({
+        "type": "http", "method": method, "path": "/", "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+    })
@@ -0,0 +1,45 @@
+"""POST /auth/refresh rotates refresh tokens; reusing one revokes its login."""
+
+
+def _login(client, user):
+    response = client.post("/auth/login", json={"username": user["username"], "password": "secret"})
+    assert response.status_code == 200, response.text
+    return response.json()["refresh_token"]
+
+
+def _refresh(client, token):
+    return client.post("/auth/refresh", json={"refresh_token": token})
+
+
+def test_refresh_rotates_the_token(client, register):
+    user, _ = register()
+    old = _login(client, user)
+
+    response = _refresh(client, old)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["user"]["id"] == user["id"] and body["refresh_token"] != old
+    headers = {"Authorization": f"Bearer {body['access_token']}"}
+    assert client.get("/boards", headers=headers).status_code == 200
+    assert _refresh(client, body["refresh_token"]).status_code == 200
+
+
+def test_reused_token_revokes_its_family(client, register):
+    user, _ = register()
+    old = _login(client, user)
+    other_login = _login(client, user)
+    new = _refresh(client, old).json()["refresh_token"]
+
+    reused = _refresh(client, old)
+    assert reused.status_code == 401, reused.text
+    assert _refresh(client, new).status_code == 401
+    # Only that login is revoked
+    assert _refresh(client, other_login).status_code == 200
+
+
+def test_logout_and_garbage_are_refused(client, register):
+    user, _ = register()
+    token = _login(client, user)
+    assert client.post("/auth/logout", json={"refresh_token": token}).status_code == 200
+    assert _refresh(client, token).status_code == 401
+    assert _refresh(client, "not-a-token").status_code == 401
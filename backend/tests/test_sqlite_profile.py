@@ -0,0 +1,77 @@
+"""Requests under SQLITE_PERFORMANCE_PROFILE, where every write shares one writer connection."""
+import pytest
+
+from app import auth, ordering
+
+
+@pytest.fixture
+def writer_pool(sqlite_profile):
+    sync_engine, async_engine = sqlite_profile
+    return (async_engine or sync_engine).pool
+
+
+def _record_writer_use(monkeypatch, writer_pool, name):
+    """Wrap auth.<name> (run on the hashing pool) to note how many writer connections are out meanwhile"""
+    checked_out = []
+    original = getattr(auth, name)
+
+    def hashing(*args):
+        checked_out.append(writer_pool.checkedout())
+        return original(*args)
+
+    monkeypatch.setattr(auth, name, hashing)
+    return checked_out
+
+
+def test_login_does_not_hold_the_writer_while_hashing(client, register, writer_pool, monkeypatch):
+    user, _ = register()
+    checked_out = _record_writer_use(monkeypatch, writer_pool, "_verify_login")
+
+    response = client.post("/auth/login", json={"username": user["username"], "password": "secret"})
+    assert response.status_code == 200, response.text
+    assert response.json()["refresh_token"]
+    assert checked_out == [0]
+
+
+def test_register_does_not_hold_the_writer_while_hashing(client, writer_pool, monkeypatch):
+    checked_out = _record_writer_use(monkeypatch, writer_pool, "get_password_hash")
+
+    response = client.post("/auth/register", json={
+        "email": "profile@example.com", "username": "profile", "full_name": "Profile", "password": "secret",
+    })
+    assert response.status_code == 200, response.text
+    assert checked_out == [0]
+
+
+def test_writes_that_rebalance_order_keys(client, board, writer_pool, monkeypatch):
+    # Every new key is "too long", so each placement rebalances its column (or the board's columns)
+    monkeypatch.setattr(ordering, "MAX_KEY_LENGTH", 0)
+    board, headers = board
+    board_id, column_id = board["id"], board["columns"][0]["id"]
+
+    task_ids = []
+    for i in range(3):
+        response = client.post(f"/boards/{board_id}/tasks", json={"title": f"Task {i}", "column_id": column_id}, headers=headers)
+        assert response.status_code == 200, response.text
+        task_ids.append(response.json()["id"])
+
+    moved = client.put(f"/tasks/{task_ids[2]}/move", json={"column_id": column_id, "position": 0}, headers=headers)
+    assert moved.status_code == 200, moved.text
+
+    batch = client.post(f"/boards/{board_id}/tasks:batch", json={"operations": [
+        {"op": "move", "task_id": task_ids[0], "data": {"column_id": column_id, "position": 0}},
+    ]}, headers=headers)
+    assert batch.status_code == 200, batch.text
+
+    column = client.post(f"/boards/{board_id}/columns", json={"name": "Extra", "position": 1}, headers=headers)
+    assert column.status_code == 200, column.text
+    assert writer_pool.checkedout() == 0
+
+    board = client.get(f"/boards/{board_id}", headers=headers).json()
+    tasks = next(c for c in board["columns"] if c["id"] == column_id)["tasks"]
+    assert [task["id"] for task in tasks] == [task_ids[0], task_ids[2], task_ids[1]]
+    # Rewritten with evenly spaced keys, which are short
+    assert all(len(task["position"]) == 1 for task in tasks)
+    assert batch.json()["results"][0]["position"] == tasks[0]["position"]
+    assert [c["name"] for c in board["columns"]][1] == "Extra"
+    assert all(len(c["position"]) == 1 for c in board["columns"])
@@ -0,0 +1,51 @@
+"""Per-column and per-board counters follow every task write; repair_stats fixes drift."""
+from sqlalchemy import update
+
+from app import database
+from app.models import ColumnStats
+from app.stats import check_stats
+
+
+def _stats(client, board, headers):
+    board = client.get(f"/boards/{board['id']}", headers=headers).json()
+    return board["stats"], {column["name"]: column["stats"] for column in board["columns"]}
+
+
+def _check(board_id, repair=False):
+    with database.engine.begin() as connection:
+        return check_stats(connection, repair=repair, board_id=board_id)
+
+
+def test_counters_follow_task_writes(client, board):
+    board, headers = board
+    columns = {column["name"]: column["id"] for column in board["columns"]}
+    tasks = [
+        client.post(f"/boards/{board['id']}/tasks", json={
+            "title": f"Task {i}", "column_id": columns["To Do"], "estimated_hours": 2, "hours_used": 1,
+        }, headers=headers).json()
+        for i in range(3)
+    ]
+
+    client.put(f"/tasks/{tasks[0]['id']}", json={"title": "Edited", "column_id": columns["To Do"], "estimated_hours": 5}, headers=headers)
+    client.put(f"/tasks/{tasks[1]['id']}/move", json={"column_id": columns["Done"], "position": 0}, headers=headers)
+    assert client.delete(f"/tasks/{tasks[2]['id']}", headers=headers).status_code == 200
+
+    board_stats, column_stats = _stats(client, board, headers)
+    assert (board_stats["task_count"], board_stats["open_count"], board_stats["estimated_hours"]) == (2, 1, 7)
+    assert (column_stats["To Do"]["task_count"], column_stats["To Do"]["estimated_hours"]) == (1, 5)
+    assert (column_stats["Done"]["task_count"], column_stats["Done"]["open_count"]) == (1, 0)
+    assert _check(board["id"]) == []
+
+
+def test_repair_rewrites_drifted_counters(client, board):
+    board, headers = board
+    column_id = board["columns"][0]["id"]
+    client.post(f"/boards/{board['id']}/tasks", json={"title": "Task", "column_id": column_id, "estimated_hours": 3}, headers=headers)
+    with database.engine.begin() as connection:
+        connection.execute(update(ColumnStats).where(ColumnStats.column_id == column_id).values(task_count=40))
+
+    assert _check(board["id"])
+    assert _check(board["id"], repair=True)
+    assert _check(board["id"]) == []
+    _, column_stats = _stats(client, board, headers)
+    assert column_stats[board["columns"][0]["name"]]["task_count"] == 1
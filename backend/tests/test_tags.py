@@ -0,0 +1,33 @@
+"""Tag creation tolerates another request creating the same tag first."""
+import asyncio
+
+from sqlalchemy import insert, select
+
+from app import database, tags
+from app.models import Tag
+
+
+def test_resolve_tags_when_a_concurrent_request_created_the_tag(monkeypatch):
+    lookup = tags._existing_tags
+    calls = []
+
+    async def lookup_racing_another_request(db, names):
+        if not calls:
+            # The other request inserts "race" after our lookup missed it
+            calls.append(names)
+            await db.execute(insert(Tag), [{"name": "race"}])
+            return {}
+        return await lookup(db, names)
+
+    monkeypatch.setattr(tags, "_existing_tags", lookup_racing_another_request)
+
+    async def resolve():
+        async with database.write_session() as db:
+            resolved = await tags.resolve_tags(db, ["race", "calm"])
+            await db.commit()
+            rows = (await db.execute(select(Tag.name, Tag.id).where(Tag.name.in_(["race", "calm"])))).all()
+            return [(tag.name, tag.id) for tag in resolved], dict(rows)
+
+    resolved, stored = asyncio.run(resolve())
+    assert [name for name, _ in resolved] == ["race", "calm"]
+    assert dict(resolved) == stored
@@ -0,0 +1,54 @@
+"""GET /tasks/search: composable filters, sorting and paging over the user's tasks."""
+
+
+def _create(client, board, headers, column, title, **fields):
+    response = client.post(f"/boards/{board['id']}/tasks", json={"title": title, "column_id": column["id"], **fields}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _search(client, headers, **params):
+    response = client.get("/tasks/search", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_filters_combine(client, board):
+    board, headers = board
+    todo, doing = board["columns"][0], board["columns"][1]
+    owner_id = board["created_by"]
+    urgent = _create(client, board, headers, todo, "Urgent", priority="high", tags=["bug"], assignee_id=owner_id, due_date="2030-01-05T00:00:00")
+    _create(client, board, headers, todo, "Later", priority="low", tags=["bug"], due_date="2030-03-01T00:00:00")
+    other = _create(client, board, headers, doing, "Doing", priority="high", tags=["feature"])
+
+    def titles(**params):
+        return [task["title"] for task in _search(client, headers, board_id=board["id"], **params)["items"]]
+
+    assert titles(tag="bug", priority="high") == ["Urgent"]
+    assert titles(priority=["high", "low"], column_id=todo["id"]) == ["Urgent", "Later"]
+    assert titles(assignee_id=owner_id) == ["Urgent"]
+    assert titles(due_before="2030-02-01T00:00:00") == ["Urgent"]
+    assert titles(tag=["feature", "missing"]) == [other["title"]]
+    assert urgent["id"] in [task["id"] for task in _search(client, headers, tag="bug")["items"]]
+
+
+def test_search_only_sees_the_users_boards(client, board, register):
+    board, headers = board
+    _create(client, board, headers, board["columns"][0], "Private", priority="high")
+    _, stranger = register()
+    assert _search(client, stranger, board_id=board["id"])["items"] == []
+
+
+def test_sort_and_pages(client, board):
+    board, headers = board
+    column = board["columns"][0]
+    for day in (3, 1, 2):
+        _create(client, board, headers, column, f"Day {day}", due_date=f"2030-01-0{day}T00:00:00")
+
+    first = _search(client, headers, board_id=board["id"], sort="-due_date", limit=2)
+    second = _search(client, headers, board_id=board["id"], sort="-due_date", limit=2, after=first["next_cursor"])
+    assert [task["title"] for task in first["items"] + second["items"]] == ["Day 3", "Day 2", "Day 1"]
+    assert second["next_cursor"] is None
+
+    response = client.get("/tasks/search", params={"sort": "title"}, headers=headers)
+    assert response.status_code == 400, response.text
@@ -0,0 +1,30 @@
+"""PUT /tasks/{id} only moves a task to a column of its own board."""
+
+
+def test_update_task_rejects_a_column_of_another_board(client, board):
+    board, headers = board
+    column_id = board["columns"][0]["id"]
+    task = client.post(f"/boards/{board['id']}/tasks", json={"title": "Task", "column_id": column_id}, headers=headers)
+    assert task.status_code == 200, task.text
+
+    other = client.post("/boards", json={"name": "Other", "description": "Other board"}, headers=headers)
+    assert other.status_code == 200, other.text
+    other_column_id = other.json()["columns"][0]["id"]
+
+    response = client.put(f"/tasks/{task.json()['id']}", json={"title": "Moved", "column_id": other_column_id}, headers=headers)
+    assert response.status_code == 404, response.text
+    assert response.json()["detail"] == "Target column not found"
+
+    board = client.get(f"/boards/{board['id']}", headers=headers).json()
+    tasks = next(c for c in board["columns"] if c["id"] == column_id)["tasks"]
+    assert [(t["title"], t["column_id"]) for t in tasks] == [("Task", column_id)]
+
+
+def test_update_task_moves_within_its_board(client, board):
+    board, headers = board
+    first, second = board["columns"][0]["id"], board["columns"][1]["id"]
+    task = client.post(f"/boards/{board['id']}/tasks", json={"title": "Task", "column_id": first}, headers=headers)
+
+    response = client.put(f"/tasks/{task.json()['id']}", json={"title": "Task", "column_id": second}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["column_id"] == second
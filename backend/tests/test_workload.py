@@ -0,0 +1,47 @@
+"""GET /workload aggregates tasks per assignee and follows board changes."""
+
+
+def _workload(client, board, headers):
+    response = client.get("/workload", params={"board_id": board["id"]}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_workload_per_assignee(client, board):
+    board, headers = board
+    owner_id = board["created_by"]
+    columns = {column["name"]: column["id"] for column in board["columns"]}
+
+    def create(column, hours, **fields):
+        response = client.post(f"/boards/{board['id']}/tasks", json={
+            "title": "Task", "column_id": columns[column], "estimated_hours": hours, "hours_used": 1, **fields,
+        }, headers=headers)
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    create("To Do", 3, assignee_id=owner_id)
+    doing = create("In Progress", 5, assignee_id=owner_id)
+    create("Done", 2, assignee_id=owner_id)
+    create("Backlog", 8)
+
+    workload = _workload(client, board, headers)
+    assert workload["board_ids"] == [board["id"]]
+    entries = {entry["assignee_id"]: entry["metrics"] for entry in workload["assignees"]}
+    assert set(entries) == {None, owner_id}
+    mine = entries[owner_id]
+    assert (mine["task_count"], mine["done_count"], mine["wip_count"]) == (3, 1, 1)
+    assert (mine["hours_done"], mine["hours_not_done"], mine["hours_used"]) == (2, 8, 3)
+    assert workload["totals"]["task_count"] == 4 and workload["totals"]["hours_not_done"] == 16
+
+    # The next read sees the move: results are keyed by the board's version
+    client.put(f"/tasks/{doing['id']}/move", json={"column_id": columns["Done"], "position": 0}, headers=headers)
+    mine = next(e["metrics"] for e in _workload(client, board, headers)["assignees"] if e["assignee_id"] == owner_id)
+    assert (mine["done_count"], mine["wip_count"], mine["hours_done"]) == (2, 0, 7)
+    assert mine["completion_ratio"] == 2 / 3
+
+
+def test_workload_of_another_users_board_is_not_found(client, board, register):
+    board, _ = board
+    _, stranger = register()
+    response = client.get("/workload", params={"board_id": board["id"]}, headers=stranger)
+    assert response.status_code == 404, response.text
@@ -1,6 +1,8 @@
 import axios from 'axios'
 import {
   Board,
+  BoardChanges,
+  BoardSummary,
   Column,
   Task,
   Comment,
@@ -8,7 +10,11 @@ import {
   CreateColumnRequest,
   CreateTaskRequest,
   CreateCommentRequest,
-  User
+  Page,
+  SearchResult,
+  TaskSearchParams,
+  User,
+  WorkloadResponse
 } from '../types'
 
 const API_BASE_URL = (import.meta as any).env?.VITE_API_URL || 'http://localhost:8000'
@@ -20,6 +26,11 @@ const api = axios.create({
   },
 })
 
+// Signed "read from the primary until" pin from our last write; sent back so reads
+// right after a write do not hit a lagging replica (any backend worker accepts it)
+const READ_YOUR_WRITES_HEADER = 'X-Read-Your-Writes'
+let readYourWritesPin: string | null = null
+
 // Request interceptor to add auth token
 api.interceptors.request.use(
   (config) => {
@@ -27,6 +38,9 @@ api.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`
     }
+    if (readYourWritesPin) {
+      config.headers[READ_YOUR_WRITES_HEADER] = readYourWritesPin
+    }
     return config
   },
   (error) => {
@@ -35,12 +49,52 @@ api.interceptors.request.use(
 )
 
 
+// One refresh at a time: a rotated refresh token is only valid once
+let refreshing: Promise<string | null> | null = null
+
+const refreshAccessToken = (): Promise<string | null> => {
+  const refreshToken = localStorage.getItem('refresh_token')
+  if (!refreshToken) return Promise.resolve(null)
+  if (!refreshing) {
+    refreshing = axios
+      .post(`${API_BASE_URL}/auth/refresh`, { refresh_token: refreshToken })
+      .then((response) => {
+        localStorage.setItem('access_token', response.data.access_token)
+        localStorage.setItem('refresh_token', response.data.refresh_token)
+        localStorage.setItem('user', JSON.stringify(response.data.user))
+        return response.data.access_token as string
+      })
+      .catch(() => null)
+      .finally(() => {
+        refreshing = null
+      })
+  }
+  return refreshing
+}
+
 // Response interceptor to handle auth errors
 api.interceptors.response.use(
-  (response) => response,
-  (error) => {
+  (response) => {
+    const pin = response.headers[READ_YOUR_WRITES_HEADER.toLowerCase()]
+    if (pin) {
+      readYourWritesPin = pin
+    }
+    return response
+  },
+  async (error) => {
+    const original = error.config
+    // Expired access token: get a new one with the refresh token and retry once
+    if (error.response?.status === 401 && original && !original._retried && !original.url?.startsWith('/auth/')) {
+      original._retried = true
+      const token = await refreshAccessToken()
+      if (token) {
+        original.headers.Authorization = `Bearer ${token}`
+        return api(original)
+      }
+    }
     if (error.response?.status === 401) {
       localStorage.removeItem('access_token')
+      localStorage.removeItem('refresh_token')
       localStorage.removeItem('user')
       // Instead of redirecting to /login, just reload the page
       // This will trigger the AuthContext to show the login component
@@ -60,10 +114,21 @@ export const authAPI = {
     const response = await api.post('/auth/register', userData)
     return response.data
   },
+
+  // Revokes the refresh token (and the tokens rotated from it)
+  logout: async (refreshToken: string): Promise<void> => {
+    await api.post('/auth/logout', { refresh_token: refreshToken })
+  },
 }
 
 export const boardAPI = {
+  // Full trees: columns, tasks and comments of every board
   getBoards: async (): Promise<Board[]> => {
+    const response = await api.get('/boards', { params: { expand: '*' } })
+    return response.data
+  },
+
+  getBoardSummaries: async (): Promise<BoardSummary[]> => {
     const response = await api.get('/boards')
     return response.data
   },
@@ -78,11 +143,31 @@ export const boardAPI = {
     return response.data
   },
 
+  // Columns and tasks changed since the client's board version; 410 means reload the board
+  getChanges: async (boardId: number, since: number): Promise<BoardChanges> => {
+    const response = await api.get(`/boards/${boardId}/changes`, { params: { since } })
+    return response.data
+  },
+
   deleteBoard: async (boardId: number): Promise<void> => {
     await api.delete(`/boards/${boardId}`)
   },
 }
 
+export const workloadAPI = {
+  getWorkload: async (params: { board_id?: number; assignee_id?: number } = {}): Promise<WorkloadResponse> => {
+    const response = await api.get('/workload', { params })
+    return response.data
+  },
+}
+
+export const searchAPI = {
+  search: async (q: string, params: { board_id?: number; limit?: number; after?: string } = {}): Promise<Page<SearchResult>> => {
+    const response = await api.get('/search', { params: { q, ...params } })
+    return response.data
+  },
+}
+
 export const userAPI = {
   getUsers: async (): Promise<User[]> => {
     const response = await api.get('/users')
@@ -104,6 +189,14 @@ export const userAPI = {
     const response = await api.post(`/users/${userId}/make_admin`)
     return response.data
   },
+  revokeAdmin: async (userId: number): Promise<User> => {
+    const response = await api.post(`/users/${userId}/revoke_admin`)
+    return response.data
+  },
+  deactivateUser: async (userId: number): Promise<User> => {
+    const response = await api.post(`/users/${userId}/deactivate`)
+    return response.data
+  },
   deleteUser: async (userId: number, reassignToId?: number): Promise<void> => {
     await api.delete(`/users/${userId}`, { params: { reassign_to_id: reassignToId } })
   },
@@ -131,6 +224,12 @@ export const taskAPI = {
     return response.data
   },
 
+  // Server-side filtering; repeated priority/tag values match any of them
+  searchTasks: async (params: TaskSearchParams): Promise<Page<Task>> => {
+    const response = await api.get('/tasks/search', { params, paramsSerializer: { indexes: null } })
+    return response.data
+  },
+
   getTask: async (taskId: number): Promise<Task> => {
     const response = await api.get(`/tasks/${taskId}`)
     return response.data
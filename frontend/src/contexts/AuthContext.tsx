@@ -43,6 +43,7 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
       } catch (error) {
         console.error('Failed to parse stored user data:', error)
         localStorage.removeItem('access_token')
+        localStorage.removeItem('refresh_token')
         localStorage.removeItem('user')
       }
     }
@@ -57,6 +58,9 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
 
       if (token && user) {
         localStorage.setItem('access_token', token)
+        if (response.refresh_token) {
+          localStorage.setItem('refresh_token', response.refresh_token)
+        }
         localStorage.setItem('user', JSON.stringify(user))
 
         setToken(token)
@@ -88,6 +92,9 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
 
       if (token && user) {
         localStorage.setItem('access_token', token)
+        if (response.refresh_token) {
+          localStorage.setItem('refresh_token', response.refresh_token)
+        }
         localStorage.setItem('user', JSON.stringify(user))
 
         setToken(token)
@@ -101,7 +108,12 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
   }
 
   const logout = () => {
+    const refreshToken = localStorage.getItem('refresh_token')
+    if (refreshToken) {
+      authAPI.logout(refreshToken).catch(() => undefined)
+    }
     localStorage.removeItem('access_token')
+    localStorage.removeItem('refresh_token')
     localStorage.removeItem('user')
     setToken(null)
     setUser(null)
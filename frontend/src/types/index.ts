@@ -8,21 +8,58 @@ export interface User {
   created_at: string
 }
 
+export interface Stats {
+  task_count: number
+  open_count: number  // tasks not in a done column
+  estimated_hours: number
+  hours_used: number
+  completed_hours: number
+  updated_at?: string
+}
+
 export interface Board {
   id: number
   name: string
   description?: string
   created_by: number
   is_active: boolean
+  version: number  // bumped on every change to the board's contents
   created_at: string
+  stats?: Stats
   columns: Column[]
 }
 
+// GET /boards/{id}/changes?since=
+export interface BoardChanges {
+  board_id: number
+  version: number
+  board: Board  // without columns
+  columns: Column[]  // without tasks
+  tasks: Task[]
+  deleted: { columns: number[]; tasks: number[] }
+}
+
+// GET /boards without ?expand=
+export interface BoardSummary {
+  id: number
+  name: string
+  description?: string
+  created_by: number
+  is_active: boolean
+  version: number
+  created_at: string
+  last_activity?: string
+  column_count: number
+  task_count: number
+  open_count: number
+}
+
 export interface Column {
   id: number
   name: string
   board_id: number
-  position: number
+  position: string  // fractional order key; sort as a string
+  stats?: Stats
   tasks: Task[]
 }
 
@@ -46,7 +83,7 @@ export interface Task {
   hours_used?: number
   completed_hours?: number
   created_by: number
-  position: number
+  position: string  // fractional order key; sort as a string
   is_active: boolean
   created_at: string
   assignee?: User
@@ -103,10 +140,60 @@ export interface RegisterRequest {
 
 export interface AuthResponse {
   access_token: string
+  refresh_token?: string
   token_type: string
   user: User
 }
 
+// Cursor-paginated list (endpoints called with ?limit=)
+export interface Page<T> {
+  items: T[]
+  next_cursor: string | null
+}
+
+export interface TaskSearchParams {
+  board_id?: number
+  column_id?: number
+  assignee_id?: number
+  priority?: string[]
+  tag?: string[]
+  due_after?: string
+  due_before?: string
+  is_active?: boolean
+  sort?: 'position' | 'created_at' | 'due_date' | '-position' | '-created_at' | '-due_date'
+  limit?: number
+  after?: string
+}
+
+// GET /workload (snake_case counterpart of utils/workload.ts WorkloadMetrics)
+export interface ServerWorkloadMetrics {
+  task_count: number
+  done_count: number
+  not_done_count: number
+  wip_count: number
+  hours_done: number
+  hours_not_done: number
+  hours_used: number
+  completed_hours: number
+  completion_ratio: number
+}
+
+export interface WorkloadResponse {
+  board_ids: number[]
+  assignees: { assignee_id: number | null; metrics: ServerWorkloadMetrics }[]
+  totals: ServerWorkloadMetrics
+}
+
+export interface SearchResult {
+  kind: 'task' | 'comment'
+  task_id: number
+  comment_id?: number
+  board_id: number
+  title: string    // HTML, matches wrapped in <mark>
+  snippet: string  // HTML, matches wrapped in <mark>
+  score: number
+}
+
 // WebSocket message types
 export interface WebSocketMessage {
   type: 'task_created' | 'task_updated' | 'task_deleted' | 'task_moved'